@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+OneOffRender Audio Analysis
+Shared audio reactivity analysis for render_shader.py and render_timeline.py.
+Produces per-frame features at exactly the output frame count.
+"""
+
+import os
+import json
+import hashlib
+from pathlib import Path
+
+import numpy as np
+from scipy.signal import lfilter
+
+from render_profiler import NullProfiler
+
+FFT_SIZE = 1024            # Shadertoy-compatible 1024-point FFT
+SPECTRUM_BINS = 512        # Usable bins (magnitude only)
+WAVEFORM_SAMPLES = 256     # Texture width of one oscilloscope row
+SMOOTHING_FACTOR = 0.8     # Shadertoy-style temporal smoothing
+OSCILLOSCOPE_WINDOW = 1.0 / 30.0  # Seconds of audio shown per waveform row
+
+# Bump when the analysis changes so stale cache entries are ignored
+CACHE_VERSION = 1
+ARRAY_KEYS = ('bass', 'treble', 'fft_spectrum', 'waveform')
+
+
+def resample_frames(values, total_frames):
+    """Linearly stretch the last axis of values to exactly total_frames samples."""
+    source_frames = values.shape[-1]
+    if source_frames == total_frames:
+        return values
+    if source_frames == 1:
+        return np.repeat(values, total_frames, axis=-1)
+
+    positions = np.linspace(0, source_frames - 1, total_frames)
+    lower = np.floor(positions).astype(np.int64)
+    upper = np.minimum(lower + 1, source_frames - 1)
+    weight = positions - lower
+    return values[..., lower] * (1.0 - weight) + values[..., upper] * weight
+
+
+def smooth_spectrum(magnitude_spectrum, smoothing_factor=SMOOTHING_FACTOR):
+    """Exponential smoothing over time (axis 1), seeded with the first frame."""
+    first_frame = magnitude_spectrum[:, :1]
+    return lfilter(
+        [1.0 - smoothing_factor], [1.0, -smoothing_factor],
+        magnitude_spectrum, axis=1, zi=smoothing_factor * first_frame
+    )[0]
+
+
+def normalize_spectrum(spectrum, normalization='per_bin'):
+    """Scale the spectrum to [0.0, 1.0].
+
+    'per_bin' scales each frequency bin to its own peak across time, so treble bins
+    reach 1.0 even when bass is much louder. 'global' scales by the overall peak.
+    """
+    if normalization == 'per_bin':
+        # Floor at a small epsilon to avoid divide-by-zero for silent bins
+        bin_peaks = np.maximum(spectrum.max(axis=1, keepdims=True), 1e-6)
+        return spectrum / bin_peaks
+    if normalization == 'global':
+        peak = spectrum.max()
+        return spectrum / peak if peak > 0 else spectrum
+    raise ValueError(f"Unknown spectrum normalization: {normalization}")
+
+
+def extract_waveforms(y, sr, total_frames, frame_rate):
+    """Oscilloscope rows: WAVEFORM_SAMPLES samples per frame, mapped to [0, 1]."""
+    samples_per_window = max(int(sr * OSCILLOSCOPE_WINDOW), WAVEFORM_SAMPLES)
+
+    # Window centered on each frame's time, shifted back to stay inside the audio
+    centers = (np.arange(total_frames) / frame_rate * sr).astype(np.int64)
+    starts = np.maximum(0, centers - samples_per_window // 2)
+    ends = np.minimum(len(y), starts + samples_per_window)
+    starts = np.where(ends - starts < samples_per_window, np.maximum(0, ends - samples_per_window), starts)
+    lengths = ends - starts
+
+    waveforms = np.zeros((total_frames, WAVEFORM_SAMPLES), dtype=np.float64)
+
+    full = lengths >= WAVEFORM_SAMPLES
+    if np.any(full) and len(y) > 0:
+        # Sample each window at WAVEFORM_SAMPLES evenly spaced positions
+        steps = np.linspace(0.0, 1.0, WAVEFORM_SAMPLES)
+        positions = starts[full, None] + steps[None, :] * (lengths[full, None] - 1)
+        waveforms[full] = np.interp(positions, np.arange(len(y)), y)
+
+    # Windows shorter than a texture row (very short audio) are zero padded
+    for frame_idx in np.nonzero(~full)[0]:
+        frame_audio = y[starts[frame_idx]:ends[frame_idx]]
+        waveforms[frame_idx, :len(frame_audio)] = frame_audio
+
+    return (waveforms + 1.0) * 0.5
+
+
+def analyze_audio(audio_path, duration, frame_rate, normalization='per_bin', logger=None, profiler=None):
+    """Analyze an audio file for reactivity data with a high-resolution 1024-point FFT.
+
+    Every per-frame feature has exactly int(duration * frame_rate) entries.
+    Decode and analysis time are recorded on profiler (a RenderProfiler) if given.
+
+    Returns a dict with 'bass', 'treble', 'fft_spectrum' (512 x frames),
+    'waveform' (frames x 256) plus frame and frequency bookkeeping.
+    """
+    profiler = profiler or NullProfiler()
+    import librosa  # Slow to import; renders with a cached analysis never need it
+
+    with profiler.stage('audio_decode'):
+        y, sr = librosa.load(str(audio_path), sr=None, duration=duration)
+
+    total_frames = int(duration * frame_rate)
+    if total_frames <= 0:
+        raise ValueError(f"Nothing to analyze: {duration}s at {frame_rate} fps")
+    hop_length = max(1, len(y) // total_frames)
+
+    if logger:
+        logger.info(f"Audio: {duration:.2f}s, {sr}Hz, {total_frames} frames @ {frame_rate} fps")
+        logger.info(f"FFT: {FFT_SIZE}-point, {sr//2}Hz Nyquist, {sr/FFT_SIZE:.1f}Hz per bin")
+
+    with profiler.stage('audio_stft'):
+        # Magnitude spectrum (512 usable bins from 1024-point FFT)
+        stft_data = librosa.stft(y, hop_length=hop_length, n_fft=FFT_SIZE)
+        magnitude_spectrum = np.abs(stft_data[:SPECTRUM_BINS, :])
+
+        spectrum = normalize_spectrum(smooth_spectrum(magnitude_spectrum), normalization)
+
+        # Legacy bass/treble for backward compatibility
+        bass_power = np.mean(spectrum[:32, :], axis=0)     # 0-32 bins (low frequencies)
+        treble_power = np.mean(spectrum[256:, :], axis=0)  # 256+ bins (high frequencies)
+
+        audio_data = {
+            'bass': resample_frames(bass_power, total_frames),  # Legacy compatibility
+            'treble': resample_frames(treble_power, total_frames),  # Legacy compatibility
+            'fft_spectrum': resample_frames(spectrum, total_frames),  # Full 512-bin spectrum
+            'waveform': extract_waveforms(y, sr, total_frames, frame_rate),
+            'total_frames': total_frames,
+            'frame_rate': frame_rate,
+            'sample_rate': sr,
+            'nyquist_freq': sr // 2,
+            'freq_per_bin': sr / float(FFT_SIZE)
+        }
+
+    return audio_data
+
+
+def analysis_cache_path(audio_path, duration, frame_rate, normalization, cache_dir):
+    """Cache file for one analysis, keyed by the audio file's identity and the settings."""
+    stat = os.stat(audio_path)
+    key = json.dumps([
+        CACHE_VERSION, str(Path(audio_path).resolve()), stat.st_size, stat.st_mtime_ns,
+        float(duration), float(frame_rate), normalization, FFT_SIZE, WAVEFORM_SAMPLES
+    ])
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+    return Path(cache_dir) / f"{Path(audio_path).stem}_{digest}.npz"
+
+
+def analyze_audio_cached(audio_path, duration, frame_rate, normalization='per_bin',
+                         cache_dir=None, logger=None, profiler=None):
+    """analyze_audio with results kept on disk in cache_dir.
+
+    Re-rendering the same audio at the same frame rate (e.g. repeated preview
+    renders) loads the arrays instead of running the FFT again. A changed file,
+    duration, frame rate or normalization gets a new cache entry.
+    """
+    if cache_dir is None:
+        return analyze_audio(audio_path, duration, frame_rate, normalization, logger, profiler)
+
+    cache_path = analysis_cache_path(audio_path, duration, frame_rate, normalization, cache_dir)
+
+    if cache_path.exists():
+        try:
+            with (profiler or NullProfiler()).stage('audio_cache_load'), np.load(cache_path) as cached:
+                audio_data = {key: cached[key] for key in ARRAY_KEYS}
+                audio_data.update(json.loads(str(cached['info'])))
+            if logger:
+                logger.info(f"Audio analysis loaded from cache: {cache_path.name}")
+            return audio_data
+        except Exception as e:
+            if logger:
+                logger.warning(f"Ignoring unreadable audio analysis cache {cache_path}: {e}")
+
+    audio_data = analyze_audio(audio_path, duration, frame_rate, normalization, logger, profiler)
+
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        info = {key: value for key, value in audio_data.items() if key not in ARRAY_KEYS}
+        # Write under a temp name first so a concurrent render never reads half a file
+        temp_path = cache_path.with_name(cache_path.stem + '.tmp.npz')
+        np.savez(temp_path, info=json.dumps(info), **{key: audio_data[key] for key in ARRAY_KEYS})
+        os.replace(temp_path, cache_path)
+    except Exception as e:
+        if logger:
+            logger.warning(f"Could not write audio analysis cache {cache_path}: {e}")
+
+    return audio_data
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+OneOffRender Benchmarks - Audio
+Audio analysis throughput (decode + STFT) and audio texture build time.
+"""
+
+import time
+
+from bench_util import timed, write_test_audio
+from shader_benchmark import synthetic_audio
+
+
+def bench_audio_analysis(context):
+    """analyze_audio on a synthetic track: seconds of audio analysed per second."""
+    import audio_analysis
+
+    seconds = context.audio_seconds
+    audio_path = write_test_audio(context.temp_dir / 'analysis.wav', seconds)
+
+    runs = []
+    for _ in range(context.repeat(3, 1)):
+        started = time.perf_counter()
+        audio_analysis.analyze_audio(audio_path, seconds, 30, normalization='per_bin')
+        runs.append(time.perf_counter() - started)
+
+    best = min(runs)
+    return {
+        'audio_seconds': seconds,
+        'runs': len(runs),
+        'best_seconds': round(best, 3),
+        'audio_seconds_per_second': round(seconds / best, 1)
+    }
+
+
+def bench_audio_texture(context):
+    """create_audio_texture (512x256 FFT + waveform texture) per frame."""
+    renderer = context.renderer
+    audio = synthetic_audio(64, 30)
+
+    def build(i):
+        frame = i % 64
+        renderer.create_audio_texture(
+            audio['bass'][frame], audio['treble'][frame], audio['waveform'][frame], audio['fft_spectrum'][:, frame]
+        ).release()
+
+    return timed(build, context.repeat(300, 50), warmup=5)
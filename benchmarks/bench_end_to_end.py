@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+OneOffRender Benchmarks - End to End
+Full render_timeline.py renders (audio analysis, compile, shader + transition
+frames, FFmpeg encode) of a fixed 10 second timeline at 360p and 720p. Needs ffmpeg.
+"""
+
+import json
+import time
+import logging
+
+from bench_util import BENCH_SHADERS_DIR, REPO_DIR, RESOLUTIONS, has_ffmpeg, write_test_audio
+
+DURATION = 10.0
+FRAME_RATE = 30
+
+
+def make_manifest(audio_path, width, height, name):
+    """Single-pass shader, Fade transition, Buffer A feedback shader."""
+    shader = {'type': 'shader', 'layer': 1}
+    return {
+        'version': '1.0',
+        'project_name': name,
+        'audio': {'path': str(audio_path), 'duration': DURATION},
+        'resolution': {'width': width, 'height': height},
+        'frame_rate': FRAME_RATE,
+        'encoding': {'crf': 18, 'preset': 'medium'},
+        'timeline': {
+            'duration': DURATION,
+            'elements': [
+                dict(shader, id='bench-1', name='single_pass.glsl', startTime=0.0, endTime=4.5, duration=4.5,
+                     path=str(BENCH_SHADERS_DIR / 'single_pass.glsl')),
+                {'id': 'bench-t', 'type': 'transition', 'layer': 1, 'name': 'Fade.glsl',
+                 'startTime': 4.5, 'endTime': 5.5, 'duration': 1.0,
+                 'path': str(REPO_DIR / 'Transitions' / 'Fade.glsl')},
+                dict(shader, id='bench-2', name='feedback.glsl', startTime=5.5, endTime=DURATION,
+                     duration=DURATION - 5.5, path=str(BENCH_SHADERS_DIR / 'feedback.glsl'))
+            ]
+        }
+    }
+
+
+def bench_end_to_end(context):
+    """Wall time and frames per second of complete timeline renders."""
+    if not has_ffmpeg():
+        return {'skipped': 'ffmpeg not found'}
+
+    from render_timeline import TimelineRenderer
+
+    class QuietTimelineRenderer(TimelineRenderer):
+        def emit_event(self, event, **fields):
+            pass
+
+    audio_path = write_test_audio(context.temp_dir / 'end_to_end.wav', DURATION)
+    results = {}
+
+    for label, (width, height) in RESOLUTIONS.items():
+        name = f'benchmark_end_to_end_{label}'
+        manifest_path = context.temp_dir / f'{name}.json'
+        manifest_path.write_text(json.dumps(make_manifest(audio_path, width, height, name)))
+
+        renderer = QuietTimelineRenderer(manifest_path)
+        renderer.logger.setLevel(logging.WARNING)
+        started = time.perf_counter()
+        output = renderer.render()
+        elapsed = time.perf_counter() - started
+        if output is None:
+            results[label] = {'error': 'render failed'}
+            continue
+
+        frames = int(DURATION * FRAME_RATE)
+        report = renderer.profiler.report()
+        results[label] = {
+            'frames': frames,
+            'seconds': round(elapsed, 3),
+            'fps': round(frames / elapsed, 2),
+            'realtime_factor': round(DURATION / elapsed, 3),
+            'stages': {stage: timing['seconds'] for stage, timing in report['stages'].items()}
+        }
+        output.unlink(missing_ok=True)
+
+    return results
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+OneOffRender Benchmarks - Frames
+Per-frame render cost through the ShaderRenderer frame path (draw + readback),
+for a single-pass shader, a Buffer A feedback shader and a transition, plus raw
+readback and frame write throughput.
+"""
+
+import os
+import time
+from pathlib import Path
+
+from bench_util import BENCH_SHADERS_DIR, REPO_DIR, RESOLUTIONS, timed
+from gpu_resources import GpuResources
+from shader_benchmark import DiscardFrames, synthetic_audio
+
+TRANSITION_PATH = REPO_DIR / 'Transitions' / 'Fade.glsl'
+FRAME_RATE = 30
+
+
+def per_resolution(context, measure):
+    """{'360p': measure(resolution), '720p': ...} with frames per second added."""
+    results = {}
+    for label, resolution in RESOLUTIONS.items():
+        result = measure(resolution)
+        result['fps'] = round(1000.0 / result['mean_ms'], 1)
+        results[label] = result
+    return results
+
+
+def bench_shader_frames(context, shader_file):
+    renderer = context.renderer
+    shader_data = renderer.compile(BENCH_SHADERS_DIR / shader_file, {})
+    frames = context.repeat(120, 20)
+    audio = synthetic_audio(frames + 10, FRAME_RATE)
+    sink = DiscardFrames()
+
+    def measure(resolution):
+        fbo = renderer.framebuffer(resolution)
+        try:
+            if shader_data['buffers']:
+                renderer.initialize_buffer_textures(shader_data, resolution)
+            return timed(
+                lambda i: renderer.render_shader_frame(shader_data, renderer.vbo, fbo, audio, i, FRAME_RATE, sink),
+                frames, warmup=5
+            )
+        finally:
+            renderer.release_framebuffer(fbo)
+            GpuResources.for_context(renderer.ctx).release_buffers(shader_data)
+
+    try:
+        return per_resolution(context, measure)
+    finally:
+        renderer.release(shader_data)
+
+
+def bench_single_pass_frame(context):
+    """Single-pass shader: draw + readback per frame."""
+    return bench_shader_frames(context, 'single_pass.glsl')
+
+
+def bench_buffer_shader_frame(context):
+    """Buffer A feedback shader: buffer pass + image pass + readback per frame."""
+    return bench_shader_frames(context, 'feedback.glsl')
+
+
+def bench_transition_frame(context):
+    """Transition frame: both shaders into temporary targets, Fade blend, readback."""
+    renderer = context.renderer
+    from_data = renderer.compile(BENCH_SHADERS_DIR / 'single_pass.glsl', {})
+    to_data = renderer.compile(BENCH_SHADERS_DIR / 'single_pass.glsl', {})
+    transition = renderer.load_transition_shader(TRANSITION_PATH, {})
+    frames = context.repeat(120, 20)
+    audio = synthetic_audio(frames + 10, FRAME_RATE)
+    sink = DiscardFrames()
+
+    def measure(resolution):
+        fbo = renderer.framebuffer(resolution)
+        try:
+            return timed(
+                lambda i: renderer.render_transition_frame(
+                    from_data, to_data, transition, renderer.vbo, fbo, audio, i, FRAME_RATE,
+                    (i % frames) / frames, sink
+                ),
+                frames, warmup=5
+            )
+        finally:
+            renderer.release_framebuffer(fbo)
+
+    try:
+        return per_resolution(context, measure)
+    finally:
+        renderer.release(from_data)
+        renderer.release(to_data)
+        renderer.release_program(transition['program'])
+
+
+def bench_readback_write(context):
+    """fbo.read of an RGB frame, and writing raw frames to a file, in MB/s."""
+    renderer = context.renderer
+    frames = context.repeat(120, 20)
+    results = {}
+
+    for label, (width, height) in RESOLUTIONS.items():
+        frame_mb = width * height * 3 / 1024 ** 2
+        fbo = renderer.framebuffer((width, height))
+        try:
+            fbo.use()
+            renderer.ctx.clear(0.2, 0.4, 0.6, 1.0)
+            readback = timed(lambda i: fbo.read(components=3), frames, warmup=3)
+            data = fbo.read(components=3)
+        finally:
+            renderer.release_framebuffer(fbo)
+
+        raw_path = Path(context.temp_dir) / f'frames_{label}.raw'
+        with open(raw_path, 'wb') as raw_file:
+            started = time.perf_counter()
+            for _ in range(frames):
+                raw_file.write(data)
+            raw_file.flush()
+            os.fsync(raw_file.fileno())
+            write_seconds = time.perf_counter() - started
+        raw_path.unlink()
+
+        readback['mb_per_second'] = round(frame_mb / (readback['mean_ms'] / 1000.0), 1)
+        results[label] = {
+            'readback': readback,
+            'write': {
+                'frames': frames,
+                'mean_ms': round(write_seconds / frames * 1000, 4),
+                'mb_per_second': round(frame_mb * frames / write_seconds, 1)
+            }
+        }
+    return results
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+OneOffRender Benchmarks - Green Screen
+Layer 0 costs per 720p frame: FFmpeg decode, chroma key normalisation, PIL
+scale, and the numpy composite still frames use (GreenScreenCompositor). The
+encoder's key + overlay filter chain (GREENSCREEN_FILTER) is timed at 720p and
+1440p. Needs ffmpeg.
+"""
+
+import json
+import time
+import subprocess
+
+import numpy as np
+
+from bench_util import RESOLUTIONS, has_ffmpeg, timed, write_greenscreen_clip
+from shader_benchmark import DiscardFrames
+
+FILTER_RESOLUTIONS = {'720p': RESOLUTIONS['720p'], '1440p': (2560, 1440)}
+
+
+def timeline_renderer(context, clip_path):
+    """A TimelineRenderer for a one-clip manifest (only its Layer 0 helpers are used)."""
+    from render_timeline import TimelineRenderer
+
+    manifest_path = context.temp_dir / 'greenscreen_manifest.json'
+    manifest_path.write_text(json.dumps({
+        'version': '1.0',
+        'audio': {'path': str(clip_path)},
+        'timeline': {'duration': 1.0, 'elements': []}
+    }))
+    renderer = TimelineRenderer(manifest_path)
+    renderer.logger.setLevel('WARNING')
+    return renderer
+
+
+def ffmpeg_ms_per_frame(args, frames, repeat):
+    """Median wall time per frame of an FFmpeg run that discards its output."""
+    cmd = ['ffmpeg', '-v', 'error', '-y'] + args + ['-frames:v', str(frames), '-f', 'null', '-']
+    samples = []
+    for i in range(repeat):
+        started = time.perf_counter()
+        subprocess.run(cmd, check=True)
+        samples.append((time.perf_counter() - started) * 1000.0 / frames)
+    return round(sorted(samples)[len(samples) // 2], 4)
+
+
+def bench_filter_chain(context, clip_frames):
+    """Encoder-side keying cost per frame: the full filter chain minus a plain overlay of the same inputs."""
+    from render_timeline import GREENSCREEN_FILTER
+
+    results = {}
+    for label, (width, height) in FILTER_RESOLUTIONS.items():
+        clip_path = write_greenscreen_clip(
+            context.temp_dir / f'greenscreen_{label}.mp4', clip_frames / 30 + 1, width, height
+        )
+        inputs = [
+            '-f', 'lavfi', '-i', f'color=c=0x282828:s={width}x{height}:r=30',
+            '-i', str(clip_path)
+        ]
+        repeat = context.repeat(3, 1)
+        chain = ffmpeg_ms_per_frame(
+            inputs + ['-filter_complex', GREENSCREEN_FILTER, '-map', '[vout]'], clip_frames, repeat
+        )
+        inputs_only = ffmpeg_ms_per_frame(
+            inputs + ['-filter_complex', '[0:v][1:v]overlay=0:0[vout]', '-map', '[vout]'], clip_frames, repeat
+        )
+        results[label] = {
+            'chain_ms_per_frame': chain,
+            'plain_overlay_ms_per_frame': inputs_only,
+            'key_ms_per_frame': round(chain - inputs_only, 4)
+        }
+    return results
+
+
+def bench_greenscreen(context):
+    """Layer 0 costs of a green screen clip at 720p; the encoder filter chain at 720p and 1440p."""
+    if not has_ffmpeg():
+        return {'skipped': 'ffmpeg not found'}
+
+    from render_timeline import GreenScreenCompositor
+
+    width, height = RESOLUTIONS['720p']
+    frames = context.repeat(90, 20)
+    clip_path = write_greenscreen_clip(context.temp_dir / 'greenscreen.mp4', frames / 30 + 1, width, height)
+    renderer = timeline_renderer(context, clip_path)
+    element = {'path': str(clip_path), 'greenscreen': {'enabled': True}}
+
+    try:
+        decoder = renderer.open_video_decoder(element, 0.0, width, height, 30)
+        decoded = []
+        try:
+            decode = timed(
+                lambda i: decoded.append(renderer.read_video_decoder_frame(decoder, width, height)),
+                frames, warmup=2
+            )
+        finally:
+            renderer.close_video_decoder(decoder)
+        decoded = [frame for frame in decoded if frame is not None]
+
+        key = timed(lambda i: renderer.apply_chromakey_to_frame(decoded[i % len(decoded)], element), frames)
+
+        source = np.ascontiguousarray(
+            np.repeat(np.repeat(decoded[0], 3, axis=0), 3, axis=1)[:1080, :1920]
+        )  # 1080p source scaled down to the output, as with a full-HD clip
+        scale = timed(lambda i: renderer.scale_and_position_video_frame(source, width, height), context.repeat(30, 5))
+
+        background = np.full((height, width, 3), 40, dtype=np.uint8).tobytes()
+        compositor = GreenScreenCompositor(DiscardFrames(), iter(decoded * 2), width, height)
+        composite = timed(lambda i: compositor.write(background), min(frames, len(decoded)))
+
+        filter_chain = bench_filter_chain(context, frames)
+    finally:
+        renderer.cleanup()
+
+    decode['fps'] = round(1000.0 / decode['mean_ms'], 1)
+    return {
+        'resolution': f'{width}x{height}',
+        'decode': decode,
+        'chromakey': key,
+        'scale_1080p_to_720p': scale,
+        'still_composite': composite,
+        'encoder_filter_chain': filter_chain
+    }
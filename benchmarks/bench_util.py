@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+OneOffRender Benchmarks - Shared Helpers
+Timing statistics, the benchmark renderer, environment info and synthetic inputs.
+"""
+
+import os
+import sys
+import time
+import wave
+import shutil
+import platform
+import subprocess
+from pathlib import Path
+
+import numpy as np
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+BENCH_SHADERS_DIR = Path(__file__).resolve().parent / 'shaders'
+RESOLUTIONS = {'360p': (640, 360), '720p': (1280, 720)}
+
+sys.path.insert(0, str(REPO_DIR))
+
+from render_profiler import percentile                               # noqa: E402
+from shader_benchmark import BenchmarkRenderer                       # noqa: E402
+from gl_context import capabilities                                 # noqa: E402
+
+
+def stats(samples_ms):
+    """Summary of per-iteration times in milliseconds."""
+    return {
+        'count': len(samples_ms),
+        'mean_ms': round(sum(samples_ms) / len(samples_ms), 4),
+        'median_ms': round(percentile(samples_ms, 0.5), 4),
+        'p95_ms': round(percentile(samples_ms, 0.95), 4),
+        'min_ms': round(min(samples_ms), 4)
+    }
+
+
+def timed(fn, repeat, warmup=1):
+    """Call fn(i) warmup + repeat times; stats of the timed calls."""
+    for i in range(warmup):
+        fn(i)
+    samples = []
+    for i in range(warmup, warmup + repeat):
+        started = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - started) * 1000)
+    return stats(samples)
+
+
+class SuiteRenderer(BenchmarkRenderer):
+    """BenchmarkRenderer with framebuffer helpers (context from gl_context, see run_benchmarks.py)."""
+
+    def framebuffer(self, resolution):
+        return self.ctx.framebuffer(color_attachments=[self.ctx.texture(resolution, 4)])
+
+    def release_framebuffer(self, fbo):
+        for attachment in fbo.color_attachments:
+            attachment.release()
+        fbo.release()
+
+
+def has_ffmpeg():
+    return shutil.which('ffmpeg') is not None
+
+
+def git_commit():
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR, capture_output=True, text=True, check=True
+        )
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                               cwd=REPO_DIR, capture_output=True, text=True).stdout.strip()
+        return result.stdout.strip() + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def environment(renderer=None):
+    """Machine, library and GL details recorded with every run."""
+    import moderngl
+    info = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'moderngl': getattr(moderngl, '__version__', 'unknown'),
+    }
+    if renderer is not None:
+        gl = capabilities(renderer.ctx)
+        info.update({'gl_renderer': gl['renderer'], 'gl_version': gl['version'],
+                     'gl_backend': gl['backend'], 'software_gl': gl['software']})
+    return info
+
+
+def write_test_audio(path, seconds, sample_rate=44100):
+    """Deterministic 16-bit mono WAV: a bass pulse, a sweep and a little noise."""
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    rng = np.random.default_rng(1234)
+    signal = (
+        0.5 * np.sin(2 * np.pi * 55 * t) * (0.5 + 0.5 * np.sin(2 * np.pi * 2 * t))
+        + 0.3 * np.sin(2 * np.pi * (200 + 1800 * (t % 4) / 4) * t)
+        + 0.05 * rng.standard_normal(len(t))
+    )
+    samples = (np.clip(signal, -1.0, 1.0) * 32767).astype('<i2')
+    with wave.open(str(path), 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(samples.tobytes())
+    return path
+
+
+def write_greenscreen_clip(path, seconds, width, height, frame_rate=30):
+    """Test clip with FFmpeg: a moving pattern over key green (0x00d600)."""
+    subprocess.run([
+        'ffmpeg', '-y', '-v', 'error',
+        '-f', 'lavfi', '-i', f'color=c=0x00d600:s={width}x{height}:r={frame_rate}:d={seconds}',
+        '-f', 'lavfi', '-i', f'testsrc2=s={width // 2}x{height // 2}:r={frame_rate}:d={seconds}',
+        '-filter_complex', '[0][1]overlay=x=(W-w)/2+100*sin(t):y=(H-h)/2',
+        '-c:v', 'libx264', '-preset', 'ultrafast', '-pix_fmt', 'yuv420p', str(path)
+    ], check=True)
+    return path
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+OneOffRender Benchmark Suite
+Runs the renderer benchmarks and writes the results as JSON, so runs can be
+compared across commits and machines.
+
+Usage (from the project root):
+    python benchmarks/run_benchmarks.py                    all benchmarks
+    python benchmarks/run_benchmarks.py --quick            fewer iterations (smoke test)
+    python benchmarks/run_benchmarks.py --only single_pass_frame,readback_write
+    python benchmarks/run_benchmarks.py --compare old.json new.json
+
+Software GL (Mesa llvmpipe) is forced by default so results from CPU-only
+machines are comparable; --hardware-gl uses whatever GPU driver is installed.
+Results go to benchmarks/results/<time>_<commit>.json unless --output is given.
+"""
+
+import os
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import traceback
+from datetime import datetime
+from pathlib import Path
+
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+RESULTS_VERSION = 1
+
+# Order matters: cheap, isolated benchmarks first, full renders last
+BENCHMARKS = [
+    ('audio_analysis', 'bench_audio', 'bench_audio_analysis'),
+    ('audio_texture', 'bench_audio', 'bench_audio_texture'),
+    ('single_pass_frame', 'bench_frames', 'bench_single_pass_frame'),
+    ('buffer_shader_frame', 'bench_frames', 'bench_buffer_shader_frame'),
+    ('transition_frame', 'bench_frames', 'bench_transition_frame'),
+    ('readback_write', 'bench_frames', 'bench_readback_write'),
+    ('greenscreen', 'bench_greenscreen', 'bench_greenscreen'),
+    ('end_to_end', 'bench_end_to_end', 'bench_end_to_end'),
+]
+
+
+class BenchmarkContext:
+    """What every benchmark gets: the shared renderer, a temp dir and the iteration scale."""
+
+    def __init__(self, renderer, temp_dir, quick):
+        self.renderer = renderer
+        self.temp_dir = Path(temp_dir)
+        self.quick = quick
+        self.audio_seconds = 30.0 if quick else 180.0
+
+    def repeat(self, full, quick):
+        """Iteration count for this run."""
+        return quick if self.quick else full
+
+
+def run(names, quick):
+    """Run the named benchmarks; returns the results document."""
+    import importlib
+    from bench_util import REPO_DIR, SuiteRenderer, environment
+
+    # Renderer code resolves Shaders/, Transitions/, Cache/ relative to the project root
+    os.chdir(REPO_DIR)
+    renderer = SuiteRenderer(REPO_DIR / 'config.json')
+    temp_dir = tempfile.mkdtemp(prefix='oneoff_bench_')
+    context = BenchmarkContext(renderer, temp_dir, quick)
+
+    document = {
+        'version': RESULTS_VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'quick': quick,
+        'environment': environment(renderer),
+        'benchmarks': {}
+    }
+    print(f"GL: {document['environment'].get('gl_renderer')}  commit: {document['environment']['commit']}")
+
+    try:
+        for name, module_name, function_name in BENCHMARKS:
+            if name not in names:
+                continue
+            print(f"  {name}...", end=' ', flush=True)
+            started = time.perf_counter()
+            try:
+                function = getattr(importlib.import_module(module_name), function_name)
+                result = function(context)
+            except Exception as e:
+                traceback.print_exc()
+                result = {'error': str(e)}
+            result['elapsed_seconds'] = round(time.perf_counter() - started, 2)
+            document['benchmarks'][name] = result
+            print('skipped' if 'skipped' in result else 'failed' if 'error' in result else 'done')
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    return document
+
+
+def flatten(value, prefix=''):
+    """{'a.b.mean_ms': 1.2, ...} for the numeric leaves of a result."""
+    if isinstance(value, dict):
+        flat = {}
+        for key, item in value.items():
+            flat.update(flatten(item, f'{prefix}.{key}' if prefix else key))
+        return flat
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return {prefix: value}
+    return {}
+
+
+def compare(old_path, new_path):
+    """Print the metrics two result files share, with the relative change."""
+    old, new = (json.loads(Path(path).read_text()) for path in (old_path, new_path))
+    print(f"old: {old['environment']['commit']} ({old['created']}, {old['environment'].get('gl_renderer')})")
+    print(f"new: {new['environment']['commit']} ({new['created']}, {new['environment'].get('gl_renderer')})")
+
+    old_metrics, new_metrics = flatten(old['benchmarks']), flatten(new['benchmarks'])
+    for key in sorted(set(old_metrics) & set(new_metrics)):
+        if not key.endswith(('mean_ms', 'median_ms', 'p95_ms', 'fps', 'per_second', 'seconds')) \
+                or key.endswith('elapsed_seconds'):
+            continue
+        before, after = old_metrics[key], new_metrics[key]
+        change = (after - before) / before * 100 if before else 0.0
+        print(f"  {key:<55} {before:>12.3f} {after:>12.3f} {change:>+8.1f}%")
+
+
+def main():
+    """Run the suite (or compare two result files)."""
+    names = [name for name, _, _ in BENCHMARKS]
+    parser = argparse.ArgumentParser(description='OneOffRender benchmark suite')
+    parser.add_argument('--only', help=f"comma-separated subset of: {', '.join(names)}")
+    parser.add_argument('--quick', action='store_true', help='fewer iterations, shorter audio')
+    parser.add_argument('--hardware-gl', action='store_true', help="don't force Mesa software GL")
+    parser.add_argument('--output', help='result file (default benchmarks/results/<time>_<commit>.json)')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='compare two result files')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    selected = names
+    if args.only:
+        selected = [name.strip() for name in args.only.split(',')]
+        unknown = set(selected) - set(names)
+        if unknown:
+            parser.error(f"unknown benchmark(s): {', '.join(sorted(unknown))}")
+
+    if not args.hardware_gl:
+        # Picked up by gl_context.create_context for every context in this process
+        os.environ['ONEOFF_GL_BACKEND'] = 'software'
+
+    document = run(selected, args.quick)
+
+    if args.output:
+        output = Path(args.output)
+    else:
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        output = RESULTS_DIR / f"{stamp}_{document['environment']['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(document, indent=2))
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
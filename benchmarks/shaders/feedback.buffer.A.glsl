@@ -0,0 +1,29 @@
+#version 330 core
+// Benchmark shader: Buffer A of feedback.glsl (reads its previous frame, 9 taps).
+// Part of the benchmark suite; keep it unchanged so results stay comparable.
+
+uniform vec2 iResolution;
+uniform float iTime;
+uniform sampler2D iChannel0;  // Previous frame of this buffer
+uniform sampler2D iChannel1;  // Audio texture
+
+out vec4 fragColor;
+
+void main() {
+    vec2 uv = gl_FragCoord.xy / iResolution.xy;
+    vec2 texel = 1.0 / iResolution.xy;
+
+    vec4 sum = vec4(0.0);
+    for (int y = -1; y <= 1; y++) {
+        for (int x = -1; x <= 1; x++) {
+            sum += texture(iChannel0, uv + vec2(x, y) * texel);
+        }
+    }
+    vec4 previous = sum / 9.0;
+
+    float bass = texture(iChannel1, vec2(0.05, 0.0)).r;
+    vec2 center = 0.5 + 0.3 * vec2(cos(iTime), sin(iTime * 1.3));
+    float spot = smoothstep(0.05 + 0.05 * bass, 0.0, length(uv - center));
+
+    fragColor = vec4(fract(previous.r + 0.01 + spot), max(previous.g * 0.98, spot), 0.0, 1.0);
+}
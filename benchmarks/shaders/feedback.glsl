@@ -0,0 +1,16 @@
+#version 330 core
+// Benchmark shader: image pass of a two-pass (Buffer A feedback) shader.
+// Part of the benchmark suite; keep it unchanged so results stay comparable.
+
+uniform vec2 iResolution;
+uniform float iTime;
+uniform sampler2D iChannel0;  // Buffer A
+
+out vec4 fragColor;
+
+void main() {
+    vec2 uv = gl_FragCoord.xy / iResolution.xy;
+    vec4 state = texture(iChannel0, uv);
+    vec3 color = 0.5 + 0.5 * cos(6.2831 * (state.r + vec3(0.0, 0.33, 0.67)));
+    fragColor = vec4(color * state.g, 1.0);
+}
@@ -0,0 +1,47 @@
+#version 330 core
+// Benchmark shader: single pass, fixed cost (5-octave fbm warp + audio texture reads).
+// Part of the benchmark suite; keep it unchanged so results stay comparable.
+
+uniform vec2 iResolution;
+uniform float iTime;
+uniform sampler2D iChannel0;  // Audio texture
+
+out vec4 fragColor;
+
+float hash(vec2 p) {
+    return fract(sin(dot(p, vec2(127.1, 311.7))) * 43758.5453);
+}
+
+float noise(vec2 p) {
+    vec2 i = floor(p);
+    vec2 f = fract(p);
+    f = f * f * (3.0 - 2.0 * f);
+    return mix(mix(hash(i), hash(i + vec2(1.0, 0.0)), f.x),
+               mix(hash(i + vec2(0.0, 1.0)), hash(i + vec2(1.0, 1.0)), f.x), f.y);
+}
+
+float fbm(vec2 p) {
+    float value = 0.0;
+    float amplitude = 0.5;
+    for (int i = 0; i < 5; i++) {
+        value += amplitude * noise(p);
+        p = p * 2.02 + vec2(1.7, 9.2);
+        amplitude *= 0.5;
+    }
+    return value;
+}
+
+void main() {
+    vec2 uv = gl_FragCoord.xy / iResolution.xy;
+    vec2 p = (gl_FragCoord.xy - 0.5 * iResolution.xy) / iResolution.y;
+
+    float bass = texture(iChannel0, vec2(0.05, 0.0)).r;
+    float wave = texture(iChannel0, vec2(uv.x, 0.5)).r;
+
+    vec2 q = vec2(fbm(p * 3.0 + iTime * 0.1), fbm(p * 3.0 + vec2(5.2, 1.3)));
+    float f = fbm(p * 3.0 + 4.0 * q + bass);
+
+    vec3 color = mix(vec3(0.1, 0.2, 0.4), vec3(0.9, 0.6, 0.2), f);
+    color += 0.2 * smoothstep(0.02, 0.0, abs(uv.y - wave));
+    fragColor = vec4(color, 1.0);
+}
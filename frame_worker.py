@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+OneOffRender Still Frame Worker
+Long-lived process that renders single timeline frames for scrubbing in the web editor.
+
+Keeps one OpenGL context alive and caches compiled shader programs and audio
+analysis between requests (render_resources.py); textures stay uploaded while
+consecutive requests use them. A frame costs one draw plus an image encode.
+
+Protocol: one JSON request per line on stdin
+    {"manifest": {...}, "time": 12.5, "format": "jpeg", "quality": 85, "max_width": 960}
+For each request one JSON header line on stdout
+    {"ok": true, "mime": "image/jpeg", "size": <bytes>, "width": ..., "height": ..., "elapsed": <ms>}
+followed by exactly <size> bytes of image data, or {"ok": false, "error": "..."}.
+Logs go to stderr.
+"""
+
+import io
+import sys
+import json
+import time
+import logging
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from render_timeline import TimelineRenderer, TimelineIndex, GreenScreenCompositor
+from render_resources import RenderResources, WarmRendererMixin
+from render_profiler import NullProfiler
+
+IMAGE_FORMATS = {
+    'jpeg': ('JPEG', 'image/jpeg'),
+    'webp': ('WEBP', 'image/webp'),
+}
+
+
+class FrameCollector:
+    """Frame sink that keeps the last raw RGB frame written to it."""
+
+    def __init__(self):
+        self.data = None
+
+    def write(self, data):
+        self.data = data
+
+
+class StillFrameRenderer(WarmRendererMixin, TimelineRenderer):
+    """TimelineRenderer that renders one frame at a time from manifests passed in memory.
+
+    Shader programs and audio analysis stay cached in RenderResources between
+    requests; editing a shader on disk is picked up on the next frame.
+    """
+
+    def __init__(self):
+        """Set up a warm GL context (no manifest yet; each request brings its own)."""
+        self.manifest_path = None
+        self.manifest = None
+        self.setup_logging()
+        self.profiler = NullProfiler()  # No per-frame reports for scrubbing
+        self.resources = RenderResources()
+        self.ctx = self.create_gl_context()
+
+        self.current_transition_name = None
+        self.current_transition_pair = None
+        self.transition_mapping = {}
+        self.fill_frame_cache = {}
+        self.framebuffers = {}  # (width, height) -> fbo
+        self.previous_shaders = {}  # Last request's compiled shaders (see render_still)
+
+        vertices = np.array([
+            -1.0, -1.0,
+             1.0, -1.0,
+            -1.0,  1.0,
+            -1.0,  1.0,
+             1.0, -1.0,
+             1.0,  1.0,
+        ], dtype=np.float32)
+        self.vbo = self.ctx.buffer(vertices.tobytes())
+
+    def get_audio_data(self):
+        """Audio analysis for the current manifest (memory cache over the disk cache)."""
+        audio_path = Path(self.manifest['audio']['path'])
+        key = (
+            str(audio_path.resolve()), audio_path.stat().st_mtime_ns,
+            self.manifest['timeline']['duration'], self.get_frame_rate()
+        )
+        return self.resources.cached_audio(key, lambda: self.load_audio(audio_path))
+
+    def get_framebuffer(self, width, height):
+        """Framebuffer for a frame size, reused while the size stays the same."""
+        fbo = self.framebuffers.get((width, height))
+        if fbo is None:
+            for old_fbo in self.framebuffers.values():
+                for attachment in old_fbo.color_attachments:
+                    attachment.release()
+                old_fbo.release()
+            fbo = self.ctx.framebuffer(color_attachments=[self.ctx.texture((width, height), 4)])
+            self.framebuffers = {(width, height): fbo}
+        return fbo
+
+    def greenscreen_frame_at(self, time_seconds, width, height):
+        """Layer 0 frame (chroma-keyed RGB array) at a time, or None in a gap."""
+        element = TimelineIndex(self.get_elements_by_layer(0)).element_at(time_seconds)
+        if element is None:
+            return None
+
+        frame = self.extract_video_frame(Path(element['path']), time_seconds - element['startTime'])
+        if frame is None:
+            return None
+
+        frame = self.scale_and_position_video_frame(frame, width, height)
+        if element.get('greenscreen', {}).get('enabled', True):  # Default to enabled
+            frame = self.apply_chromakey_to_frame(frame, element)
+        return frame
+
+    def render_still(self, manifest, time_seconds):
+        """Render the frame at time_seconds; returns (raw RGB bytes, width, height)."""
+        self.manifest = manifest
+        self.current_transition_name = None
+        self.current_transition_pair = None
+
+        width, height = self.get_resolution()
+        frame_rate = self.get_frame_rate()
+        total_frames = int(manifest['timeline']['duration'] * frame_rate)
+        frame_idx = max(0, min(int(time_seconds * frame_rate), total_frames - 1))
+
+        fbo = self.get_framebuffer(width, height)
+        frame = FrameCollector()
+
+        layer1_elements = self.get_elements_by_layer(1)
+        if layer1_elements:
+            layer1_elements = self.convert_web_interface_timeline(layer1_elements)
+            audio_data = self.get_audio_data()
+            compiled_shaders = self.precompile_shaders(layer1_elements)
+            compiled_transitions = self.precompile_used_transitions(layer1_elements)
+
+            # Release the previous request's shaders only now, so textures both use stay
+            # uploaded; their buffer targets go back to the pool for this frame
+            self.release_buffer_textures(self.previous_shaders)
+            self.previous_shaders = compiled_shaders
+
+            # Multipass shaders start from empty buffers (no feedback history for a single
+            # frame); only the shaders on screen get targets, from the context's pool
+            timeline_index = TimelineIndex(layer1_elements, self.transition_mapping)
+            self.render_layer1_frame(
+                timeline_index, compiled_shaders, compiled_transitions,
+                self.vbo, fbo, audio_data, frame_idx, frame_rate, frame
+            )
+        else:
+            self.release_buffer_textures(self.previous_shaders)
+            self.previous_shaders = {}
+            self.render_black_frame(fbo, frame)
+
+        self.resources.trim()
+
+        overlay = self.greenscreen_frame_at(frame_idx / frame_rate, width, height)
+        if overlay is not None:
+            GreenScreenCompositor(frame, iter([overlay]), width, height).write(frame.data)
+
+        return frame.data, width, height
+
+    def handle_request(self, request):
+        """Render one request; returns (header dict, image bytes)."""
+        started = time.time()
+        manifest = dict(request['manifest'])
+
+        # Scrubbing doesn't need the full output size
+        max_width = request.get('max_width')
+        resolution = manifest.get('resolution', {'width': 2560, 'height': 1440})
+        if max_width and resolution['width'] > max_width:
+            scale = max_width / resolution['width']
+            manifest['resolution'] = {
+                'width': max(2, int(resolution['width'] * scale) // 2 * 2),
+                'height': max(2, int(resolution['height'] * scale) // 2 * 2)
+            }
+
+        pil_format, mime = IMAGE_FORMATS[request.get('format', 'jpeg')]
+        data, width, height = self.render_still(manifest, float(request.get('time', 0.0)))
+
+        image = io.BytesIO()
+        Image.frombytes('RGB', (width, height), data).save(
+            image, pil_format, quality=int(request.get('quality', 85))
+        )
+        image = image.getvalue()
+
+        header = {
+            'ok': True,
+            'mime': mime,
+            'size': len(image),
+            'width': width,
+            'height': height,
+            'elapsed': round((time.time() - started) * 1000, 1)
+        }
+        return header, image
+
+
+def main():
+    """Serve frame requests from stdin until it closes."""
+    renderer = StillFrameRenderer()
+    # Per-frame compile/precompile chatter would flood the worker log
+    renderer.logger.setLevel(logging.WARNING)
+    output = sys.stdout.buffer
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            header, image = renderer.handle_request(json.loads(line))
+        except Exception as e:
+            renderer.logger.error(f"Still frame failed: {e}")
+            header, image = {'ok': False, 'error': str(e)}, b''
+
+        output.write((json.dumps(header) + '\n').encode('utf-8'))
+        output.write(image)
+        output.flush()
+
+
+if __name__ == "__main__":
+    main()
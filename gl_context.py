@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+OneOffRender GL Context
+Creates the standalone OpenGL context every render path uses, with an explicit
+backend and device choice for headless render nodes, and reports what the
+context supports.
+
+Backends:
+    auto      platform default, falling back to EGL (EGL first when no display is set)
+    egl       EGL, no X server needed; device_index picks the GPU
+    x11       GLX through an X server (alias: glx)
+    software  Mesa llvmpipe on the CPU, through EGL or GLX (aliases: osmesa, llvmpipe)
+    default   moderngl's platform default only (WGL on Windows, CGL on macOS)
+
+Set in config.json ("gl_context": {"backend": "egl", "device_index": 1}) or per
+process with ONEOFF_GL_BACKEND / ONEOFF_GL_DEVICE, which take precedence. The same
+section holds "vram_budget_mb" (see gpu_resources.py).
+
+Usage:
+    python gl_context.py                       capability report of the configured context
+    python gl_context.py --backend software    report for another backend
+    python gl_context.py --list-devices        EGL devices on this machine
+"""
+
+import os
+import sys
+import json
+import argparse
+import logging
+from pathlib import Path
+
+import moderngl
+
+CONFIG_PATH = Path(__file__).resolve().parent / 'config.json'
+DEFAULT_SETTINGS = {'backend': 'auto', 'device_index': 0, 'vram_budget_mb': 0}
+BACKEND_ALIASES = {'glx': 'x11', 'osmesa': 'software', 'llvmpipe': 'software'}
+BACKENDS = ('auto', 'egl', 'x11', 'software', 'default')
+SOFTWARE_RENDERERS = ('llvmpipe', 'softpipe', 'swrast', 'software rasterizer', 'swiftshader')
+MAX_EGL_DEVICES = 16
+
+logger = logging.getLogger(__name__)
+
+
+def gl_settings(config=None):
+    """Backend and device from config.json's "gl_context" section, overridden by the environment."""
+    if config is None:
+        try:
+            with open(CONFIG_PATH, 'r') as f:
+                config = json.load(f)
+        except (OSError, ValueError):
+            config = {}
+    settings = {**DEFAULT_SETTINGS, **config.get('gl_context', {})}
+
+    if os.environ.get('ONEOFF_GL_BACKEND'):
+        settings['backend'] = os.environ['ONEOFF_GL_BACKEND']
+    if os.environ.get('ONEOFF_GL_DEVICE'):
+        settings['device_index'] = int(os.environ['ONEOFF_GL_DEVICE'])
+    return settings
+
+
+def normalize_backend(backend):
+    """Canonical backend name; ValueError for unknown names."""
+    name = BACKEND_ALIASES.get(str(backend).lower(), str(backend).lower())
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown GL backend '{backend}' (expected one of: {', '.join(BACKENDS)})")
+    return name
+
+
+def use_software_gl():
+    """Ask Mesa for llvmpipe. Only affects drivers loaded after this call."""
+    os.environ['LIBGL_ALWAYS_SOFTWARE'] = '1'
+    os.environ.setdefault('GALLIUM_DRIVER', 'llvmpipe')
+
+
+def attempts_for(backend, device_index):
+    """(label, create_standalone_context kwargs) to try, in order."""
+    egl = ('egl', {'backend': 'egl', 'device_index': device_index})
+    x11 = ('x11', {'backend': 'x11'})
+    default = ('default', {})
+
+    if backend == 'egl':
+        return [egl]
+    if backend == 'x11':
+        return [x11]
+    if backend == 'default':
+        return [default]
+    if backend == 'software':
+        return [egl, x11] if sys.platform.startswith('linux') else [default]
+
+    # auto
+    if not sys.platform.startswith('linux'):
+        return [default]
+    if not os.environ.get('DISPLAY') and not os.environ.get('WAYLAND_DISPLAY'):
+        return [egl, default]
+    return [default, egl]
+
+
+def create_context(backend=None, device_index=None, config=None):
+    """Create a standalone GL context.
+
+    backend and device_index default to gl_settings(config). The chosen backend and
+    device are recorded in ctx.extra. Raises RuntimeError listing every attempt if
+    no context could be created.
+    """
+    settings = gl_settings(config)
+    backend = normalize_backend(backend or settings['backend'])
+    device_index = int(settings['device_index'] if device_index is None else device_index)
+
+    if backend == 'software':
+        use_software_gl()
+
+    errors = []
+    for label, kwargs in attempts_for(backend, device_index):
+        try:
+            ctx = moderngl.create_standalone_context(**kwargs)
+        except Exception as e:
+            errors.append(f"{label}: {e}")
+            continue
+        ctx.extra = {
+            'backend': label,
+            'requested_backend': backend,
+            'device_index': device_index if label == 'egl' else None,
+            'vram_budget_mb': settings.get('vram_budget_mb', 0)  # Read by gpu_resources.GpuResources
+        }
+        if errors:
+            logger.info(f"GL context created with {label} after: {'; '.join(errors)}")
+        return ctx
+
+    raise RuntimeError(f"Could not create a '{backend}' GL context ({'; '.join(errors)})")
+
+
+def timer_queries_supported(ctx):
+    """Whether GL time-elapsed queries work on ctx."""
+    try:
+        query = ctx.query(time=True)
+    except Exception:
+        return False
+    release = getattr(query, 'release', None)
+    if release:
+        release()
+    return True
+
+
+def capabilities(ctx):
+    """What a context is and what it can do, for logs and status reports."""
+    info = ctx.info
+    extra = ctx.extra if isinstance(ctx.extra, dict) else {}
+    renderer = info.get('GL_RENDERER', 'unknown')
+    return {
+        'backend': extra.get('backend'),
+        'device_index': extra.get('device_index'),
+        'vendor': info.get('GL_VENDOR', 'unknown'),
+        'renderer': renderer,
+        'version': info.get('GL_VERSION', 'unknown'),
+        'version_code': ctx.version_code,
+        'software': any(name in renderer.lower() for name in SOFTWARE_RENDERERS),
+        'max_texture_size': info.get('GL_MAX_TEXTURE_SIZE'),
+        'max_samples': info.get('GL_MAX_SAMPLES'),
+        'max_texture_units': info.get('GL_MAX_COMBINED_TEXTURE_IMAGE_UNITS'),
+        'timer_queries': timer_queries_supported(ctx)
+    }
+
+
+def describe(ctx):
+    """One log line: renderer, version and backend."""
+    report = capabilities(ctx)
+    device = f" device {report['device_index']}" if report['device_index'] is not None else ''
+    kind = ' (software)' if report['software'] else ''
+    return f"{report['renderer']}{kind}, OpenGL {report['version']} via {report['backend']}{device}"
+
+
+def list_egl_devices():
+    """[(device_index, renderer)] for every EGL device a context can be created on."""
+    devices = []
+    for device_index in range(MAX_EGL_DEVICES):
+        try:
+            ctx = moderngl.create_standalone_context(backend='egl', device_index=device_index)
+        except Exception:
+            break
+        devices.append((device_index, ctx.info.get('GL_RENDERER', 'unknown')))
+        ctx.release()
+    return devices
+
+
+def main():
+    """Print the capability report (or EGL devices)."""
+    parser = argparse.ArgumentParser(description='OneOffRender GL context report')
+    parser.add_argument('--backend', help=f"one of: {', '.join(BACKENDS)} (default: configured)")
+    parser.add_argument('--device', type=int, help='EGL device index (default: configured)')
+    parser.add_argument('--list-devices', action='store_true', help='list EGL devices and exit')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    args = parser.parse_args()
+
+    if args.list_devices:
+        devices = list_egl_devices()
+        if not devices:
+            print("No EGL devices found")
+            sys.exit(1)
+        for device_index, renderer in devices:
+            print(f"  {device_index}: {renderer}")
+        return
+
+    try:
+        ctx = create_context(args.backend, args.device)
+    except (RuntimeError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    report = capabilities(ctx)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for key, value in report.items():
+            print(f"  {key:<18} {value}")
+    ctx.release()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+OneOffRender GPU Resources
+Keeps VRAM use proportional to what is being rendered rather than to how many
+shaders were compiled: render targets are pooled and reused, buffer ping-pong
+targets exist only for the shaders in use, and shader textures are evicted
+least-recently-used first when a VRAM budget is set.
+
+The budget is "gl_context": {"vram_budget_mb": N} in config.json (0 = no limit).
+"""
+
+from texture_cache import TextureCache
+
+DTYPE_BYTES = {'f1': 1, 'f2': 2, 'f4': 4, 'u1': 1, 'u2': 2, 'u4': 4, 'i1': 1, 'i2': 2, 'i4': 4}
+
+# Shaders whose buffer targets stay allocated: the one on screen and the one
+# being transitioned to (or from)
+RESIDENT_SHADERS = 2
+
+
+def texture_bytes(texture):
+    """Approximate VRAM size of a texture or cubemap (mipmaps not counted)."""
+    width, height = texture.size
+    faces = 6 if type(texture).__name__ == 'TextureCube' else 1
+    return width * height * texture.components * DTYPE_BYTES.get(texture.dtype, 4) * faces
+
+
+class GpuResources:
+    """Render target pool and shader residency for one GL context.
+
+    use_shader() is called before a shader renders a frame: it allocates the
+    shader's buffer targets if needed (through the renderer's allocate callback),
+    reloads its textures if they were evicted, and marks it most recently used.
+    Only the RESIDENT_SHADERS most recent shaders keep buffer targets; older ones
+    hand theirs back to the pool, where the next shader of the same resolution
+    picks them up. When the budget is exceeded, idle pooled targets are freed
+    first, then the textures of the least recently used shaders (preloaded
+    shaders that haven't rendered yet count as least recently used).
+
+    Use for_context() to get the instance belonging to a context.
+    """
+
+    def __init__(self, ctx, budget_bytes=0, logger=None):
+        self.ctx = ctx
+        self.budget_bytes = budget_bytes
+        self.logger = logger
+        self.free_targets = {}   # (size, components, dtype) -> [(texture, fbo)]
+        self.target_bytes = 0    # All pooled targets, in use or free
+        self.shaders = {}        # id(shader_data) -> shader_data (insertion order = LRU first)
+        self.texture_sets = {}   # id(textures dict) -> {'textures', 'reload', 'release', 'evicted'} (LRU first)
+        self.over_budget_warned = False
+
+    @classmethod
+    def for_context(cls, ctx, logger=None):
+        """The instance stored with ctx (created on first use, budget from ctx.extra)."""
+        if not isinstance(ctx.extra, dict):
+            ctx.extra = {}
+        resources = ctx.extra.get('gpu_resources')
+        if resources is None:
+            budget_mb = float(ctx.extra.get('vram_budget_mb') or 0)
+            resources = ctx.extra['gpu_resources'] = cls(ctx, int(budget_mb * 1024 * 1024), logger)
+        if logger is not None and resources.logger is None:
+            resources.logger = logger
+        return resources
+
+    # Render targets
+
+    def acquire_target(self, size, components=4, dtype='f1'):
+        """A (texture, framebuffer) pair, reused from the pool when possible, cleared to zero.
+
+        Texture sampling is reset to ModernGL's defaults (linear, repeat).
+        """
+        spec = (tuple(size), components, dtype)
+        free = self.free_targets.get(spec)
+        if free:
+            texture, fbo = free.pop()
+        else:
+            texture = self.ctx.texture(spec[0], components, dtype=dtype)
+            fbo = self.ctx.framebuffer(color_attachments=[texture])
+            self.target_bytes += texture_bytes(texture)
+            self.trim()
+
+        texture.filter = (self.ctx.LINEAR, self.ctx.LINEAR)
+        texture.repeat_x = True
+        texture.repeat_y = True
+        fbo.clear(0.0, 0.0, 0.0, 0.0)
+        return texture, fbo
+
+    def release_target(self, texture, fbo):
+        """Return a pair from acquire_target() to the pool."""
+        spec = (tuple(texture.size), texture.components, texture.dtype)
+        self.free_targets.setdefault(spec, []).append((texture, fbo))
+        self.trim()
+
+    def release_idle(self):
+        """Free every pooled target not in use (end of a render on a long-lived context)."""
+        for free in self.free_targets.values():
+            for texture, fbo in free:
+                self.target_bytes -= texture_bytes(texture)
+                fbo.release()
+                texture.release()
+        self.free_targets.clear()
+
+    # Shader buffers and textures
+
+    def track_textures(self, textures, reload, release):
+        """Make a shader's textures dict evictable: release(texture) frees one, reload() rebuilds the dict.
+
+        Tracked sets count as used when tracked, so textures preloaded for shaders
+        that haven't rendered yet are the first to go.
+        """
+        self.texture_sets[id(textures)] = {'textures': textures, 'reload': reload, 'release': release, 'evicted': False}
+
+    def use_shader(self, shader_data, resolution, allocate):
+        """Make a shader ready to render a frame at resolution (see class docstring)."""
+        key = id(shader_data)
+        self.shaders.pop(key, None)
+        self.shaders[key] = shader_data  # Most recently used last
+
+        # Older shaders give their buffer targets back to the pool first, so this one can reuse them
+        for old in list(self.shaders.values())[:-RESIDENT_SHADERS]:
+            self.release_buffers(old)
+
+        buffers = shader_data.get('buffers') or {}
+        if any(buffer_data.get('texture_current') is None for buffer_data in buffers.values()):
+            allocate(shader_data, resolution)
+
+        texture_set = self.texture_sets.pop(id(shader_data.get('textures')), None)
+        if texture_set is not None:
+            self.texture_sets[id(texture_set['textures'])] = texture_set  # Most recently used last
+            if texture_set['evicted']:
+                self.reload_textures(texture_set)
+
+        self.trim()
+
+    def release_buffers(self, shader_data):
+        """Return a shader's buffer ping-pong targets to the pool (feedback state starts over next use)."""
+        for buffer_data in (shader_data.get('buffers') or {}).values():
+            for texture_key, fbo_key in (('texture_current', 'fbo_current'), ('texture_previous', 'fbo_previous')):
+                if buffer_data.get(texture_key) is not None:
+                    self.release_target(buffer_data[texture_key], buffer_data[fbo_key])
+                    buffer_data[texture_key] = None
+                    buffer_data[fbo_key] = None
+
+    def forget_shaders(self, compiled_shaders):
+        """Release the buffers and textures of shaders a finished render compiled, and stop tracking them."""
+        for shader_data in compiled_shaders.values():
+            self.release_buffers(shader_data)
+            self.shaders.pop(id(shader_data), None)
+            texture_set = self.texture_sets.pop(id(shader_data.get('textures')), None)
+            if texture_set is not None and not texture_set['evicted']:
+                self.evict_textures(texture_set)
+
+    def forget_all(self):
+        """forget_shaders() for everything tracked (between jobs on a long-lived context)."""
+        for shader_data in self.shaders.values():
+            self.release_buffers(shader_data)
+        for texture_set in self.texture_sets.values():
+            if not texture_set['evicted']:
+                self.evict_textures(texture_set)
+        self.shaders.clear()
+        self.texture_sets.clear()
+
+    def evict_textures(self, texture_set):
+        """Drop a shader's texture references (freed once no other shader uses them)."""
+        textures = texture_set['textures']
+        for texture in textures.values():
+            texture_set['release'](texture)
+        textures.clear()
+        texture_set['evicted'] = True
+
+    def reload_textures(self, texture_set):
+        loaded = texture_set['reload']()
+        self.texture_sets.pop(id(loaded), None)  # reload() tracks its own dict; keep tracking the original
+        texture_set['textures'].update(loaded)
+        texture_set['evicted'] = False
+
+    # Budget
+
+    def texture_cache_bytes(self):
+        entries = list(TextureCache.for_context(self.ctx).entries.values())  # stats() may run on another thread
+        return sum(texture_bytes(entry['texture']) for entry in entries)
+
+    def used_bytes(self):
+        """Pooled render targets plus cached textures and cubemaps."""
+        return self.target_bytes + self.texture_cache_bytes()
+
+    def trim(self):
+        """Free idle targets, then LRU shader textures, until within budget."""
+        if not self.budget_bytes or self.used_bytes() <= self.budget_bytes:
+            return
+
+        for spec in list(self.free_targets):
+            while self.free_targets[spec] and self.used_bytes() > self.budget_bytes:
+                texture, fbo = self.free_targets[spec].pop()
+                self.target_bytes -= texture_bytes(texture)
+                fbo.release()
+                texture.release()
+
+        # Never evict the shaders being rendered right now
+        active = {id(shader_data.get('textures')) for shader_data in list(self.shaders.values())[-RESIDENT_SHADERS:]}
+        for key, texture_set in list(self.texture_sets.items()):
+            if self.used_bytes() <= self.budget_bytes:
+                return
+            if key not in active and not texture_set['evicted'] and texture_set['textures']:
+                self.evict_textures(texture_set)
+
+        if self.used_bytes() > self.budget_bytes and not self.over_budget_warned and self.logger:
+            self.over_budget_warned = True
+            self.logger.warning(
+                f"GPU memory {self.used_bytes() / 1024 ** 2:.0f} MB exceeds the "
+                f"{self.budget_bytes / 1024 ** 2:.0f} MB budget with only active shaders resident"
+            )
+
+    def stats(self):
+        """Memory use in MB, for logs."""
+        return {
+            'budget_mb': round(self.budget_bytes / 1024 ** 2, 1),
+            'render_targets_mb': round(self.target_bytes / 1024 ** 2, 1),
+            'textures_mb': round(self.texture_cache_bytes() / 1024 ** 2, 1),
+            'idle_targets': sum(len(free) for free in list(self.free_targets.values())),
+            'resident_shaders': len(self.shaders)
+        }
@@ -16,8 +16,9 @@ import time
 from pathlib import Path
 import logging
 
-# Import the main renderer
-from render_shader import ShaderRenderer
+# Renders go to the warm render daemon when one is running
+from render_client import submit_render, print_event, RenderDaemonUnavailable
+from render_planner import estimate_shader_render, format_estimate
 
 def parse_duration(duration_str):
     """Parse duration string into seconds. Supports '30' or '01:30' format."""
@@ -183,30 +184,46 @@ def main():
         # Create single shader config with all required paths
         config = create_single_shader_config(base_config, duration_seconds, shader_path, audio_path, output_path)
 
+        print(f"Estimate: {format_estimate(estimate_shader_render(config, duration_seconds, shader_path))}")
+        print()
+
         # Write temporary config file
         temp_config_path = "oneoff_temp_config.json"
         with open(temp_config_path, 'w') as f:
             json.dump(config, f, indent=2)
 
-        # Initialize renderer with temporary config
-        renderer = ShaderRenderer(temp_config_path)
-
         # Start rendering
         print("Starting single shader render...")
         start_time = time.time()
 
         try:
-            # Use the single file rendering method but force single shader mode
-            success = renderer.render_single_shader_file(
-                str(shader_path),
-                str(audio_path),
-                str(output_path)
-            )
-        except Exception as e:
-            print(f"Error during rendering: {e}")
-            import traceback
-            traceback.print_exc()
-            success = False
+            result = submit_render({
+                'type': 'shader',
+                'config': temp_config_path,
+                'shader': str(shader_path),
+                'audio': str(audio_path),
+                'output': str(output_path)
+            }, on_event=print_event)
+            success = result['code'] == 0
+        except RenderDaemonUnavailable:
+            # No daemon: render in this process
+            from render_shader import ShaderRenderer
+
+            # Initialize renderer with temporary config
+            renderer = ShaderRenderer(temp_config_path)
+
+            try:
+                # Use the single file rendering method but force single shader mode
+                success = renderer.render_single_shader_file(
+                    str(shader_path),
+                    str(audio_path),
+                    str(output_path)
+                )
+            except Exception as e:
+                print(f"Error during rendering: {e}")
+                import traceback
+                traceback.print_exc()
+                success = False
 
         end_time = time.time()
         render_time = end_time - start_time
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+OneOffRender Render Daemon Client
+Submits jobs to render_daemon.py and streams their events back.
+Used by oneoff.py and render_shader.py, which render locally when no daemon is running.
+Standard library only, so submitting a job doesn't pay for the renderer's imports.
+"""
+
+import os
+import sys
+import json
+import socket
+import secrets
+from pathlib import Path
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 47291
+
+# The daemon only renders inside this directory, for clients that can read its token
+PROJECT_DIR = Path(__file__).resolve().parent
+TOKEN_PATH = PROJECT_DIR / 'Cache' / 'render_daemon.token'
+
+
+def load_daemon_settings(config_path='config.json'):
+    """The "render_daemon" section of config.json (defaults if missing)."""
+    settings = {'enabled': False, 'host': DEFAULT_HOST, 'port': DEFAULT_PORT}
+    try:
+        with open(config_path, 'r') as f:
+            settings.update(json.load(f).get('render_daemon', {}))
+    except (OSError, ValueError):
+        pass
+    return settings
+
+
+def write_token():
+    """Create a new daemon token in Cache/render_daemon.token, readable only by this user."""
+    token = secrets.token_hex(32)
+    TOKEN_PATH.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = TOKEN_PATH.with_suffix('.tmp')
+    if temp_path.exists():
+        temp_path.unlink()
+    # Mode 0600 on POSIX; on Windows the file is only as private as the Cache folder
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, 'w') as f:
+        f.write(token)
+    os.replace(temp_path, TOKEN_PATH)
+    return token
+
+
+def read_token():
+    """The running daemon's token, or None if there is none."""
+    try:
+        return TOKEN_PATH.read_text().strip() or None
+    except OSError:
+        return None
+
+
+class RenderDaemonUnavailable(Exception):
+    """No render daemon is running (or it is disabled in config.json)."""
+
+
+def submit_render(request, on_event=None, config_path='config.json', connect_timeout=1.0):
+    """Run a job on the render daemon, calling on_event(event) for each event.
+
+    Paths in the request are resolved against the current directory; it and the
+    outputs must be inside the project directory. Returns the final "exit" event
+    ({"code": 0} on success). Raises RenderDaemonUnavailable if the daemon can't
+    be reached; interrupting (Ctrl+C) cancels the job.
+    """
+    settings = load_daemon_settings(config_path)
+    if not settings.get('enabled', False):
+        raise RenderDaemonUnavailable("Render daemon disabled in config.json")
+    token = read_token()
+    if token is None:
+        raise RenderDaemonUnavailable("No render daemon token")
+
+    try:
+        connection = socket.create_connection((settings['host'], int(settings['port'])), timeout=connect_timeout)
+    except OSError as e:
+        raise RenderDaemonUnavailable(str(e))
+
+    connection.settimeout(None)
+    request = dict(request, cwd=os.getcwd(), token=token)
+
+    with connection, connection.makefile('rb') as events:
+        connection.sendall((json.dumps(request) + '\n').encode('utf-8'))
+        for line in events:
+            event = json.loads(line)
+            if event['event'] == 'exit':
+                return event
+            if on_event is not None:
+                on_event(event)
+
+    return {'event': 'exit', 'code': 1, 'error': 'Render daemon closed the connection'}
+
+
+def print_event(event):
+    """Default on_event for command-line tools: show the daemon's log lines."""
+    if event['event'] == 'log':
+        print(event['message'], file=sys.stderr, flush=True)
+    elif event['event'] == 'accepted':
+        print(f"Render daemon: job {event['job']} accepted (position {event['position']})", flush=True)
+    elif event['event'] == 'failed':
+        print(f"Render failed: {event.get('error')}", file=sys.stderr, flush=True)
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+OneOffRender Render Daemon
+Long-running local render server shared by the web editor, oneoff.py and render_shader.py.
+
+Keeps the GL context, compiled shaders and audio analysis warm between jobs
+(render_resources.py), so a render no longer pays Python startup, librosa
+import, context creation and shader compilation every time. Textures are
+re-uploaded per job from the decoded-pixel cache (texture_cache.py).
+
+Usage: python render_daemon.py
+Listens on the host/port in the "render_daemon" section of config.json
+(default 127.0.0.1:47291). Jobs run one at a time in submission order.
+
+Every request carries the token the daemon writes to Cache/render_daemon.token
+on startup (readable only by the user running it); requests without it are
+refused. Jobs run with the client's directory as the working directory, which
+must be inside the project directory, and may only write videos inside it.
+
+Protocol (newline-delimited JSON over TCP), one job per connection:
+    -> {"type": "timeline", "manifest": "<path>", "cwd": "<dir>", "token": "..."}
+    -> {"type": "shader", "config": "<path>", "cwd": "<dir>", "token": ...}   (render_shader.py run)
+    -> {"type": "shader", "config": "<path>", "shader": ..., "audio": ..., "output": ..., "cwd": ..., "token": ...}
+    -> {"type": "status", "token": ...}
+    <- {"event": "accepted", "job": id, "position": n}
+    <- {"event": "log", "level": "INFO", "message": "..."}   (renderer log lines)
+    <- {"event": "progress" | "completed" | "failed", ...}    (same fields as render_timeline.py events)
+    <- {"event": "exit", "code": 0 | 1, "cancelled": bool}   (always last)
+Closing the connection (or sending {"type": "cancel"}) cancels the job. Timeline
+renders stop at their next progress event; shader renders finish first.
+"""
+
+import os
+import sys
+import hmac
+import json
+import time
+import queue
+import logging
+import itertools
+import threading
+import socketserver
+from pathlib import Path
+
+from render_timeline import TimelineRenderer
+from render_shader import ShaderRenderer
+from render_resources import RenderResources, WarmRendererMixin
+from render_client import DEFAULT_HOST, DEFAULT_PORT, PROJECT_DIR, TOKEN_PATH, load_daemon_settings, write_token
+from gl_context import describe
+from gpu_resources import GpuResources
+
+logger = logging.getLogger('render_daemon')
+
+
+class RenderCancelled(Exception):
+    """The client of a running job went away or asked to cancel."""
+
+
+def project_path(path):
+    """Resolve a job path; raises PermissionError if it is outside the project directory."""
+    resolved = Path(path).resolve()
+    if resolved != PROJECT_DIR and PROJECT_DIR not in resolved.parents:
+        raise PermissionError(f"{path} is outside the project directory ({PROJECT_DIR})")
+    return resolved
+
+
+class DaemonJob:
+    """One submitted job and the connection its events go back on."""
+
+    def __init__(self, job_id, request, connection):
+        self.id = job_id
+        self.request = request
+        self.connection = connection
+        self.send_lock = threading.Lock()
+        self.cancelled = threading.Event()
+        self.done = threading.Event()
+
+    def send(self, event, **fields):
+        """Send one event line to the client; a dead connection cancels the job."""
+        fields['event'] = event
+        line = (json.dumps(fields) + '\n').encode('utf-8')
+        try:
+            with self.send_lock:
+                self.connection.sendall(line)
+            return True
+        except OSError:
+            self.cancelled.set()
+            return False
+
+
+class JobLogHandler(logging.Handler):
+    """Forwards renderer log records to the job's client as log events."""
+
+    def __init__(self, job):
+        super().__init__()
+        self.job = job
+        self.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s', datefmt='%H:%M:%S'))
+
+    def emit(self, record):
+        self.job.send('log', level=record.levelname, message=self.format(record))
+
+
+class DaemonTimelineRenderer(WarmRendererMixin, TimelineRenderer):
+    """TimelineRenderer that reports to a daemon job and uses the warm resources."""
+
+    def __init__(self, manifest_path, job, resources):
+        self.job = job
+        self.resources = resources
+        super().__init__(manifest_path)
+
+    def emit_event(self, event, **fields):
+        """Send events to the client instead of stdout; stop if the job was cancelled."""
+        if self.job.cancelled.is_set():
+            if event == 'failed':
+                return  # Reported as cancelled instead
+            raise RenderCancelled()
+        self.job.send(event, **fields)
+
+    def get_output_path(self):
+        """The manifest's output path, as long as it stays inside the project."""
+        return project_path(super().get_output_path())
+
+    def load_audio(self, audio_path):
+        """Audio analysis from memory when the same track was rendered recently."""
+        key = (
+            str(Path(audio_path).resolve()), Path(audio_path).stat().st_mtime_ns,
+            self.manifest['timeline']['duration'], self.get_frame_rate(), 'global'
+        )
+        return self.resources.cached_audio(
+            key, lambda: super(DaemonTimelineRenderer, self).load_audio(audio_path)
+        )
+
+
+class DaemonShaderRenderer(WarmRendererMixin, ShaderRenderer):
+    """ShaderRenderer that uses the warm resources (logs reach the client via JobLogHandler)."""
+
+    def __init__(self, config_path, resources):
+        self.resources = resources
+        super().__init__(config_path)
+        if self.output_path is not None:
+            project_path(self.output_path)
+
+    def generate_output_path(self, audio_file):
+        """Batch output path, as long as the configured directory is inside the project."""
+        return project_path(super().generate_output_path(audio_file))
+
+    def analyze_audio(self, duration):
+        """Audio analysis from memory when the same track was rendered recently."""
+        audio_path = Path(self.audio_path)
+        key = (
+            str(audio_path.resolve()), audio_path.stat().st_mtime_ns,
+            duration, self.config['output']['frame_rate'], 'per_bin'
+        )
+        return self.resources.cached_audio(
+            key, lambda: super(DaemonShaderRenderer, self).analyze_audio(duration)
+        )
+
+
+class RenderDaemon:
+    """Accepts jobs over TCP and runs them one at a time on a single GL thread."""
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.host = host
+        self.port = port
+        self.token = None
+        self.jobs = queue.Queue()
+        self.job_ids = itertools.count(1)
+        self.running = None
+        self.completed_jobs = 0
+        self.started_at = time.time()
+        self.resources = None
+        self.ready = threading.Event()
+        self.startup_error = None
+
+    def submit(self, request, connection):
+        """Queue a job; returns (job, position in line including the running job)."""
+        job = DaemonJob(next(self.job_ids), request, connection)
+        position = self.jobs.qsize() + (1 if self.running else 0) + 1
+        self.jobs.put(job)
+        return job, position
+
+    def authorized(self, request):
+        """Whether a request carries this daemon's token."""
+        token = request.get('token')
+        if not isinstance(token, str) or self.token is None:
+            return False
+        return hmac.compare_digest(token.encode('utf-8'), self.token.encode('utf-8'))
+
+    def status(self):
+        """Daemon state for {"type": "status"} requests."""
+        return {
+            'running': self.running.id if self.running else None,
+            'queued': self.jobs.qsize(),
+            'completed_jobs': self.completed_jobs,
+            'uptime': round(time.time() - self.started_at, 1),
+            'resources': self.resources.stats() if self.resources else None
+        }
+
+    def render_loop(self):
+        """Render thread: owns the GL context and runs jobs in order."""
+        try:
+            self.resources = RenderResources()
+        except Exception as e:
+            self.startup_error = e
+            self.ready.set()
+            return
+        self.ready.set()
+        logger.info(f"GL context ready: {describe(self.resources.ctx)}")
+
+        while True:
+            job = self.jobs.get()
+            if job.cancelled.is_set():
+                job.send('exit', code=1, cancelled=True)
+                job.done.set()
+                continue
+
+            self.running = job
+            try:
+                code = self.run_job(job)
+            finally:
+                self.running = None
+                self.completed_jobs += 1
+
+            job.send('exit', code=code, cancelled=job.cancelled.is_set())
+            job.done.set()
+
+    def run_job(self, job):
+        """Run one job with its logs forwarded to the client; returns an exit code."""
+        request = job.request
+        started = time.time()
+        logger.info(f"Job {job.id}: {request.get('type')} started")
+
+        handler = JobLogHandler(job)
+        logging.getLogger().addHandler(handler)
+        previous_cwd = os.getcwd()
+        try:
+            # Relative paths in manifests and configs are relative to the client
+            os.chdir(project_path(request.get('cwd') or PROJECT_DIR))
+
+            if request.get('type') == 'timeline':
+                renderer = DaemonTimelineRenderer(project_path(request['manifest']), job, self.resources)
+                success = renderer.render() is not None
+            elif request.get('type') == 'shader':
+                success = self.run_shader_job(job)
+            else:
+                raise ValueError(f"Unknown job type: {request.get('type')}")
+            return 0 if success and not job.cancelled.is_set() else 1
+
+        except RenderCancelled:
+            return 1
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {e}")
+            job.send('failed', error=str(e))
+            return 1
+        finally:
+            # Free this job's textures and hand its buffer targets back to the pool
+            GpuResources.for_context(self.resources.ctx).forget_all()
+            self.resources.trim()
+            os.chdir(previous_cwd)
+            logging.getLogger().removeHandler(handler)
+            status = 'cancelled' if job.cancelled.is_set() else 'finished'
+            logger.info(f"Job {job.id}: {status} in {time.time() - started:.1f}s")
+
+    def run_shader_job(self, job):
+        """render_shader.py job: a config run, or one shader (oneoff.py) if "shader" is given."""
+        request = job.request
+        renderer = DaemonShaderRenderer(project_path(request['config']), self.resources)
+
+        if request.get('shader'):
+            output = str(project_path(request['output']))
+            success = renderer.render_single_shader_file(request['shader'], request['audio'], output)
+        else:
+            output = None
+            success = renderer.run()
+
+        if success:
+            job.send('completed', progress=100.0, output=output)
+        else:
+            job.send('failed', error='Shader render failed (see log)')
+        return success
+
+    def serve_forever(self):
+        """Start the render thread and accept connections until interrupted."""
+        threading.Thread(target=self.render_loop, name='render-daemon-gl', daemon=True).start()
+        if not self.ready.wait(30):
+            raise RuntimeError("Could not create the GL context")
+        if self.startup_error:
+            raise RuntimeError(f"Could not create the GL context: {self.startup_error}")
+
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                line = self.rfile.readline()
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    request = None
+                if not isinstance(request, dict):
+                    self.wfile.write(b'{"event": "exit", "code": 1, "error": "Bad request"}\n')
+                    return
+                if not daemon.authorized(request):
+                    self.wfile.write(b'{"event": "exit", "code": 1, "error": "Unauthorized"}\n')
+                    return
+
+                if request.get('type') == 'status':
+                    self.wfile.write((json.dumps({'event': 'status', **daemon.status()}) + '\n').encode('utf-8'))
+                    return
+
+                job, position = daemon.submit(request, self.connection)
+                job.send('accepted', job=job.id, position=position)
+
+                # The client only writes again to cancel; EOF means it went away
+                while not job.done.is_set():
+                    line = self.rfile.readline()
+                    if not line or b'"cancel"' in line:
+                        break
+                if not job.done.is_set():
+                    job.cancelled.set()
+                    job.done.wait()
+
+        class Server(socketserver.ThreadingTCPServer):
+            daemon_threads = True
+            allow_reuse_address = sys.platform != 'win32'
+
+        with Server((self.host, self.port), Handler) as server:
+            self.token = write_token()
+            try:
+                logger.info(f"Render daemon listening on {self.host}:{self.port} (token in {TOKEN_PATH})")
+                server.serve_forever()
+            finally:
+                TOKEN_PATH.unlink(missing_ok=True)
+
+
+def main():
+    """Main entry point."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        datefmt='%H:%M:%S'
+    )
+    settings = load_daemon_settings()
+
+    try:
+        RenderDaemon(settings['host'], int(settings['port'])).serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Render daemon stopped")
+    except OSError as e:
+        print(f"Could not start render daemon on {settings['host']}:{settings['port']}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
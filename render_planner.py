@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+OneOffRender Render Planner
+Estimates how long a render will take and what it needs before it starts.
+
+Takes a timeline manifest (render_timeline.py) or a render_shader.py config and
+the per-shader cost data in Shaders/metadata.json (shader_benchmark.py), and
+returns GPU time, encode time, total wall time, peak scratch disk and peak
+memory. Standard library only, so it is cheap to run before every render.
+
+The encode, green screen and memory figures come from the rough per-megapixel
+rates below; shader times are as good as the benchmark data. Shaders without
+cost data count as the median benchmarked shader and are listed in
+"unknown_shaders".
+
+Usage:
+    python render_planner.py <manifest.json>          timeline render (or - for stdin)
+    python render_planner.py config.json --duration 90 [--shader NAME]
+Prints the estimate as JSON.
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+
+from shader_costs import METADATA_PATH, ShaderCosts, load_shader_costs
+
+# Used when no shader has been benchmarked yet
+FALLBACK_FRAME_MS_PER_MPIXEL = 6.0
+# Transition pass (two input textures, one blend) and black gap frames
+TRANSITION_MS_PER_MPIXEL = 1.0
+BLACK_FRAME_MS_PER_MPIXEL = 0.8
+# Green screen key + overlay filter chain, run by the encoder (rough; bench_greenscreen
+# measures it). Layer 0 decoding runs on a feed thread and is hidden
+GREENSCREEN_MS_PER_MPIXEL = 9.0
+# libx264 wall time per frame megapixel, by preset
+ENCODE_MS_PER_MPIXEL = {
+    'ultrafast': 1.0, 'superfast': 1.4, 'veryfast': 2.0, 'faster': 3.0, 'fast': 4.0,
+    'medium': 5.0, 'slow': 9.0, 'slower': 18.0, 'veryslow': 36.0
+}
+# librosa decode + STFT, seconds per second of audio (skipped when the analysis is cached)
+AUDIO_ANALYSIS_RATIO = 0.04
+AUDIO_SAMPLE_RATE = 44100
+# Interpreter with numpy, librosa and moderngl loaded
+BASE_PROCESS_BYTES = 350 * 1024 ** 2
+
+
+def shader_name(name):
+    """Metadata name of a shader (timeline elements may leave out .glsl)."""
+    return name if name.lower().endswith('.glsl') else f"{name}.glsl"
+
+
+def encode_ms(preset, megapixels):
+    return ENCODE_MS_PER_MPIXEL.get(preset, ENCODE_MS_PER_MPIXEL['medium']) * megapixels
+
+
+def audio_memory_bytes(duration, frames):
+    """Decoded samples, STFT (complex64) and the per-frame features of analyze_audio."""
+    samples = duration * AUDIO_SAMPLE_RATE * 4
+    stft = 513 * (frames + 1) * 8
+    features = 512 * frames * 4 * 2 + 256 * frames * 4
+    return int(samples + stft + features)
+
+
+class RenderPlan:
+    """Accumulates the frames of one render and turns them into an estimate."""
+
+    def __init__(self, width, height, frame_rate, duration, metadata_path=METADATA_PATH):
+        self.width = width
+        self.height = height
+        self.frame_rate = frame_rate
+        self.duration = duration
+        self.frames = int(duration * frame_rate)
+        self.megapixels = width * height / 1e6
+        self.cost_entries = load_shader_costs(metadata_path)
+        self.costs = ShaderCosts(self.cost_entries, width, height)
+        self.gpu_ms = 0.0
+        self.shader_ms = {}
+        self.shaders_used = set()
+        self.unknown = set()
+
+    def frame_ms(self, name):
+        """Predicted ms/frame of a shader at this resolution."""
+        if not self.costs.known(name):
+            self.unknown.add(name)
+        frame_ms = self.costs.frame_ms(name)
+        return frame_ms if frame_ms is not None else FALLBACK_FRAME_MS_PER_MPIXEL * self.megapixels
+
+    def add_frames(self, label, frame_ms, frames):
+        self.shader_ms[label] = self.shader_ms.get(label, 0.0) + frame_ms * frames
+        self.gpu_ms += frame_ms * frames
+
+    def add_shader(self, name, frames):
+        self.shaders_used.add(name)
+        self.add_frames(name, self.frame_ms(name), frames)
+
+    def add_transition(self, from_name, to_name, frames):
+        """Both shaders are drawn on every transition frame, then blended."""
+        for name in (from_name, to_name):
+            if name:
+                self.add_shader(name, frames)
+        self.gpu_ms += TRANSITION_MS_PER_MPIXEL * self.megapixels * frames
+
+    def add_black(self, frames):
+        self.gpu_ms += BLACK_FRAME_MS_PER_MPIXEL * self.megapixels * frames
+
+    def estimate(self, preset, streaming, greenscreen_frames=0, buffers=0, scratch_bytes=0):
+        """The estimate dict (times in seconds, sizes in bytes).
+
+        streaming: frames are piped into the encoder (timeline renders), so
+        rendering and encoding overlap instead of running one after the other.
+        """
+        gpu_seconds = self.gpu_ms / 1000.0
+        greenscreen_seconds = GREENSCREEN_MS_PER_MPIXEL * self.megapixels * greenscreen_frames / 1000.0
+        encode_seconds = encode_ms(preset, self.megapixels) * self.frames / 1000.0
+        compile_seconds = sum(
+            self.cost_entries.get(name, {}).get('compile_ms', 0.0) for name in self.shaders_used
+        ) / 1000.0
+        audio_seconds = AUDIO_ANALYSIS_RATIO * self.duration if self.shaders_used else 0.0
+
+        render_seconds = gpu_seconds
+        encoder_seconds = encode_seconds + greenscreen_seconds  # The encoder keys Layer 0 too
+        if streaming:
+            pipeline_seconds = max(render_seconds, encoder_seconds)
+        else:
+            pipeline_seconds = render_seconds + encoder_seconds
+        total_seconds = audio_seconds + compile_seconds + pipeline_seconds
+
+        frame_bytes = self.width * self.height * 3
+        # Per multipass buffer: two half-float RGBA ping-pong textures
+        gpu_memory = self.width * self.height * 4 * (1 + buffers * 2 * 2)
+        # Readback, flipped copy and (with green screen) decoded and normalised Layer 0 frames
+        frame_copies = 3 + (2 if greenscreen_frames else 0)
+        peak_memory = BASE_PROCESS_BYTES + audio_memory_bytes(self.duration, self.frames) + frame_bytes * frame_copies
+
+        return {
+            'frames': self.frames,
+            'duration': round(self.duration, 3),
+            'resolution': f"{self.width}x{self.height}",
+            'frame_rate': self.frame_rate,
+            'gpu_seconds': round(gpu_seconds, 1),
+            'greenscreen_seconds': round(greenscreen_seconds, 1),
+            'encode_seconds': round(encode_seconds, 1),
+            'compile_seconds': round(compile_seconds, 1),
+            'audio_seconds': round(audio_seconds, 1),
+            'total_seconds': round(total_seconds, 1),
+            'realtime_factor': round(self.duration / total_seconds, 2) if total_seconds > 0 else None,
+            'bottleneck': 'encode' if encoder_seconds > render_seconds else 'render',
+            'scratch_bytes': int(scratch_bytes),
+            'peak_memory_bytes': int(peak_memory),
+            'gpu_memory_bytes': int(gpu_memory),
+            'shaders': {
+                name: round(ms / 1000.0, 1)
+                for name, ms in sorted(self.shader_ms.items(), key=lambda item: -item[1])
+            },
+            'unknown_shaders': sorted(self.unknown)
+        }
+
+
+def count_buffers(names, metadata_path):
+    """Number of multipass buffers across the shaders (files named <shader>.buffer.X.glsl)."""
+    shaders_dir = Path(metadata_path).parent
+    return sum(
+        1 for name in names for buffer_id in 'ABCD'
+        if (shaders_dir / f"{Path(name).stem}.buffer.{buffer_id}.glsl").exists()
+    )
+
+
+def estimate_timeline(manifest, metadata_path=METADATA_PATH):
+    """Estimate a render_timeline.py render of a manifest."""
+    resolution = manifest.get('resolution', {'width': 2560, 'height': 1440})
+    width, height = resolution['width'], resolution['height']
+    frame_rate = manifest.get('frame_rate', 30)
+    duration = manifest['timeline']['duration']
+    encoding = {'crf': 18, 'preset': 'medium', **manifest.get('encoding', {})}
+
+    plan = RenderPlan(width, height, frame_rate, duration, metadata_path)
+
+    elements = sorted(manifest['timeline'].get('elements', []), key=lambda el: el['startTime'])
+    layer1 = [el for el in elements if el.get('layer') == 1]
+    shaders = [el for el in layer1 if el.get('type') == 'shader']
+
+    covered = 0
+    for el in layer1:
+        frames = max(0, int(round((el['endTime'] - el['startTime']) * frame_rate)))
+        covered += frames
+        if el.get('type') == 'shader':
+            plan.add_shader(shader_name(el['name']), frames)
+        elif el.get('type') == 'transition':
+            before = [s for s in shaders if s['endTime'] <= el['startTime']]
+            after = [s for s in shaders if s['startTime'] >= el['endTime']]
+            plan.add_transition(
+                shader_name(before[-1]['name']) if before else None,
+                shader_name(after[0]['name']) if after else None,
+                frames
+            )
+    plan.add_black(max(0, plan.frames - covered))
+
+    greenscreen_frames = sum(
+        max(0, int(round((el['endTime'] - el['startTime']) * frame_rate)))
+        for el in elements if el.get('layer') == 0
+    )
+    return plan.estimate(
+        encoding['preset'], streaming=True,
+        greenscreen_frames=min(greenscreen_frames, plan.frames),
+        buffers=count_buffers(plan.shaders_used, metadata_path)
+    )
+
+
+def estimate_shader_render(config, duration, shader=None, metadata_path=METADATA_PATH):
+    """Estimate a render_shader.py render: one shader (oneoff.py) or the batch rotation.
+
+    The batch rotation is costed as the mean of all shaders in metadata.json,
+    all of which are compiled up front.
+    """
+    output = config.get('output', {})
+    width = output.get('resolution', {}).get('width', 1920)
+    height = output.get('resolution', {}).get('height', 1080)
+    frame_rate = output.get('frame_rate', 30)
+    preset = config.get('rendering', {}).get('quality', {}).get('preset', 'medium')
+
+    plan = RenderPlan(width, height, frame_rate, duration, metadata_path)
+
+    if shader:
+        names = [shader_name(Path(shader).name)]
+        plan.add_shader(names[0], plan.frames)
+    else:
+        try:
+            with open(metadata_path, 'r') as f:
+                names = [entry['name'] for entry in json.load(f)]
+        except (OSError, ValueError):
+            names = []
+        frame_ms = [plan.frame_ms(name) for name in names] or [FALLBACK_FRAME_MS_PER_MPIXEL * plan.megapixels]
+        plan.shaders_used.update(names)
+        plan.add_frames('shader rotation', sum(frame_ms) / len(frame_ms), plan.frames)
+
+    # Frames go to a raw file that is encoded afterwards
+    return plan.estimate(
+        preset, streaming=False,
+        buffers=count_buffers(names, metadata_path) if shader else 0,
+        scratch_bytes=width * height * 3 * plan.frames
+    )
+
+
+def format_estimate(estimate):
+    """One-line summary of an estimate for logs and the command line."""
+    return (
+        f"~{estimate['total_seconds']:.0f}s for {estimate['duration']:.0f}s of video "
+        f"({estimate['resolution']} @ {estimate['frame_rate']}fps; GPU {estimate['gpu_seconds']:.0f}s, "
+        f"encode {estimate['encode_seconds']:.0f}s, peak memory {estimate['peak_memory_bytes'] / 1024 ** 2:.0f} MB, "
+        f"scratch {estimate['scratch_bytes'] / 1024 ** 2:.0f} MB)"
+    )
+
+
+def main():
+    """Print the estimate for a manifest or config as JSON."""
+    parser = argparse.ArgumentParser(description='Estimate render time, disk and memory before rendering')
+    parser.add_argument('path', help='timeline manifest or render config (- reads stdin)')
+    parser.add_argument('--duration', type=float, help='seconds of video (config renders)')
+    parser.add_argument('--shader', help='single shader (oneoff.py renders)')
+    parser.add_argument('--metadata', default=str(METADATA_PATH), help='shader metadata with cost data')
+    args = parser.parse_args()
+
+    try:
+        data = json.load(sys.stdin) if args.path == '-' else json.loads(Path(args.path).read_text())
+        if 'timeline' in data:
+            estimate = estimate_timeline(data, args.metadata)
+        elif args.duration:
+            estimate = estimate_shader_render(data, args.duration, args.shader, args.metadata)
+        else:
+            raise ValueError('config renders need --duration')
+    except (OSError, ValueError, KeyError) as e:
+        print(json.dumps({'error': str(e)}))
+        sys.exit(1)
+
+    print(json.dumps(estimate, indent=2))
+
+
+if __name__ == "__main__":
+    main()
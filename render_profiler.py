@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+OneOffRender Render Profiler
+Per-stage timing for render_shader.py and render_timeline.py, written as a JSON report per render.
+
+Stages used by the renderers:
+    audio_decode, audio_stft, audio_cache_load   audio analysis (audio_analysis.py)
+    shader_compile, texture_load                  setup on the GL context
+    frame_draw                                    uniforms, audio texture and draw calls
+    frame_readback                                fbo.read (waits for the GPU to finish the frame)
+    frame_write                                   raw frame into the encoder pipe / raw file
+    encode                                        FFmpeg time not overlapped with rendering
+
+Stages nest: "seconds" is a stage's own time with nested stages taken out,
+"inclusive" includes them. Draw calls return before the GPU finishes, so most
+GPU time shows up in frame_readback.
+
+With GPU timers enabled ("profiling": {"gpu_timers": true} in config.json) the
+report also has a "gpu" section: mean/p95/max GPU milliseconds per shader and
+pass (buffer A-D, image, transition), measured with GL time-elapsed queries.
+
+Reports go to Cache/render_profiles/ unless the caller gives a path.
+"""
+
+import json
+import time
+import functools
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from pathlib import Path
+
+PROFILE_DIR = Path('Cache') / 'render_profiles'
+REPORT_VERSION = 1
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+
+class GpuTimer:
+    """GL time-elapsed queries around individual draw passes, grouped by shader and pass.
+
+    Queries can't nest, so passes are measured one at a time. Results are read
+    in collect() after the frame's readback, when the GPU has already finished
+    the passes, so reading them adds no stall of its own.
+    """
+
+    def __init__(self, ctx):
+        self.ctx = ctx
+        self.free = []      # finished queries ready for reuse
+        self.pending = []   # (shader, pass, query) not read yet
+        self.samples = {}   # shader -> pass -> [milliseconds]
+
+    @contextmanager
+    def measure(self, shader, pass_name):
+        """Time the GPU work of the draw calls in the enclosed block."""
+        query = self.free.pop() if self.free else self.ctx.query(time=True)
+        with query:
+            yield
+        self.pending.append((shader, pass_name, query))
+
+    def collect(self):
+        """Read the finished queries of the current frame."""
+        for shader, pass_name, query in self.pending:
+            self.samples.setdefault(shader, {}).setdefault(pass_name, []).append(query.elapsed / 1e6)
+            self.free.append(query)
+        self.pending = []
+
+    def report(self):
+        """{shader: {pass: {'count', 'total_ms', 'mean_ms', 'p95_ms', 'max_ms'}}}, costliest shader first."""
+        self.collect()
+        shaders = {}
+        for shader, passes in self.samples.items():
+            shaders[shader] = {
+                pass_name: {
+                    'count': len(values),
+                    'total_ms': round(sum(values), 3),
+                    'mean_ms': round(sum(values) / len(values), 4),
+                    'p95_ms': round(percentile(values, 0.95), 4),
+                    'max_ms': round(max(values), 4)
+                }
+                for pass_name, values in sorted(passes.items())
+            }
+        return dict(sorted(
+            shaders.items(), key=lambda item: -sum(p['total_ms'] for p in item[1].values())
+        ))
+
+    def release(self):
+        """Free the query objects (the context may outlive this render)."""
+        self.collect()
+        for query in self.free:
+            release = getattr(query, 'release', None)  # Older moderngl has no Query.release
+            if release:
+                release()
+        self.free = []
+
+
+class RenderProfiler:
+    """Accumulates wall time per named stage for one render (single thread)."""
+
+    def __init__(self):
+        self.stages = {}  # name -> {'seconds', 'inclusive', 'count', 'max'}
+        self.stack = []   # time spent in nested stages, per open stage
+        self.info = {}    # extra fields for the report (inputs, outputs)
+        self.gpu_timer = None
+        self.started = time.perf_counter()
+
+    def enable_gpu_timers(self, ctx):
+        """Start collecting per-pass GPU times on ctx."""
+        if self.gpu_timer is None:
+            self.gpu_timer = GpuTimer(ctx)
+
+    def gpu(self, shader, pass_name):
+        """Context manager timing one draw pass on the GPU (no-op unless GPU timers are on)."""
+        if self.gpu_timer is None:
+            return nullcontext()
+        return self.gpu_timer.measure(shader, pass_name)
+
+    def collect_gpu(self):
+        """Read this frame's GPU timings (call after the frame has been read back)."""
+        if self.gpu_timer is not None:
+            self.gpu_timer.collect()
+
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed block as one occurrence of stage name."""
+        start = time.perf_counter()
+        self.stack.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = self.stack.pop()
+            if self.stack:
+                self.stack[-1] += elapsed
+            self.add(name, elapsed, elapsed - nested)
+
+    def add(self, name, inclusive, seconds=None):
+        """Record one occurrence of a stage timed elsewhere."""
+        seconds = inclusive if seconds is None else seconds
+        entry = self.stages.get(name)
+        if entry is None:
+            entry = self.stages[name] = {'seconds': 0.0, 'inclusive': 0.0, 'count': 0, 'max': 0.0}
+        entry['seconds'] += seconds
+        entry['inclusive'] += inclusive
+        entry['count'] += 1
+        entry['max'] = max(entry['max'], inclusive)
+
+    def report(self, **info):
+        """Machine-readable report: stage totals, per-call averages and share of wall time."""
+        wall_time = time.perf_counter() - self.started
+        stages = {}
+        for name, entry in sorted(self.stages.items(), key=lambda item: -item[1]['seconds']):
+            stages[name] = {
+                'seconds': round(entry['seconds'], 4),
+                'inclusive': round(entry['inclusive'], 4),
+                'count': entry['count'],
+                'mean_ms': round(entry['inclusive'] / entry['count'] * 1000, 3),
+                'max_ms': round(entry['max'] * 1000, 3),
+                'share': round(entry['seconds'] / wall_time, 4) if wall_time > 0 else 0.0
+            }
+
+        accounted = sum(entry['seconds'] for entry in self.stages.values())
+        report = {
+            'version': REPORT_VERSION,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'wall_time': round(wall_time, 3),
+            'unaccounted': round(max(0.0, wall_time - accounted), 3),
+            'info': {**self.info, **info},
+            'stages': stages
+        }
+        if self.gpu_timer is not None:
+            report['gpu'] = self.gpu_timer.report()
+        return report
+
+    def finish(self, label, logger=None, path=None, **info):
+        """Write the report (to path, or PROFILE_DIR/<label>_<time>.json) and log a summary.
+
+        Returns the report path, or None if nothing was timed or it couldn't be written.
+        """
+        if not self.stages:
+            return None
+        report = self.report(label=label, **info)
+        if self.gpu_timer is not None:
+            self.gpu_timer.release()
+
+        if logger:
+            logger.info(f"Render profile ({report['wall_time']:.1f}s wall):")
+            for name, stage in report['stages'].items():
+                logger.info(
+                    f"  {name:<16} {stage['seconds']:8.2f}s  {stage['share'] * 100:5.1f}%  "
+                    f"{stage['count']:>7} x {stage['mean_ms']:.2f}ms"
+                )
+            for shader, passes in report.get('gpu', {}).items():
+                for pass_name, timing in passes.items():
+                    logger.info(
+                        f"  GPU {shader} [{pass_name}]: mean {timing['mean_ms']:.2f}ms, "
+                        f"p95 {timing['p95_ms']:.2f}ms, max {timing['max_ms']:.2f}ms"
+                    )
+
+        if path is None:
+            stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            path = PROFILE_DIR / f"{label}_{stamp}.json"
+        path = Path(path)
+
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+        except OSError as e:
+            if logger:
+                logger.warning(f"Could not write render profile {path}: {e}")
+            return None
+
+        if logger:
+            logger.info(f"Render profile written to {path}")
+        return path
+
+
+def profiled(stage):
+    """Method decorator: time every call as stage on self.profiler."""
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.profiler.stage(stage):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def profiled_render(method):
+    """Decorator for a renderer entry point: fresh profiler per call, report written at the end.
+
+    The renderer's finish_profile(success) writes the report.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        self.profiler = RenderProfiler()
+        success = False
+        try:
+            success = method(self, *args, **kwargs)
+            return success
+        finally:
+            self.finish_profile(bool(success))
+    return wrapper
+
+
+class NullProfiler:
+    """Stand-in when nobody is collecting timings."""
+
+    def stage(self, name):
+        return nullcontext()
+
+    def gpu(self, shader, pass_name):
+        return nullcontext()
+
+    def add(self, name, inclusive, seconds=None):
+        pass
+
+    def collect_gpu(self):
+        pass
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+OneOffRender Shared Render Resources
+GL context and caches kept warm by long-lived render processes
+(render_daemon.py, frame_worker.py) across many renders.
+"""
+
+from pathlib import Path
+
+from gl_context import create_context, capabilities
+from texture_cache import TextureCache
+from gpu_resources import GpuResources
+
+
+class RenderResources:
+    """One OpenGL context plus caches of the expensive things built on it.
+
+    Compiled shader and transition programs are keyed by file path, mtime and load
+    arguments, so editing a file on disk is picked up by the next render; the
+    outdated program and the least recently used beyond max_gl_objects are
+    released by trim(), which the owner calls between renders. Audio
+    analysis results are kept for the most recently used tracks.
+
+    A GL context is bound to the thread that created it: create and use this
+    object from a single render thread.
+    """
+
+    def __init__(self, max_audio_entries=2, max_gl_objects=256):
+        self.ctx = create_context()
+        self.gl_info = capabilities(self.ctx)  # Read here: the context belongs to this thread
+        self.gl_objects = {}  # (kind, path, mtime, args) -> program / transition (insertion order = age)
+        self.latest = {}      # (kind, path, args) -> current key in gl_objects
+        self.cached_ids = set()  # id() of every program the cache owns (stale ones too), for is_cached()
+        self.stale = []       # Superseded or trimmed programs, released by trim()
+        self.audio = {}       # key -> audio analysis dict (insertion order = age)
+        self.max_audio_entries = max_audio_entries
+        self.max_gl_objects = max_gl_objects
+
+    def cached(self, kind, path, args, factory):
+        """Return a cached GL object, building it with factory() if new or the file changed.
+
+        The version it replaces (same kind, path and args, older mtime) is released by
+        the next trim().
+        """
+        path = Path(path)
+        try:
+            mtime = path.stat().st_mtime_ns
+        except OSError:
+            mtime = None
+        source = (kind, str(path.resolve()), args)
+        key = (kind, source[1], mtime, args)
+
+        if key in self.gl_objects:
+            self.gl_objects[key] = self.gl_objects.pop(key)  # Mark as most recently used
+            return self.gl_objects[key]
+
+        value = factory()
+        if value is None:
+            return None  # Failed loads are retried next time
+
+        previous = self.latest.get(source)
+        if previous is not None and previous in self.gl_objects:
+            self.discard(previous)
+        self.latest[source] = key
+        self.gl_objects[key] = value
+        self.cached_ids.add(id(self.program_of(value)))
+        return value
+
+    @staticmethod
+    def program_of(value):
+        """The GL program of a cached program or transition."""
+        return value['program'] if isinstance(value, dict) else value
+
+    def discard(self, key):
+        """Drop an entry; its program is released by the next trim()."""
+        self.stale.append(self.program_of(self.gl_objects.pop(key)))
+
+    def trim(self):
+        """Release superseded programs and the least recently used beyond max_gl_objects.
+
+        Call between renders: a render may still be using anything cached during it.
+        """
+        while len(self.gl_objects) > self.max_gl_objects:
+            self.discard(next(iter(self.gl_objects)))
+        self.latest = {source: key for source, key in self.latest.items() if key in self.gl_objects}
+        for program in self.stale:
+            self.cached_ids.discard(id(program))
+            program.release()
+        self.stale.clear()
+
+    def is_cached(self, value):
+        """True if a GL object is owned by the cache (and must not be released by a render)."""
+        return id(value) in self.cached_ids
+
+    def cached_audio(self, key, factory):
+        """Return cached audio analysis for key, computing it with factory() on a miss."""
+        if key in self.audio:
+            self.audio[key] = self.audio.pop(key)  # Mark as most recently used
+            return self.audio[key]
+
+        value = factory()
+        if value is not None:
+            self.audio[key] = value
+            while len(self.audio) > self.max_audio_entries:
+                self.audio.pop(next(iter(self.audio)))
+        return value
+
+    def stats(self):
+        """Cache sizes, for status reports."""
+        kinds = {}
+        for kind, *_ in list(self.gl_objects):  # Status requests run on another thread
+            kinds[kind] = kinds.get(kind, 0) + 1
+        return {
+            'gl_objects': kinds,
+            'stale_gl_objects': len(self.stale),
+            'audio_entries': len(self.audio),
+            'textures': TextureCache.for_context(self.ctx).stats(),
+            'gpu_memory': GpuResources.for_context(self.ctx).stats(),
+            'gl': self.gl_info
+        }
+
+
+class WarmRendererMixin:
+    """Routes a renderer's GL context and shader loading through RenderResources.
+
+    Textures are not cached here: the context's TextureCache shares them between
+    shaders and GpuResources frees them (see gpu_resources.py).
+
+    Mix in ahead of TimelineRenderer or ShaderRenderer and set self.resources.
+    """
+
+    resources = None
+
+    def create_gl_context(self):
+        """Use the shared context instead of creating one per render."""
+        return self.resources.ctx
+
+    def release_program(self, program):
+        """Keep cached programs alive for the next render."""
+        if not self.resources.is_cached(program):
+            program.release()
+
+    def load_shader_from_file(self, shader_path, *args):
+        """Compile a GLSL shader once per file version (and common code, if any)."""
+        return self.resources.cached(
+            'program', shader_path, args,
+            lambda: super(WarmRendererMixin, self).load_shader_from_file(shader_path, *args)
+        )
+
+    def load_transition_shader(self, transition_file, config_data):
+        """Compile a transition shader once per file version; config is applied per render."""
+        transition = self.resources.cached(
+            'transition', transition_file, (),
+            lambda: super(WarmRendererMixin, self).load_transition_shader(transition_file, {})
+        )
+        if transition is None:
+            return None
+        return {**transition, 'config': config_data.get(transition['name'], {})}
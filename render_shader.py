@@ -16,11 +16,16 @@ import random
 import glob
 
 import numpy as np
-import moderngl
 from PIL import Image
-import librosa
 import ffmpeg
 
+import audio_analysis
+from render_profiler import RenderProfiler, profiled, profiled_render
+from shader_costs import RenderBudget
+from gl_context import create_context
+from texture_cache import TextureCache, cubemap_face_path, texture_files
+from gpu_resources import GpuResources
+
 class ShaderRenderer:
     def __init__(self, config_path="config.json"):
         """Initialize the shader renderer with configuration."""
@@ -28,6 +33,7 @@ class ShaderRenderer:
         self.load_config()
         self.setup_logging()
         self.ctx = None
+        self.profiler = RenderProfiler()
         
     def load_config(self):
         """Load configuration from JSON file."""
@@ -113,104 +119,11 @@ class ShaderRenderer:
         self.logger.info("Analyzing audio for reactivity (1024-point FFT)...")
 
         try:
-            # Load audio
-            y, sr = librosa.load(str(self.audio_path), sr=None, duration=duration)
-
-            # Calculate frame parameters
-            frame_rate = self.config['output']['frame_rate']
-            total_frames = int(duration * frame_rate)
-            hop_length = len(y) // total_frames
-
-            self.logger.info(f"Audio: {duration:.2f}s, {sr}Hz, {total_frames} frames")
-            self.logger.info(f"FFT: 1024-point, {sr//2}Hz Nyquist, {sr/1024:.1f}Hz per bin")
-
-            # High-resolution 1024-point FFT (Shadertoy-compatible)
-            stft_data = librosa.stft(y, hop_length=hop_length, n_fft=1024)
-
-            # Get magnitude spectrum (512 usable bins from 1024-point FFT)
-            magnitude_spectrum = np.abs(stft_data[:512, :])  # Only first 512 bins (magnitude only)
-
-            # Apply smoothing similar to Shadertoy (0.8 smoothing factor)
-            smoothed_spectrum = np.zeros_like(magnitude_spectrum)
-            smoothing_factor = 0.8
-
-            for frame_idx in range(magnitude_spectrum.shape[1]):
-                if frame_idx == 0:
-                    smoothed_spectrum[:, frame_idx] = magnitude_spectrum[:, frame_idx]
-                else:
-                    smoothed_spectrum[:, frame_idx] = (
-                        smoothing_factor * smoothed_spectrum[:, frame_idx - 1] +
-                        (1.0 - smoothing_factor) * magnitude_spectrum[:, frame_idx]
-                    )
-
-            # Per-bin normalization: each frequency bin is scaled to its own peak across time.
-            # This ensures treble bins reach 1.0 even when bass is much louder,
-            # giving all frequency bands equal dynamic range in the texture.
-            bin_peaks = smoothed_spectrum.max(axis=1, keepdims=True)  # shape (512, 1)
-            # Avoid divide-by-zero for silent bins; floor at a small epsilon
-            bin_peaks = np.maximum(bin_peaks, 1e-6)
-            smoothed_spectrum = smoothed_spectrum / bin_peaks
-
-            # Extract legacy bass/treble for backward compatibility
-            bass_power = np.mean(smoothed_spectrum[:32, :], axis=0)  # 0-32 bins (low frequencies)
-            treble_power = np.mean(smoothed_spectrum[256:, :], axis=0)  # 256+ bins (high frequencies)
-
-            # Ensure we have the right number of frames
-            if smoothed_spectrum.shape[1] != total_frames:
-                # Interpolate full spectrum
-                new_spectrum = np.zeros((512, total_frames))
-                for bin_idx in range(512):
-                    new_spectrum[bin_idx, :] = np.interp(
-                        np.linspace(0, smoothed_spectrum.shape[1]-1, total_frames),
-                        np.arange(smoothed_spectrum.shape[1]),
-                        smoothed_spectrum[bin_idx, :]
-                    )
-                smoothed_spectrum = new_spectrum
-
-                # Interpolate legacy values
-                bass_power = np.interp(np.linspace(0, len(bass_power)-1, total_frames),
-                                     np.arange(len(bass_power)), bass_power)
-                treble_power = np.interp(np.linspace(0, len(treble_power)-1, total_frames),
-                                       np.arange(len(treble_power)), treble_power)
-
-            # Extract raw waveform samples for oscilloscope
-            waveform_samples = []
-            oscilloscope_duration = 1.0 / 30.0  # 1/30th second window
-            samples_per_window = max(int(sr * oscilloscope_duration), 256)
-
-            for frame_idx in range(total_frames):
-                frame_time = frame_idx / frame_rate
-                center_sample = int(frame_time * sr)
-                start_sample = max(0, center_sample - samples_per_window // 2)
-                end_sample = min(len(y), start_sample + samples_per_window)
-
-                if end_sample - start_sample < samples_per_window:
-                    start_sample = max(0, end_sample - samples_per_window)
-
-                frame_audio = y[start_sample:end_sample]
-
-                # Downsample to exactly 256 samples for texture width
-                if len(frame_audio) >= 256:
-                    indices = np.linspace(0, len(frame_audio) - 1, 256)
-                    frame_waveform = np.interp(indices, np.arange(len(frame_audio)), frame_audio)
-                else:
-                    frame_waveform = np.pad(frame_audio, (0, 256 - len(frame_audio)), 'constant')
-
-                # Normalize to [0, 1] range
-                frame_waveform = (frame_waveform + 1.0) * 0.5
-                waveform_samples.append(frame_waveform)
-
-            return {
-                'bass': bass_power,  # Legacy compatibility
-                'treble': treble_power,  # Legacy compatibility
-                'fft_spectrum': smoothed_spectrum,  # New: Full 512-bin spectrum
-                'waveform': waveform_samples,
-                'total_frames': total_frames,
-                'frame_rate': frame_rate,
-                'sample_rate': sr,
-                'nyquist_freq': sr // 2,
-                'freq_per_bin': sr / 1024.0
-            }
+            # Per-bin normalization gives all frequency bands equal dynamic range in the texture
+            return audio_analysis.analyze_audio(
+                self.audio_path, duration, self.config['output']['frame_rate'],
+                normalization='per_bin', logger=self.logger, profiler=self.profiler
+            )
 
         except Exception as e:
             self.logger.error(f"Audio analysis failed: {e}")
@@ -426,10 +339,14 @@ class ShaderRenderer:
 
         return found_buffers
 
+    @profiled('texture_load')
     def load_texture_from_file(self, texture_path, filter_mode='linear', wrap_mode='repeat', mipmap=False):
         """
         Load an image file as a ModernGL texture.
 
+        Shaders asking for the same file and settings share one texture on this
+        context (see texture_cache.py); release it with release_texture().
+
         Args:
             texture_path: Path to image file (jpg, png, etc.)
             filter_mode: 'linear' or 'nearest'
@@ -439,20 +356,20 @@ class ShaderRenderer:
         Returns:
             ModernGL texture object or None on failure
         """
-        try:
-            from PIL import Image
-            import numpy as np
-
-            # Load image
-            img = Image.open(texture_path)
-            img = img.convert('RGB')  # Ensure RGB format
-            img_data = np.array(img, dtype=np.uint8)
+        return TextureCache.for_context(self.ctx).acquire(
+            'texture', texture_path, (filter_mode, wrap_mode, mipmap),
+            lambda: self.create_texture_from_file(texture_path, filter_mode, wrap_mode, mipmap)
+        )
 
-            # Flip vertically (OpenGL expects bottom-left origin)
-            img_data = np.flipud(img_data)
+    def create_texture_from_file(self, texture_path, filter_mode, wrap_mode, mipmap):
+        """Decode (or load decoded pixels from Cache/textures/) and upload one texture."""
+        try:
+            # RGB pixels, already flipped (OpenGL expects bottom-left origin)
+            img_data = TextureCache.for_context(self.ctx).pixels(texture_path, self.logger)
+            height, width = img_data.shape[:2]
 
             # Create texture
-            texture = self.ctx.texture(img.size, 3, img_data.tobytes())
+            texture = self.ctx.texture((width, height), 3, img_data.tobytes())
 
             # Set filtering
             if filter_mode == 'linear':
@@ -476,17 +393,20 @@ class ShaderRenderer:
             if mipmap:
                 texture.build_mipmaps()
 
-            self.logger.info(f"[OK] Loaded texture: {texture_path.name} ({img.size[0]}x{img.size[1]})")
+            self.logger.info(f"[OK] Loaded texture: {texture_path.name} ({width}x{height})")
             return texture
 
         except Exception as e:
             self.logger.error(f"Failed to load texture {texture_path}: {e}")
             return None
 
+    @profiled('texture_load')
     def load_cubemap_from_files(self, basename, filter_mode='linear', mipmap=False):
         """
         Load 6 images as a cubemap texture from the Cubemaps/ folder.
 
+        Shared between shaders like load_texture_from_file.
+
         Args:
             basename: Base name for cubemap files (e.g., "skybox" loads skybox_px.png, etc.)
             filter_mode: 'linear' or 'nearest'
@@ -495,10 +415,14 @@ class ShaderRenderer:
         Returns:
             ModernGL TextureCube object or None on failure
         """
-        try:
-            from PIL import Image
-            import numpy as np
+        return TextureCache.for_context(self.ctx).acquire(
+            'cubemap', Path("Cubemaps") / basename, (filter_mode, mipmap),
+            lambda: self.create_cubemap_from_files(basename, filter_mode, mipmap)
+        )
 
+    def create_cubemap_from_files(self, basename, filter_mode, mipmap):
+        """Decode the six faces of a cubemap and upload them."""
+        try:
             cubemaps_dir = Path("Cubemaps")
 
             # Define face suffixes in ModernGL order: +X, -X, +Y, -Y, +Z, -Z
@@ -507,44 +431,35 @@ class ShaderRenderer:
                          'positive Y (top)', 'negative Y (bottom)',
                          'positive Z (front)', 'negative Z (back)']
 
+            # Decode the faces on worker threads, upload here in order
+            face_paths = [cubemap_face_path(basename, suffix, cubemaps_dir) for suffix in face_suffixes]
+            cache = TextureCache.for_context(self.ctx)
+            cache.prefetch([path for path in face_paths if path is not None], self.logger)
+
             # Load all 6 faces
             faces = []
             face_size = None
 
-            for suffix, name in zip(face_suffixes, face_names):
-                # Try common image extensions
-                face_path = None
-                for ext in ['.png', '.jpg', '.jpeg', '.bmp', '.tga']:
-                    potential_path = cubemaps_dir / f"{basename}_{suffix}{ext}"
-                    if potential_path.exists():
-                        face_path = potential_path
-                        break
-
+            for face_path, suffix, name in zip(face_paths, face_suffixes, face_names):
                 if not face_path:
                     self.logger.error(f"Cubemap face not found: {basename}_{suffix}.* ({name})")
                     return None
 
-                # Load image
-                img = Image.open(face_path)
-                img = img.convert('RGB')
+                # RGB pixels, flipped vertically for OpenGL coordinate system
+                img_data = cache.pixels(face_path, self.logger)
+                height, width = img_data.shape[:2]
 
                 # Validate size
-                if img.size[0] != img.size[1]:
-                    self.logger.error(f"Cubemap face must be square: {face_path.name} is {img.size[0]}x{img.size[1]}")
+                if width != height:
+                    self.logger.error(f"Cubemap face must be square: {face_path.name} is {width}x{height}")
                     return None
 
                 if face_size is None:
-                    face_size = img.size[0]
-                elif img.size[0] != face_size:
-                    self.logger.error(f"All cubemap faces must be same size: {face_path.name} is {img.size[0]}x{img.size[0]}, expected {face_size}x{face_size}")
+                    face_size = width
+                elif width != face_size:
+                    self.logger.error(f"All cubemap faces must be same size: {face_path.name} is {width}x{width}, expected {face_size}x{face_size}")
                     return None
 
-                # Convert to numpy array
-                img_data = np.array(img, dtype=np.uint8)
-
-                # Flip vertically for OpenGL coordinate system
-                img_data = np.flipud(img_data)
-
                 faces.append(img_data)
                 self.logger.info(f"  Loaded cubemap face: {face_path.name} ({name})")
 
@@ -595,6 +510,9 @@ class ShaderRenderer:
         if not metadata or not metadata.get('texture'):
             return textures
 
+        # Start decoding every image this shader uses before uploading the first
+        TextureCache.for_context(self.ctx).prefetch(texture_files(metadata), self.logger)
+
         texture_config = metadata['texture']
         textures_dir = Path("Textures")
 
@@ -657,6 +575,10 @@ class ShaderRenderer:
                         else:
                             self.logger.warning(f"  Texture file not found: {texture_file}")
 
+        # Textures may be evicted under a VRAM budget and reloaded when the shader is next used
+        GpuResources.for_context(self.ctx, self.logger).track_textures(
+            textures, lambda: self.detect_and_load_textures(shader_path, metadata), self.release_texture
+        )
         return textures
 
     def detect_common_shader(self, shader_path):
@@ -674,6 +596,24 @@ class ShaderRenderer:
                 return ""
         return ""
 
+    def create_gl_context(self):
+        """Create the OpenGL context for a render (long-lived processes share one)."""
+        return create_context(config=self.config)
+
+    def enable_gpu_timers(self):
+        """Per-pass GPU timing for this render if "profiling": {"gpu_timers": true} is set."""
+        if self.config.get('profiling', {}).get('gpu_timers', False):
+            self.profiler.enable_gpu_timers(self.ctx)
+
+    def release_program(self, program):
+        """Release a shader program once a render is done with it."""
+        program.release()
+
+    def release_texture(self, texture):
+        """Drop a shader's reference to a texture (freed when no shader uses it)."""
+        TextureCache.for_context(self.ctx).release(texture)
+
+    @profiled('shader_compile')
     def load_shader_from_file(self, shader_path, common_source=None):
         """
         Load and compile a specific GLSL shader file.
@@ -737,6 +677,11 @@ class ShaderRenderer:
             except Exception as e:
                 self.logger.warning(f"Failed to load metadata.json: {e}")
 
+        # Decode every texture on worker threads while the shaders compile
+        texture_cache = TextureCache.for_context(self.ctx)
+        for shader_file in shader_files:
+            texture_cache.prefetch(texture_files(metadata_dict.get(shader_file.name)), self.logger)
+
         for shader_file in shader_files:
             self.logger.info(f"Compiling {shader_file.name}...")
 
@@ -784,6 +729,8 @@ class ShaderRenderer:
             }
             self.logger.info(f"[OK] {shader_file.name} compiled successfully")
 
+        texture_cache.discard_prefetched()
+
         if not compiled_shaders:
             self.logger.error("No shaders compiled successfully")
             return None
@@ -791,7 +738,7 @@ class ShaderRenderer:
         self.logger.info(f"Successfully compiled {len(compiled_shaders)} shader(s)")
         return compiled_shaders
 
-    def select_next_shader(self, shader_names, usage_count, history, max_history, config=None):
+    def select_next_shader(self, shader_names, usage_count, history, max_history, config=None, budget=None):
         """
         Advanced shader selection algorithm that ensures better distribution and variety.
 
@@ -801,6 +748,7 @@ class ShaderRenderer:
         - Ensures all shaders get fair representation
         - Maintains randomness while improving distribution
         - Configurable algorithm type and weighting
+        - Optional render budget (shader_costs.RenderBudget) that picks expensive shaders less often
         """
         if config is None:
             config = {}
@@ -840,6 +788,9 @@ class ShaderRenderer:
             # Default to equal weights
             weights = [1.0] * len(candidates)
 
+        if budget is not None:
+            weights = [weight * budget.weight(name) for weight, name in zip(weights, candidates)]
+
         # Weighted random selection
         total_weight = sum(weights)
         rand_val = random.random() * total_weight
@@ -958,6 +909,7 @@ class ShaderRenderer:
         # and at least once (to ensure we don't skip unused groups)
         return min_usage == max_usage and min_usage > 0
 
+    @profiled('shader_compile')
     def load_transition_shader(self, transition_file, config_data):
         """Load and compile a transition shader with its configuration."""
         try:
@@ -1041,7 +993,8 @@ class ShaderRenderer:
         self.logger.info("Starting fast render...")
 
         # Initialize OpenGL context
-        self.ctx = moderngl.create_standalone_context()
+        self.ctx = self.create_gl_context()
+        self.enable_gpu_timers()
 
         # Load shader
         program = self.load_shader()
@@ -1101,18 +1054,21 @@ class ShaderRenderer:
                         program['iChannel0'].value = 0
 
                     # Clear and render
-                    self.ctx.clear(0.0, 0.0, 0.0, 1.0)
-                    vao.render()
+                    with self.profiler.stage('frame_draw'):
+                        self.ctx.clear(0.0, 0.0, 0.0, 1.0)
+                        vao.render()
 
                     # Read frame data directly as RGB bytes
-                    data = fbo.read(components=3)
+                    with self.profiler.stage('frame_readback'):
+                        data = fbo.read(components=3)
 
-                    # Convert OpenGL data (bottom-up) to standard format (top-down)
-                    frame_array = np.frombuffer(data, dtype=np.uint8).reshape((height, width, 3))
-                    frame_array = np.flipud(frame_array)
+                        # Convert OpenGL data (bottom-up) to standard format (top-down)
+                        frame_array = np.frombuffer(data, dtype=np.uint8).reshape((height, width, 3))
+                        frame_array = np.flipud(frame_array)
 
                     # Write raw frame data to file
-                    raw_file.write(frame_array.tobytes())
+                    with self.profiler.stage('frame_write'):
+                        raw_file.write(frame_array.tobytes())
 
                     # Clean up texture
                     audio_texture.release()
@@ -1151,7 +1107,8 @@ class ShaderRenderer:
         self.logger.info("Starting fast multi-shader render...")
 
         # Initialize OpenGL context
-        self.ctx = moderngl.create_standalone_context()
+        self.ctx = self.create_gl_context()
+        self.enable_gpu_timers()
 
         # Discover and pre-compile all shaders
         shader_files = self.discover_shaders()
@@ -1167,12 +1124,6 @@ class ShaderRenderer:
         height = self.config['output']['resolution']['height']
         resolution = (width, height)
 
-        # Initialize buffer textures for all shaders with buffers
-        for shader_name, shader_data in compiled_shaders.items():
-            if shader_data.get('buffers'):
-                self.logger.info(f"Initializing buffers for {shader_name}")
-                self.initialize_buffer_textures(shader_data, resolution)
-
         # Create vertex buffer for full-screen quad
         vertices = np.array([
             -1.0, -1.0,
@@ -1205,6 +1156,10 @@ class ShaderRenderer:
 
             # Prepare shader list for cycling
             shader_names = list(compiled_shaders.keys())
+            budget = RenderBudget.from_config(self.config, width, height, frame_rate)
+            if budget is not None:
+                shader_names = budget.allowed(shader_names, self.logger)
+
             if len(shader_names) == 1:
                 # Only one shader, use it for the entire duration
                 current_shader_name = shader_names[0]
@@ -1233,8 +1188,14 @@ class ShaderRenderer:
                 shader_usage_count[current_shader_name] += 1
                 shader_history.append(current_shader_name)
 
+            if budget is not None:
+                current_shader_duration = budget.segment_seconds(current_shader_name, current_shader_duration)
+                next_switch_frame = int(current_shader_duration * frame_rate)
+                budget.plan(min(next_switch_frame, total_frames), current_shader_name)
+
             self.logger.info(f"Starting with shader: {current_shader_name}")
 
+            render_started = time.time()
             with open(temp_video_file, 'wb') as raw_file:
                 for frame_idx in range(total_frames):
                     # Check if we need to switch shaders (using random duration system)
@@ -1248,7 +1209,7 @@ class ShaderRenderer:
                             # Smart weighted random selection
                             current_shader_name = self.select_next_shader(
                                 shader_names, shader_usage_count, shader_history,
-                                max_history, randomization_config
+                                max_history, randomization_config, budget
                             )
                             current_shader_idx = shader_names.index(current_shader_name)
 
@@ -1263,8 +1224,12 @@ class ShaderRenderer:
 
                         # Generate new random duration for this shader (10-25 seconds)
                         current_shader_duration = random.uniform(10.0, 25.0)
+                        if budget is not None:
+                            current_shader_duration = budget.segment_seconds(current_shader_name, current_shader_duration)
                         frames_for_this_shader = int(current_shader_duration * frame_rate)
                         next_switch_frame = frame_idx + frames_for_this_shader
+                        if budget is not None:
+                            budget.plan(min(frames_for_this_shader, total_frames - frame_idx), current_shader_name)
 
                         time_seconds = frame_idx / frame_rate
                         self.logger.info(f"Switched to shader: {current_shader_name} at {time_seconds:.1f}s (duration: {current_shader_duration:.1f}s)")
@@ -1291,18 +1256,21 @@ class ShaderRenderer:
                         current_program['iChannel0'].value = 0
 
                     # Clear and render
-                    self.ctx.clear(0.0, 0.0, 0.0, 1.0)
-                    current_vao.render()
+                    with self.profiler.stage('frame_draw'):
+                        self.ctx.clear(0.0, 0.0, 0.0, 1.0)
+                        current_vao.render()
 
                     # Read frame data directly as RGB bytes
-                    data = fbo.read(components=3)
+                    with self.profiler.stage('frame_readback'):
+                        data = fbo.read(components=3)
 
-                    # Convert OpenGL data (bottom-up) to standard format (top-down)
-                    frame_array = np.frombuffer(data, dtype=np.uint8).reshape((height, width, 3))
-                    frame_array = np.flipud(frame_array)
+                        # Convert OpenGL data (bottom-up) to standard format (top-down)
+                        frame_array = np.frombuffer(data, dtype=np.uint8).reshape((height, width, 3))
+                        frame_array = np.flipud(frame_array)
 
                     # Write raw frame data to file
-                    raw_file.write(frame_array.tobytes())
+                    with self.profiler.stage('frame_write'):
+                        raw_file.write(frame_array.tobytes())
 
                     # Clean up texture
                     audio_texture.release()
@@ -1312,6 +1280,9 @@ class ShaderRenderer:
                         progress = (frame_idx + 1) / total_frames * 100
                         self.logger.info(f"Rendered frame {frame_idx + 1}/{total_frames} ({progress:.1f}%) - {current_shader_name}")
 
+            if budget is not None:
+                budget.summary(self.logger, total_frames, time.time() - render_started, frame_rate)
+
             # Now use FFmpeg to combine raw video with audio
             success = self.combine_raw_video_audio(temp_video_file, width, height, frame_rate, duration)
 
@@ -1374,7 +1345,8 @@ class ShaderRenderer:
                 cmd.extend(['-loglevel', 'error'])
 
             # Run FFmpeg
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            with self.profiler.stage('encode'):
+                result = subprocess.run(cmd, capture_output=True, text=True)
 
             if result.returncode == 0:
                 self.logger.info(f"Video created successfully: {self.output_path}")
@@ -1394,7 +1366,8 @@ class ShaderRenderer:
         self.logger.info("Starting fast multi-shader render with transitions...")
 
         # Initialize OpenGL context
-        self.ctx = moderngl.create_standalone_context()
+        self.ctx = self.create_gl_context()
+        self.enable_gpu_timers()
 
         # Discover and pre-compile all main shaders
         shader_files = self.discover_shaders()
@@ -1448,11 +1421,7 @@ class ShaderRenderer:
         frame_rate = audio_data['frame_rate']
         total_frames = audio_data['total_frames']
 
-        # Initialize buffer textures for all shaders with buffers
-        for shader_name, shader_data in compiled_shaders.items():
-            if shader_data.get('buffers'):
-                self.logger.info(f"Initializing buffers for {shader_name}")
-                self.initialize_buffer_textures(shader_data, resolution)
+        # Buffer targets are allocated when a shader first renders (render_shader_frame)
 
         # Calculate timing - now using random durations
         base_switch_interval = self.config.get('shader_settings', {}).get('switch_interval', 10.0)
@@ -1493,6 +1462,9 @@ class ShaderRenderer:
         try:
             # Initialize shader selection system
             shader_names = list(compiled_shaders.keys())
+            budget = RenderBudget.from_config(self.config, width, height, frame_rate)
+            if budget is not None:
+                shader_names = budget.allowed(shader_names, self.logger)
             randomization_config = self.config.get('shader_settings', {}).get('randomization', {})
             shader_usage_count = {name: 0 for name in shader_names}
             shader_history = []
@@ -1521,6 +1493,11 @@ class ShaderRenderer:
             shader_usage_count[current_shader_name] += 1
             shader_history.append(current_shader_name)
 
+            if budget is not None:
+                current_shader_duration = budget.segment_seconds(current_shader_name, current_shader_duration)
+                pure_shader_frames = int((current_shader_duration - transition_duration) * frame_rate)
+                budget.plan(min(pure_shader_frames, total_frames), current_shader_name)
+
             self.logger.info(f"Starting with shader: {current_shader_name}")
 
             # Initialize dynamic transition tracking
@@ -1531,6 +1508,7 @@ class ShaderRenderer:
             transition_name = None
 
             # Open raw video file for writing
+            render_started = time.time()
             with open(temp_video_file, 'wb') as raw_file:
                 frame_idx = 0
 
@@ -1543,8 +1521,10 @@ class ShaderRenderer:
 
                         next_shader_name = self.select_next_shader(
                             shader_names, shader_usage_count, shader_history,
-                            max_history, randomization_config
+                            max_history, randomization_config, budget
                         )
+                        if budget is not None:
+                            budget.plan(min(transition_frames, total_frames - frame_idx), current_shader_name, next_shader_name)
 
                         transition_name = self.select_transition_shader(
                             transition_names, transition_usage_count, transition_history,
@@ -1557,13 +1537,14 @@ class ShaderRenderer:
                     if in_transition:
                         # Render transition frame
                         progress = transition_frame / transition_frames
-                        self.render_transition_frame(
-                            compiled_shaders[current_shader_name],
-                            compiled_shaders[next_shader_name],
-                            compiled_transitions[transition_name],
-                            vbo, fbo, audio_data, frame_idx, frame_rate,
-                            progress, raw_file
-                        )
+                        with self.profiler.stage('frame_draw'):
+                            self.render_transition_frame(
+                                compiled_shaders[current_shader_name],
+                                compiled_shaders[next_shader_name],
+                                compiled_transitions[transition_name],
+                                vbo, fbo, audio_data, frame_idx, frame_rate,
+                                progress, raw_file
+                            )
 
                         transition_frame += 1
 
@@ -1586,19 +1567,24 @@ class ShaderRenderer:
 
                             # Generate new random duration for next shader
                             new_shader_duration = random.uniform(10.0, 25.0)
+                            if budget is not None:
+                                new_shader_duration = budget.segment_seconds(current_shader_name, new_shader_duration)
                             new_pure_duration = new_shader_duration - transition_duration
                             new_pure_frames = int(new_pure_duration * frame_rate)
                             next_transition_start = frame_idx + new_pure_frames
+                            if budget is not None:
+                                budget.plan(max(0, min(new_pure_frames, total_frames - frame_idx)), current_shader_name)
 
                             time_seconds = frame_idx / frame_rate
                             self.logger.info(f"Switched to {current_shader_name}, next duration: {new_shader_duration:.1f}s")
 
                     else:
                         # Pure shader phase
-                        self.render_shader_frame(
-                            compiled_shaders[current_shader_name], vbo, fbo,
-                            audio_data, frame_idx, frame_rate, raw_file
-                        )
+                        with self.profiler.stage('frame_draw'):
+                            self.render_shader_frame(
+                                compiled_shaders[current_shader_name], vbo, fbo,
+                                audio_data, frame_idx, frame_rate, raw_file
+                            )
 
                     frame_idx += 1
 
@@ -1607,6 +1593,9 @@ class ShaderRenderer:
                         progress = frame_idx / total_frames * 100
                         self.logger.info(f"Rendered frame {frame_idx}/{total_frames} ({progress:.1f}%)")
 
+            if budget is not None:
+                budget.summary(self.logger, total_frames, time.time() - render_started, frame_rate)
+
             # Log final usage statistics
             self.logger.info("=== FINAL USAGE STATISTICS ===")
             self.logger.info("Shader usage:")
@@ -1648,6 +1637,14 @@ class ShaderRenderer:
                 self.logger.warning(f"Failed to cleanup raw file after error {temp_video_file}: {cleanup_error}")
             return False
 
+    def read_frame(self, fbo, raw_file):
+        """Read the rendered frame back from the GPU and write it to raw_file."""
+        with self.profiler.stage('frame_readback'):
+            data = fbo.read(components=3)
+        self.profiler.collect_gpu()  # Passes are finished once the frame is read back
+        with self.profiler.stage('frame_write'):
+            raw_file.write(data)
+
     def initialize_buffer_textures(self, shader_data, resolution):
         """Initialize ping-pong textures and framebuffers for all buffers.
         
@@ -1656,20 +1653,19 @@ class ShaderRenderer:
         - NEAREST filtering preserves exact pixel values
         - Float format (dtype='f2') for precision in data storage
         - Both textures cleared to zero to prevent garbage data on first frames
+
+        Targets come from the context's GpuResources pool and go back to it when
+        the shader stops being used.
         """
-        import numpy as np
-        
+        gpu_resources = GpuResources.for_context(self.ctx, self.logger)
+
         for buffer_id, buffer_data in shader_data.get('buffers', {}).items():
-            # Create two RGBA float textures for ping-pong rendering
-            # Using 4 components and half-float (f2) for Shadertoy compatibility
-            buffer_data['texture_current'] = self.ctx.texture(resolution, 4, dtype='f2')
-            buffer_data['texture_previous'] = self.ctx.texture(resolution, 4, dtype='f2')
-            
-            # Initialize both textures to zero (black) to prevent garbage data
-            # This is critical for Buffer A which uses self-feedback
-            zero_data = np.zeros((resolution[1], resolution[0], 4), dtype=np.float16).tobytes()
-            buffer_data['texture_current'].write(zero_data)
-            buffer_data['texture_previous'].write(zero_data)
+            # Two RGBA half-float targets for ping-pong rendering, cleared to zero (black)
+            # on the GPU - critical for Buffer A which uses self-feedback
+            buffer_data['texture_current'], buffer_data['fbo_current'] = \
+                gpu_resources.acquire_target(resolution, 4, 'f2')
+            buffer_data['texture_previous'], buffer_data['fbo_previous'] = \
+                gpu_resources.acquire_target(resolution, 4, 'f2')
 
             # Set texture parameters - NEAREST for data storage, LINEAR causes interpolation issues
             for tex in [buffer_data['texture_current'], buffer_data['texture_previous']]:
@@ -1677,14 +1673,6 @@ class ShaderRenderer:
                 tex.repeat_x = False
                 tex.repeat_y = False
 
-            # Create framebuffers
-            buffer_data['fbo_current'] = self.ctx.framebuffer(
-                color_attachments=[buffer_data['texture_current']]
-            )
-            buffer_data['fbo_previous'] = self.ctx.framebuffer(
-                color_attachments=[buffer_data['texture_previous']]
-            )
-
             self.logger.debug(f"Initialized buffer {buffer_id} textures: {resolution} (RGBA float, zeroed)")
 
     def swap_buffer_textures(self, buffer_data):
@@ -1794,16 +1782,17 @@ class ShaderRenderer:
         # Render all buffer passes in order (A, B, C, D)
         for buffer_id in ['A', 'B', 'C', 'D']:
             if buffer_id in shader_data.get('buffers', {}):
-                self.render_buffer_pass(
-                    buffer_id,
-                    shader_data['buffers'][buffer_id],
-                    shader_data.get('buffers', {}),
-                    shader_data.get('textures', {}),
-                    vbo,
-                    audio_texture,
-                    time_seconds,
-                    resolution
-                )
+                with self.profiler.gpu(Path(shader_data['path']).name, f'buffer {buffer_id}'):
+                    self.render_buffer_pass(
+                        buffer_id,
+                        shader_data['buffers'][buffer_id],
+                        shader_data.get('buffers', {}),
+                        shader_data.get('textures', {}),
+                        vbo,
+                        audio_texture,
+                        time_seconds,
+                        resolution
+                    )
 
         # Render main image using buffer outputs (Shadertoy convention)
         # iChannel0 = Buffer A, iChannel1 = Buffer B, etc.
@@ -1844,12 +1833,12 @@ class ShaderRenderer:
             program['iResolution'].value = resolution
 
         # Clear and render
-        self.ctx.clear(0.0, 0.0, 0.0, 1.0)
-        vao.render()
+        with self.profiler.gpu(Path(shader_data['path']).name, 'image'):
+            self.ctx.clear(0.0, 0.0, 0.0, 1.0)
+            vao.render()
 
         # Read frame data and write to raw file
-        data = fbo.read(components=3)
-        raw_file.write(data)
+        self.read_frame(fbo, raw_file)
 
         # Swap ping-pong buffers for next frame
         for buffer_id, buffer_data in shader_data.get('buffers', {}).items():
@@ -1860,6 +1849,11 @@ class ShaderRenderer:
 
     def render_shader_frame(self, shader_data, vbo, fbo, audio_data, frame_idx, frame_rate, raw_file):
         """Render a single frame using a shader."""
+        # Allocate buffer targets / reload evicted textures if this shader wasn't resident
+        GpuResources.for_context(self.ctx, self.logger).use_shader(
+            shader_data, (fbo.width, fbo.height), self.initialize_buffer_textures
+        )
+
         # Check if shader has buffers
         if shader_data.get('buffers'):
             self.render_shader_frame_with_buffers(shader_data, vbo, fbo, audio_data, frame_idx, frame_rate, raw_file)
@@ -1902,12 +1896,12 @@ class ShaderRenderer:
                         self.logger.error(f"Invalid channel name: {texture_channel}")
 
         # Clear and render
-        self.ctx.clear(0.0, 0.0, 0.0, 1.0)
-        vao.render()
+        with self.profiler.gpu(Path(shader_data['path']).name, 'image'):
+            self.ctx.clear(0.0, 0.0, 0.0, 1.0)
+            vao.render()
 
         # Read frame data and write to raw file
-        data = fbo.read(components=3)
-        raw_file.write(data)
+        self.read_frame(fbo, raw_file)
 
         # Cleanup
         audio_texture.release()
@@ -1915,11 +1909,10 @@ class ShaderRenderer:
     def render_transition_frame(self, from_shader_data, to_shader_data, transition_data,
                               vbo, fbo, audio_data, frame_idx, frame_rate, progress, raw_file):
         """Render a transition frame blending two shaders."""
-        # Create temporary textures and framebuffers for each shader
-        temp_texture_from = self.ctx.texture((fbo.width, fbo.height), 3)
-        temp_texture_to = self.ctx.texture((fbo.width, fbo.height), 3)
-        temp_fbo_from = self.ctx.framebuffer(color_attachments=[temp_texture_from])
-        temp_fbo_to = self.ctx.framebuffer(color_attachments=[temp_texture_to])
+        # Temporary targets for each shader, reused from frame to frame
+        gpu_resources = GpuResources.for_context(self.ctx, self.logger)
+        temp_texture_from, temp_fbo_from = gpu_resources.acquire_target((fbo.width, fbo.height), 3)
+        temp_texture_to, temp_fbo_to = gpu_resources.acquire_target((fbo.width, fbo.height), 3)
 
         time_seconds = frame_idx / frame_rate
         audio_frame_idx = min(frame_idx, len(audio_data['bass']) - 1)
@@ -1940,8 +1933,9 @@ class ShaderRenderer:
             from_program['iResolution'].value = (fbo.width, fbo.height)
         if 'iChannel0' in from_program:
             from_program['iChannel0'].value = 0
-        self.ctx.clear(0.0, 0.0, 0.0, 1.0)
-        from_vao.render()
+        with self.profiler.gpu(Path(from_shader_data['path']).name, 'image'):
+            self.ctx.clear(0.0, 0.0, 0.0, 1.0)
+            from_vao.render()
 
         # Render TO shader to temporary framebuffer
         temp_fbo_to.use()
@@ -1953,8 +1947,9 @@ class ShaderRenderer:
             to_program['iResolution'].value = (fbo.width, fbo.height)
         if 'iChannel0' in to_program:
             to_program['iChannel0'].value = 0
-        self.ctx.clear(0.0, 0.0, 0.0, 1.0)
-        to_vao.render()
+        with self.profiler.gpu(Path(to_shader_data['path']).name, 'image'):
+            self.ctx.clear(0.0, 0.0, 0.0, 1.0)
+            to_vao.render()
 
         # Apply transition shader
         fbo.use()
@@ -1998,19 +1993,17 @@ class ShaderRenderer:
                 pass
 
         # Clear and render transition
-        self.ctx.clear(0.0, 0.0, 0.0, 1.0)
-        transition_vao.render()
+        with self.profiler.gpu(transition_data['name'], 'transition'):
+            self.ctx.clear(0.0, 0.0, 0.0, 1.0)
+            transition_vao.render()
 
         # Read frame data and write to raw file
-        data = fbo.read(components=3)
-        raw_file.write(data)
+        self.read_frame(fbo, raw_file)
 
         # Cleanup
         audio_texture.release()
-        temp_texture_from.release()
-        temp_texture_to.release()
-        temp_fbo_from.release()
-        temp_fbo_to.release()
+        gpu_resources.release_target(temp_texture_from, temp_fbo_from)
+        gpu_resources.release_target(temp_texture_to, temp_fbo_to)
 
     def select_transition_shader(self, transition_names, usage_count, history, max_history, config):
         """
@@ -2125,7 +2118,8 @@ class ShaderRenderer:
         self.logger.info("Starting legacy frame rendering...")
 
         # Initialize OpenGL context
-        self.ctx = moderngl.create_standalone_context()
+        self.ctx = self.create_gl_context()
+        self.enable_gpu_timers()
 
         # Load shader
         program = self.load_shader()
@@ -2258,6 +2252,7 @@ class ShaderRenderer:
             self.logger.error(f"Video combination failed: {e}")
             return False
 
+    @profiled_render
     def render_audio_file(self, audio_file):
         """Render a single audio file to video."""
         self.logger.info(f"=== Processing: {audio_file.name} ===")
@@ -2265,6 +2260,7 @@ class ShaderRenderer:
         # Set current audio file
         self.audio_path = audio_file
         self.output_path = self.generate_output_path(audio_file)
+        self.profiler.info.update(audio=str(self.audio_path), output=str(self.output_path))
 
         # Check if output already exists
         if self.output_path.exists() and not self.config.get('batch_settings', {}).get('overwrite_existing', False):
@@ -2377,6 +2373,17 @@ class ShaderRenderer:
 
         return successful_renders > 0
 
+    def finish_profile(self, success):
+        """Write the stage timings of the last render to Cache/render_profiles/."""
+        width = self.config['output']['resolution']['width']
+        height = self.config['output']['resolution']['height']
+        output = self.profiler.info.get('output')
+        return self.profiler.finish(
+            Path(output).stem if output else 'shader_render', self.logger,
+            status='completed' if success else 'failed', renderer='shader',
+            resolution=f"{width}x{height}", frame_rate=self.config['output']['frame_rate']
+        )
+
     def cleanup_temp_files(self, temp_dir):
         """Clean up temporary files."""
         if temp_dir and temp_dir.exists():
@@ -2403,9 +2410,11 @@ class ShaderRenderer:
             self.logger.info("Entering single file render mode")
             return self.render_single_file()
 
+    @profiled_render
     def render_single_shader_file(self, shader_path, audio_path, output_path):
         """Render a single shader with specified paths (for oneoff.py)."""
         self.logger.info("=== Single Shader Render Mode ===")
+        self.profiler.info.update(shader=str(shader_path), audio=str(audio_path), output=str(output_path))
 
         start_time = time.time()
 
@@ -2464,7 +2473,8 @@ class ShaderRenderer:
         """Render video using a single shader, with buffer support if needed."""
         try:
             # Initialize OpenGL context
-            self.ctx = moderngl.create_standalone_context()
+            self.ctx = self.create_gl_context()
+            self.enable_gpu_timers()
 
             shader_path = Path(shader_path)
 
@@ -2577,16 +2587,17 @@ class ShaderRenderer:
                         # Render all buffer passes in order (A, B, C, D)
                         for buffer_id in ['A', 'B', 'C', 'D']:
                             if buffer_id in buffers:
-                                self.render_buffer_pass(
-                                    buffer_id,
-                                    buffers[buffer_id],
-                                    buffers,
-                                    textures,
-                                    vbo,
-                                    audio_texture,
-                                    time_seconds,
-                                    resolution
-                                )
+                                with self.profiler.gpu(shader_path.name, f'buffer {buffer_id}'):
+                                    self.render_buffer_pass(
+                                        buffer_id,
+                                        buffers[buffer_id],
+                                        buffers,
+                                        textures,
+                                        vbo,
+                                        audio_texture,
+                                        time_seconds,
+                                        resolution
+                                    )
 
                         # Render main image using buffer outputs (Shadertoy convention)
                         # iChannel0 = Buffer A, iChannel1 = Buffer B, etc.
@@ -2625,9 +2636,11 @@ class ShaderRenderer:
                             program['iResolution'].value = (float(width), float(height))
 
                         # Clear and render
-                        self.ctx.clear(0.0, 0.0, 0.0, 1.0)
-                        vao.render()
-                        self.ctx.finish()  # Ensure main image is fully rendered before reading
+                        with self.profiler.stage('frame_draw'):
+                            with self.profiler.gpu(shader_path.name, 'image'):
+                                self.ctx.clear(0.0, 0.0, 0.0, 1.0)
+                                vao.render()
+                                self.ctx.finish()  # Ensure main image is fully rendered before reading
                     else:
                         # Standard single-pass rendering (no buffers)
                         vao = self.ctx.simple_vertex_array(program, vbo, 'in_vert')
@@ -2655,15 +2668,20 @@ class ShaderRenderer:
 
                         # Render frame
                         fbo.use()
-                        self.ctx.clear(0.0, 0.0, 0.0, 1.0)
-                        vao.render()
-                        self.ctx.finish()  # Ensure frame is fully rendered before reading
+                        with self.profiler.stage('frame_draw'):
+                            with self.profiler.gpu(shader_path.name, 'image'):
+                                self.ctx.clear(0.0, 0.0, 0.0, 1.0)
+                                vao.render()
+                                self.ctx.finish()  # Ensure frame is fully rendered before reading
 
                     # Read frame data and flip vertically (OpenGL is bottom-up, video is top-down)
-                    data = fbo.read(components=3)
-                    frame_array = np.frombuffer(data, dtype=np.uint8).reshape((height, width, 3))
-                    frame_array = np.flipud(frame_array)
-                    raw_file.write(frame_array.tobytes())
+                    with self.profiler.stage('frame_readback'):
+                        data = fbo.read(components=3)
+                        frame_array = np.frombuffer(data, dtype=np.uint8).reshape((height, width, 3))
+                        frame_array = np.flipud(frame_array)
+                    self.profiler.collect_gpu()
+                    with self.profiler.stage('frame_write'):
+                        raw_file.write(frame_array.tobytes())
 
                     # Swap ping-pong buffers for next frame (AFTER reading frame data)
                     if buffers:
@@ -2682,7 +2700,7 @@ class ShaderRenderer:
             vao.release()
             vbo.release()
             fbo.release()
-            program.release()
+            self.release_program(program)
 
             # Combine with audio using FFmpeg
             duration_seconds = len(audio_data['bass']) / audio_data['frame_rate']
@@ -2705,9 +2723,11 @@ class ShaderRenderer:
             self.logger.error(f"Traceback: {traceback.format_exc()}")
             return False
 
+    @profiled_render
     def render_single_file(self):
         """Render a single file specified in configuration."""
         self.logger.info("=== Single File Render Mode ===")
+        self.profiler.info.update(audio=str(self.audio_path), output=str(self.output_path))
 
         start_time = time.time()
 
@@ -2778,6 +2798,14 @@ def main():
         if len(sys.argv) > 1:
             config_file = sys.argv[1]
 
+        # Hand the job to the warm render daemon if one is running
+        from render_client import submit_render, print_event, RenderDaemonUnavailable
+        try:
+            result = submit_render({'type': 'shader', 'config': config_file}, on_event=print_event)
+            sys.exit(result['code'])
+        except RenderDaemonUnavailable:
+            pass
+
         renderer = ShaderRenderer(config_file)
         success = renderer.run()
         sys.exit(0 if success else 1)
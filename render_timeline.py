@@ -5,10 +5,13 @@ Renders videos from timeline JSON manifests with precise timing control.
 Supports multi-layer compositing including shaders, transitions, and green screen videos.
 """
 
+import os
 import json
+import socket
 import logging
 import sys
 import time
+import threading
 from pathlib import Path
 import subprocess
 import tempfile
@@ -17,9 +20,278 @@ import shutil
 import numpy as np
 import moderngl
 from PIL import Image
-import librosa
 import ffmpeg
 
+from audio_analysis import analyze_audio_cached
+from render_profiler import RenderProfiler, profiled
+from gl_context import create_context
+from texture_cache import TextureCache, cubemap_face_path, texture_files
+from gpu_resources import GpuResources
+
+# Prefix of the structured event lines printed on stdout (logs go to stderr).
+# The web editor reads these to relay render progress to the browser.
+RENDER_EVENT_PREFIX = '@@render-event '
+
+# Audio analysis results reused across renders of the same track and frame rate
+AUDIO_ANALYSIS_CACHE_DIR = Path('Cache') / 'audio_analysis'
+
+# x264 settings used when the manifest has no "encoding" section
+DEFAULT_ENCODING = {'crf': 18, 'preset': 'medium'}
+
+# Layer 0 over Layer 1 in the final encode (input 0 = Layer 1, input 1 = Layer 0):
+# 1. Applies chroma key to remove green from Layer 0
+# 2. Extracts alpha, blurs it to soften edges, reapplies it
+# 3. Overlays result on Layer 1
+GREENSCREEN_FILTER = (
+    '[1:v]format=rgba,colorkey=0x00d600:0.38:0.0,split[fga][fgc];'
+    '[fga]alphaextract,boxblur=2:1[matte];'
+    '[fgc][matte]alphamerge[fg];'
+    '[0:v][fg]overlay=0:0:format=auto[vout]'
+)
+
+# Layer 0 gap frames: the key color, so the filter keys them out completely
+GREENSCREEN_FILL_COLOR = (0, 214, 0)
+
+
+class TimelineIndex:
+    """Sorted interval index over the elements of one timeline layer.
+
+    Built once per layer so the frame loop doesn't rescan (and re-sort) the
+    element list for every frame. Queries at non-decreasing times advance a
+    cursor, making each lookup O(1) amortized; a query that goes back in time
+    simply rewinds the cursor.
+    """
+
+    def __init__(self, elements, transition_mapping=None):
+        self.elements = list(elements)
+        transition_mapping = transition_mapping or {}
+
+        # Element positions ordered by start time (stable, so ties keep list order)
+        self.by_start = sorted(range(len(self.elements)), key=lambda i: self.elements[i]['startTime'])
+
+        # Overlap windows between start-sorted neighbours. Their start times are
+        # non-decreasing because each window starts where the later element starts.
+        self.overlaps = []
+        for a, b in zip(self.by_start, self.by_start[1:]):
+            element = self.elements[a]
+            next_element = self.elements[b]
+            overlap_start = max(element['startTime'], next_element['startTime'])
+            overlap_end = min(element['endTime'], next_element['endTime'])
+            if overlap_start < overlap_end:
+                overlap_key = f"{element['id']}->{next_element['id']}"
+                self.overlaps.append({
+                    'start': overlap_start,
+                    'end': overlap_end,
+                    'current': element,
+                    'next': next_element,
+                    'transition_name': transition_mapping.get(overlap_key)
+                })
+
+        self.reset()
+
+    def reset(self):
+        """Rewind the lookup cursor to the start of the timeline."""
+        self._time = None
+        self._next_element = 0
+        self._active_elements = []  # element positions with startTime <= t < endTime
+        self._next_overlap = 0
+        self._active_overlaps = []  # overlap positions with start <= t <= end
+
+    def _advance(self, time_seconds):
+        """Move the cursor to time_seconds, opening and closing intervals."""
+        if self._time is not None and time_seconds < self._time:
+            self.reset()
+        self._time = time_seconds
+
+        while (self._next_element < len(self.by_start) and
+               self.elements[self.by_start[self._next_element]]['startTime'] <= time_seconds):
+            self._active_elements.append(self.by_start[self._next_element])
+            self._next_element += 1
+        self._active_elements = [
+            i for i in self._active_elements if self.elements[i]['endTime'] > time_seconds
+        ]
+
+        while (self._next_overlap < len(self.overlaps) and
+               self.overlaps[self._next_overlap]['start'] <= time_seconds):
+            self._active_overlaps.append(self._next_overlap)
+            self._next_overlap += 1
+        self._active_overlaps = [
+            i for i in self._active_overlaps if self.overlaps[i]['end'] >= time_seconds
+        ]
+
+    def element_at(self, time_seconds):
+        """Return the element active at time_seconds (first in list order), or None."""
+        self._advance(time_seconds)
+        if not self._active_elements:
+            return None
+        return self.elements[min(self._active_elements)]
+
+    def transition_state(self, time_seconds):
+        """Return (current, next, progress, transition_name) for time_seconds.
+
+        Inside an overlap window the first overlapping pair (in start order)
+        wins; outside, next/progress/transition_name are None.
+        """
+        self._advance(time_seconds)
+        if self._active_overlaps:
+            overlap = self.overlaps[min(self._active_overlaps)]
+            progress = (time_seconds - overlap['start']) / (overlap['end'] - overlap['start'])
+            progress = max(0.0, min(1.0, progress))
+            return overlap['current'], overlap['next'], progress, overlap['transition_name']
+
+        if not self._active_elements:
+            return None, None, None, None
+        return self.elements[min(self._active_elements)], None, None, None
+
+
+class GreenScreenCompositor:
+    """File-like frame sink that keys Layer 0 over Layer 1 frames in numpy.
+
+    Used for single still frames (frame_worker.py), where starting FFmpeg would
+    cost more than the frame; full renders run GREENSCREEN_FILTER in the encoder.
+    Follows the same chain: colorkey 0x00d600 (similarity 0.38, no blend), a 5x5
+    box blur of the matte to soften jaggies, then an alpha overlay. Gap frames
+    (None) pass straight through.
+    """
+
+    KEY_COLOR = (0, 214, 0)
+    SIMILARITY = 0.38
+    BLUR_RADIUS = 2
+
+    def __init__(self, output, overlay_frames, width, height):
+        self.output = output
+        self.overlay_frames = overlay_frames
+        self.width = width
+        self.height = height
+
+    def key_matte(self, frame):
+        """Alpha matte (0..1) of an RGB frame: 0 where it matches the key color."""
+        diff = frame.astype(np.float32) - np.array(self.KEY_COLOR, dtype=np.float32)
+        distance = np.sqrt(np.sum(diff * diff, axis=2) / (255.0 * 255.0 * 3.0))
+        matte = (distance > self.SIMILARITY).astype(np.float32)
+
+        # Separable box blur with edge padding (FFmpeg boxblur=2:1)
+        radius = self.BLUR_RADIUS
+        size = 2 * radius + 1
+        padded = np.pad(matte, radius, mode='edge')
+        rows = sum(padded[i:i + self.height, :] for i in range(size)) / size
+        return sum(rows[:, i:i + self.width] for i in range(size)) / size
+
+    def write(self, data):
+        """Composite the next Layer 0 frame (if any) over one Layer 1 frame and pass it on."""
+        frame = next(self.overlay_frames, None)
+        if frame is None:
+            self.output.write(data)
+            return
+
+        matte = self.key_matte(frame)[..., np.newaxis]
+        background = np.frombuffer(data, dtype=np.uint8).reshape(self.height, self.width, 3).astype(np.float32)
+        composite = background + (frame.astype(np.float32) - background) * matte
+        self.output.write((composite + 0.5).astype(np.uint8).tobytes())
+
+
+class OverlayFeed:
+    """Streams Layer 0 frames into the encoder's second input from a background thread.
+
+    The encoder keys and overlays them itself (GREENSCREEN_FILTER), so the render
+    thread only feeds Layer 1. On POSIX the encoder inherits the read end of a
+    pipe (pipe:<fd>); Windows can't pass FFmpeg an extra descriptor, so there
+    FFmpeg connects to a one-shot loopback socket instead.
+    """
+
+    ACCEPT_TIMEOUT = 30  # Seconds to wait for FFmpeg to connect (Windows)
+
+    def __init__(self, frames, fill_frame):
+        self.frames = frames          # RGB arrays, None for gaps (see iter_greenscreen_frames)
+        self.fill_frame = fill_frame  # Written for gaps
+        self.stopped = threading.Event()
+        self.thread = None
+        self.error = None
+        self.output = None
+        self.read_fd = None
+        self.listener = None
+
+        if os.name == 'posix':
+            self.read_fd, write_fd = os.pipe()
+            self.output = os.fdopen(write_fd, 'wb')
+            self.source = f'pipe:{self.read_fd}'
+        else:
+            self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.listener.bind(('127.0.0.1', 0))
+            self.listener.listen(1)
+            self.listener.settimeout(self.ACCEPT_TIMEOUT)
+            self.source = f'tcp://127.0.0.1:{self.listener.getsockname()[1]}'
+
+    def popen_kwargs(self):
+        """Extra subprocess.Popen arguments for the encoder."""
+        return {'pass_fds': (self.read_fd,)} if self.read_fd is not None else {}
+
+    def start(self, threaded=True):
+        """Start feeding (call once the encoder is running).
+
+        With threaded=False nothing is started; the caller runs run() itself.
+        """
+        if self.read_fd is not None:
+            os.close(self.read_fd)  # The encoder has its own copy
+            self.read_fd = None
+        if threaded:
+            self.thread = threading.Thread(target=self.run, name='layer0-feed', daemon=True)
+            self.thread.start()
+
+    def run(self, progress=None):
+        """Write one Layer 0 frame per output frame, then close the input.
+
+        progress(frame_idx) is called after each frame.
+        """
+        try:
+            if self.listener is not None:
+                connection, _ = self.listener.accept()
+                self.listener.close()
+                self.output = connection.makefile('wb')
+                connection.close()  # The file keeps the socket open
+
+            for frame_idx, frame in enumerate(self.frames):
+                if self.stopped.is_set():
+                    break
+                self.output.write(self.fill_frame if frame is None else np.ascontiguousarray(frame))
+                if progress is not None:
+                    progress(frame_idx)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.frames.close()  # Stops any running clip decoder
+            self.close_output()
+
+    def close_output(self):
+        if self.output is not None:
+            try:
+                self.output.close()
+            except OSError:
+                pass  # The encoder already went away
+
+    def finish(self):
+        """Wait for the last frame to be written; re-raise a Layer 0 failure."""
+        if self.thread is not None:
+            self.thread.join()
+        if self.error is not None and not isinstance(self.error, (BrokenPipeError, ConnectionError)):
+            raise self.error
+
+    def stop(self):
+        """Abandon the feed (the encoder has exited or was killed) and release everything."""
+        self.stopped.set()
+        if self.listener is not None:
+            self.listener.close()
+        if self.thread is not None:
+            self.thread.join()
+            return
+
+        # Never started, or run() on the caller's thread
+        if self.read_fd is not None:
+            os.close(self.read_fd)
+            self.read_fd = None
+        self.frames.close()
+        self.close_output()
+
 
 class TimelineRenderer:
     """Renders videos from timeline JSON manifests with layer-based compositing."""
@@ -30,12 +302,24 @@ class TimelineRenderer:
         self.manifest = self.load_manifest()
         self.setup_logging()
         self.ctx = None
+        self.profiler = RenderProfiler()
         self.temp_dir = Path(tempfile.mkdtemp(prefix="timeline_render_"))
         self.logger.info(f"Temporary directory: {self.temp_dir}")
 
         # Track current transition for logging (only log start/end)
         self.current_transition_name = None
         self.current_transition_pair = None  # (from_shader, to_shader)
+
+        # Share of overall progress reported by each layer pass (start%, end%)
+        self.progress_ranges = {'layer1': (0.0, 95.0)}
+
+        # Constant frames (green fill, black) built once per size and reused
+        self.fill_frame_cache = {}
+
+        # Structured progress events: at most one per event_interval seconds
+        self.event_interval = 0.5
+        self.last_event_time = 0.0
+        self.frames_started_at = None
         
     def load_manifest(self):
         """Load timeline render manifest from JSON file."""
@@ -100,6 +384,13 @@ class TimelineRenderer:
     def get_frame_rate(self):
         """Get frame rate from manifest."""
         return self.manifest.get('frame_rate', 30)
+
+    def get_encoding(self):
+        """Get x264 encoder settings (crf, preset) from manifest.
+
+        Preview renders pass a fast preset and a higher CRF here.
+        """
+        return {**DEFAULT_ENCODING, **self.manifest.get('encoding', {})}
     
     def render(self):
         """Main render pipeline."""
@@ -143,52 +434,25 @@ class TimelineRenderer:
             self.logger.info(f"Duration: {duration}s")
             self.logger.info(f"Resolution: {width}x{height}")
             self.logger.info(f"Frame Rate: {frame_rate} fps")
-            
-            # Render Layer 1 (Shaders & Transitions) - Bottom visual layer
+            if self.manifest.get('preview'):
+                self.logger.info("Preview render: reduced resolution and frame rate")
+
+            output_path = self.get_output_path()
+
+            # Layer 0 (Green Screen Videos) - Top visual layer. Clips are decoded while
+            # Layer 1 renders and composited on the way into the final encode
+            greenscreen_frames = self.render_greenscreen_layer()
+
+            # Render Layer 1 (Shaders & Transitions) - Bottom visual layer, encoded to the final output
+            layer1_progress = self.progress_ranges['layer1'][0]
             self.logger.info("\n" + "="*80)
             self.logger.info("--- Rendering Layer 1: Shaders & Transitions ---")
             self.logger.info("="*80)
-            self.logger.info(f"PROGRESS: 0.0% | STAGE: Starting Layer 1 | ITEM: Shaders & Transitions | TIME: 0.0s/{duration:.1f}s")
+            self.report_progress(layer1_progress, "Starting Layer 1", "Shaders & Transitions", 0.0)
             layer1_start = time.time()
-            layer1_video = self.render_shader_layer()
+            final_video = self.render_shader_layer(output_path, greenscreen_frames)
             layer1_elapsed = time.time() - layer1_start
-            self.logger.info(f"✓ Layer 1 rendered in {layer1_elapsed:.1f}s")
-            self.log_file_info(layer1_video, "Layer 1 (Shaders)")
-
-            # Render Layer 0 (Green Screen Videos) - Top visual layer
-            self.logger.info("\n" + "="*80)
-            self.logger.info("--- Rendering Layer 0: Green Screen Videos ---")
-            self.logger.info("="*80)
-            self.logger.info(f"PROGRESS: 60.0% | STAGE: Starting Layer 0 | ITEM: Green Screen Videos | TIME: 0.0s/{duration:.1f}s")
-            layer0_start = time.time()
-            layer0_video = self.render_greenscreen_layer()
-            layer0_elapsed = time.time() - layer0_start
-            if layer0_video:
-                self.logger.info(f"✓ Layer 0 rendered in {layer0_elapsed:.1f}s")
-                self.log_file_info(layer0_video, "Layer 0 (Green Screen)")
-            else:
-                self.logger.info(f"✓ Layer 0 skipped (no videos) in {layer0_elapsed:.1f}s")
-
-            # Composite layers (shader layer on bottom, green screen on top)
-            self.logger.info("\n" + "="*80)
-            self.logger.info("--- Compositing Layers ---")
-            self.logger.info("="*80)
-            self.logger.info(f"PROGRESS: 75.0% | STAGE: Compositing layers | ITEM: Applying chroma key | TIME: 0.0s/{duration:.1f}s")
-            composite_start = time.time()
-            composite_video = self.composite_layers(layer1_video, layer0_video)
-            composite_elapsed = time.time() - composite_start
-            self.logger.info(f"✓ Composite created in {composite_elapsed:.1f}s")
-            self.log_file_info(composite_video, "Composite")
-
-            # Add audio
-            self.logger.info("\n" + "="*80)
-            self.logger.info("--- Adding Audio Track ---")
-            self.logger.info("="*80)
-            self.logger.info(f"PROGRESS: 85.0% | STAGE: Adding audio | ITEM: Muxing with FFmpeg | TIME: 0.0s/{duration:.1f}s")
-            audio_start = time.time()
-            final_video = self.add_audio(composite_video)
-            audio_elapsed = time.time() - audio_start
-            self.logger.info(f"✓ Audio added in {audio_elapsed:.1f}s")
+            self.logger.info(f"✓ Layer 1 rendered and encoded in {layer1_elapsed:.1f}s")
             self.log_file_info(final_video, "Final Video")
 
             elapsed = time.time() - start_time
@@ -196,6 +460,11 @@ class TimelineRenderer:
             self.logger.info(f"=== Rendering Completed in {elapsed:.1f} seconds ===")
             self.logger.info("="*80)
             self.logger.info(f"Output: {final_video}")
+            profile_path = self.finish_profile('completed')
+            self.emit_event(
+                'completed', progress=100.0, output=str(final_video), elapsed=round(elapsed, 2),
+                profile=str(profile_path) if profile_path else None
+            )
             
             return final_video
             
@@ -203,6 +472,8 @@ class TimelineRenderer:
             self.logger.error(f"Rendering failed: {e}")
             import traceback
             traceback.print_exc()
+            self.finish_profile('failed')
+            self.emit_event('failed', error=str(e))
             return None
         
         finally:
@@ -210,6 +481,69 @@ class TimelineRenderer:
             self.logger.info(f"\n=== Cleaning up temporary files from: {self.temp_dir} ===")
             self.cleanup()  # Re-enabled - removes temp files after successful render
     
+    def finish_profile(self, status):
+        """Write this render's stage timings (manifest "profile_report" path, or Cache/render_profiles/)."""
+        width, height = self.get_resolution()
+        return self.profiler.finish(
+            self.manifest.get('project_name', 'timeline_render'), self.logger,
+            path=self.manifest.get('profile_report'), status=status, renderer='timeline',
+            resolution=f"{width}x{height}", frame_rate=self.get_frame_rate(),
+            duration=self.manifest['timeline']['duration'], preview=bool(self.manifest.get('preview'))
+        )
+
+    def emit_event(self, event, **fields):
+        """Print one structured render event as a JSON line on stdout."""
+        fields['event'] = event
+        print(RENDER_EVENT_PREFIX + json.dumps(fields), flush=True)
+
+    def report_progress(self, progress, stage, item, time_seconds, frame_idx=None, total_frames=None, log=True):
+        """Log a PROGRESS line and publish it as a structured progress event."""
+        duration = self.manifest['timeline']['duration']
+        if log:
+            self.logger.info(f"PROGRESS: {progress:.1f}% | STAGE: {stage} | ITEM: {item} | TIME: {time_seconds:.1f}s/{duration:.1f}s")
+        self.emit_event(
+            'progress', progress=round(progress, 2), stage=stage, item=item,
+            time=round(time_seconds, 2), duration=duration,
+            **self.frame_rate_stats(frame_idx, total_frames)
+        )
+        self.last_event_time = time.time()
+
+    def frame_rate_stats(self, frame_idx, total_frames):
+        """Frame counters, render fps and ETA for a progress event."""
+        if frame_idx is None or not total_frames:
+            return {}
+
+        now = time.time()
+        if self.frames_started_at is None or frame_idx == 0:
+            self.frames_started_at = now
+
+        stats = {'frame': frame_idx, 'total_frames': total_frames}
+        elapsed = now - self.frames_started_at
+        if frame_idx > 0 and elapsed > 0:
+            fps = frame_idx / elapsed
+            stats['fps'] = round(fps, 2)
+            stats['eta'] = round((total_frames - frame_idx) / fps, 1)
+        return stats
+
+    def report_frame_progress(self, frame_idx, total_frames, stage, item):
+        """Per-frame progress hook for the Layer 1 loop.
+
+        Logs a PROGRESS line every 2 seconds of video and publishes events at most
+        every event_interval seconds of wall time in between.
+        """
+        frame_rate = self.get_frame_rate()
+        log_line = frame_idx % (frame_rate * 2) == 0  # Every 2 seconds
+
+        if not log_line and time.time() - self.last_event_time < self.event_interval:
+            return
+
+        # Layer 1 (shaders) is encoded as it renders, so it covers most of the range
+        progress_start, progress_end = self.progress_ranges['layer1']
+        progress = progress_start + (frame_idx / total_frames) * (progress_end - progress_start)
+        time_seconds = frame_idx / frame_rate
+
+        self.report_progress(progress, stage, item, time_seconds, frame_idx, total_frames, log=log_line)
+
     def log_file_info(self, file_path, description):
         """Log detailed information about a generated file."""
         if file_path and Path(file_path).exists():
@@ -247,22 +581,21 @@ class TimelineRenderer:
         # Store transition mapping for later use
         self.transition_mapping = {}
 
+        # Index transitions by their boundary times (first match wins, as before)
+        transitions_by_start = {}
+        transitions_by_end = {}
+        for trans in transition_elements:
+            transitions_by_start.setdefault(trans['startTime'], trans)
+            transitions_by_end.setdefault(trans['endTime'], trans)
+
         for i, shader in enumerate(shader_elements):
             shader_element = shader.copy()
 
             # Check if there's a transition after this shader
-            transition_after = None
-            for trans in transition_elements:
-                if trans['startTime'] == shader['endTime']:
-                    transition_after = trans
-                    break
+            transition_after = transitions_by_start.get(shader['endTime'])
 
             # Check if there's a transition before this shader
-            transition_before = None
-            for trans in transition_elements:
-                if trans['endTime'] == shader['startTime']:
-                    transition_before = trans
-                    break
+            transition_before = transitions_by_end.get(shader['startTime'])
 
             # Extend shader times to create overlaps during transitions
             if transition_after:
@@ -282,41 +615,98 @@ class TimelineRenderer:
 
         return converted_elements
 
-    def render_shader_layer(self):
-        """Render all shaders and transitions on Layer 1 (bottom visual layer)."""
+    def render_shader_layer(self, output_path, greenscreen_frames=None):
+        """Render all shaders and transitions on Layer 1 (bottom visual layer).
+
+        Frames are piped straight into the final FFmpeg encode, so no intermediate
+        Layer 1 video is written. When greenscreen_frames (a Layer 0 frame source)
+        is given, it is streamed into the same encoder as a second input (OverlayFeed)
+        and keyed over Layer 1 there. Returns the path of the finished video.
+        """
         layer1_elements = self.get_elements_by_layer(1)
+        compiled_shaders = None
 
-        if not layer1_elements:
-            self.logger.warning("No elements on Layer 1, creating black video")
-            return self.create_black_video()
+        if layer1_elements:
+            self.logger.info(f"Found {len(layer1_elements)} elements on Layer 1")
 
-        self.logger.info(f"Found {len(layer1_elements)} elements on Layer 1")
+            # Convert web interface timeline to overlapping format for transitions
+            original_count = len(layer1_elements)
+            layer1_elements = self.convert_web_interface_timeline(layer1_elements)
+            self.logger.info(f"Converted from {original_count} elements to {len(layer1_elements)} overlapping shader elements")
 
-        # Convert web interface timeline to overlapping format for transitions
-        original_count = len(layer1_elements)
-        layer1_elements = self.convert_web_interface_timeline(layer1_elements)
-        self.logger.info(f"Converted from {original_count} elements to {len(layer1_elements)} overlapping shader elements")
+            # Initialize OpenGL context
+            self.ctx = self.create_gl_context()
+            if self.manifest.get('gpu_timers'):
+                self.profiler.enable_gpu_timers(self.ctx)
 
-        # Initialize OpenGL context
-        self.ctx = moderngl.create_standalone_context()
+            # Load audio for audio-reactive effects
+            audio_path = Path(self.manifest['audio']['path'])
+            audio_data = self.load_audio(audio_path)
 
-        # Load audio for audio-reactive effects
-        audio_path = Path(self.manifest['audio']['path'])
-        audio_data = self.load_audio(audio_path)
+            # Precompile all shaders and transitions
+            compiled_shaders = self.precompile_shaders(layer1_elements)
+        else:
+            self.logger.warning("No elements on Layer 1, using a black background")
+
+        # Render the layer straight into the final encode (an empty layer is generated
+        # by FFmpeg); Layer 0 is streamed into the same encoder as a second input and
+        # keyed over it there
+        width, height = self.get_resolution()
+        frame_rate = self.get_frame_rate()
+        if compiled_shaders is not None:
+            video_input_args = self.raw_video_input_args('-', width, height, frame_rate)
+        else:
+            video_input_args = self.black_video_input_args()
+        overlay_feed = None
+        overlay_input_args = None
+        if greenscreen_frames is not None:
+            overlay_feed = OverlayFeed(
+                greenscreen_frames, self.get_fill_frame(width, height, GREENSCREEN_FILL_COLOR)
+            )
+            overlay_input_args = self.raw_video_input_args(overlay_feed.source, width, height, frame_rate)
+        cmd = self.build_encode_command(video_input_args, output_path, overlay_input_args)
 
-        # Precompile all shaders and transitions
-        compiled_shaders = self.precompile_shaders(layer1_elements)
+        try:
+            encoder = self.start_encoder(cmd, overlay_feed.popen_kwargs() if overlay_feed else {})
+            if overlay_feed is not None:
+                overlay_feed.start(threaded=compiled_shaders is not None)
 
-        # Render the layer
-        output_path = self.temp_dir / "layer1_raw.mp4"
-        self.render_layer1_timeline(layer1_elements, compiled_shaders, audio_data, output_path)
+            try:
+                if compiled_shaders is not None:
+                    self.render_layer1_timeline(layer1_elements, compiled_shaders, audio_data, encoder.stdin)
+                elif overlay_feed is not None:
+                    # Nothing to render; feed Layer 0 from this thread and report progress as it goes
+                    total_frames = int(self.manifest['timeline']['duration'] * frame_rate)
+                    overlay_feed.run(lambda frame_idx: self.report_frame_progress(
+                        frame_idx, total_frames, "Rendering shader", "Black background"
+                    ))
+                    overlay_feed.finish()
+            except BrokenPipeError:
+                self.logger.error("❌ FFmpeg closed its input before Layer 1 finished")
+                self.finish_encoder(encoder, cmd)
+                raise
+            except Exception:
+                encoder.kill()
+                encoder.wait()
+                raise
+
+            duration = self.manifest['timeline']['duration']
+            progress_end = self.progress_ranges['layer1'][1]
+            self.report_progress(progress_end, "Finalizing", "Encoding final video", duration)
+            self.finish_encoder(encoder, cmd)
+            if overlay_feed is not None:
+                overlay_feed.finish()
+        finally:
+            if overlay_feed is not None:
+                overlay_feed.stop()
 
         return output_path
     
     def render_greenscreen_layer(self):
-        """Render green screen videos on Layer 0 (top visual layer).
+        """Prepare green screen videos on Layer 0 (top visual layer).
 
-        Returns path to raw RGB file (not MP4) - chroma key will be applied during compositing.
+        Returns a frame source (see iter_greenscreen_frames) that is consumed while
+        Layer 1 renders, or None when the layer is empty.
         """
         layer0_elements = self.get_elements_by_layer(0)
 
@@ -326,146 +716,133 @@ class TimelineRenderer:
 
         self.logger.info(f"Found {len(layer0_elements)} video elements on Layer 0")
 
-        # Render to raw RGB file (chroma key applied later during compositing)
-        raw_rgb_path = self.render_video_layer(layer0_elements, None)
-
-        return raw_rgb_path
+        return self.iter_greenscreen_frames(layer0_elements)
     
-    def composite_layers(self, shader_layer_path, greenscreen_layer_path):
-        """Composite all layers together using FFmpeg with chroma key applied during compositing.
-
-        This method combines chroma key and compositing into a single FFmpeg command to avoid
-        alpha channel loss that occurs when creating intermediate files.
+    def create_gl_context(self):
+        """Create the OpenGL context for this render (long-lived processes share one)."""
+        return create_context()
 
-        Args:
-            shader_layer_path: Path to Layer 1 (shaders/transitions - bottom layer)
-            greenscreen_layer_path: Path to Layer 0 raw RGB file or None
-        """
-        if greenscreen_layer_path is None:
-            self.logger.info("No Layer 0 (green screen) content, using Layer 1 (shaders) only")
-            return shader_layer_path
+    def release_texture(self, texture):
+        """Drop a shader's reference to a texture (freed when no shader uses it)."""
+        TextureCache.for_context(self.ctx).release(texture)
 
-        output_path = self.temp_dir / "composite.mp4"
-
-        # Get resolution and frame rate from manifest
-        width, height = self.get_resolution()
-        frame_rate = self.get_frame_rate()
+    def get_output_path(self):
+        """Get the final output path (Output_Video/<project_name>.mp4)."""
+        project_name = self.manifest.get('project_name', 'timeline_render')
+        output_dir = Path('Output_Video')
+        output_dir.mkdir(parents=True, exist_ok=True)
+        return output_dir / f"{project_name}.mp4"
 
-        self.logger.info("\n🎬 COMPOSITING LAYERS WITH CHROMA KEY")
-        self.logger.info(f"Background (Layer 1 - Shaders): {shader_layer_path}")
-        self.logger.info(f"Overlay (Layer 0 - Green Screen Raw): {greenscreen_layer_path}")
-        self.logger.info(f"Output: {output_path}")
-        self.logger.info(f"Resolution: {width}x{height} @ {frame_rate}fps")
-        self.logger.info("Chroma key color: 0x00d600 (rgb(0, 214, 0))")
-        self.logger.info("Similarity: 0.38, Blend: 0.0")
-        self.logger.info("Alpha processing: Extract → Blur (2:1) → Merge (reduces jaggies)")
-
-        # Single-pass FFmpeg command that:
-        # 1. Takes layer1_raw.mp4 (shaders) as input [0]
-        # 2. Takes layer0_raw.rgb (raw green screen) as input [1]
-        # 3. Applies chroma key to remove green from [1]
-        # 4. Extracts alpha, blurs it to soften edges, reapplies it
-        # 5. Overlays result on [0]
-        cmd = [
-            'ffmpeg',
-            '-y',
-            '-i', str(shader_layer_path),  # Input 0: Layer 1 (shaders)
+    def raw_video_input_args(self, source, width, height, frame_rate):
+        """FFmpeg input arguments for raw RGB frames read from a file or '-' (stdin)."""
+        return [
             '-f', 'rawvideo',
             '-pixel_format', 'rgb24',
             '-video_size', f'{width}x{height}',
             '-framerate', str(frame_rate),
-            '-i', str(greenscreen_layer_path),  # Input 1: Layer 0 raw RGB
-            '-filter_complex',
-            '[1:v]format=rgba,colorkey=0x00d600:0.38:0.0,split[fga][fgc];'
-            '[fga]alphaextract,boxblur=2:1[matte];'
-            '[fgc][matte]alphamerge[fg];'
-            '[0:v][fg]overlay=0:0:format=auto',
-            '-c:v', 'libx264',
-            '-crf', '18',
-            '-preset', 'medium',
-            '-pix_fmt', 'yuv420p',
-            str(output_path)
+            '-i', str(source),
         ]
 
-        # Log the full command for manual testing
-        cmd_str = ' '.join(str(c) for c in cmd)
-        self.logger.info("\n📋 FFmpeg Command (copy/paste to test manually):")
-        self.logger.info(cmd_str)
-
-        self.logger.info("\n⏳ Running FFmpeg composite with chroma key...")
-        result = subprocess.run(cmd, capture_output=True, text=True)
-
-        if result.returncode != 0:
-            self.logger.error(f"❌ FFmpeg composite failed!")
-            self.logger.error(f"Return code: {result.returncode}")
-            self.logger.error(f"stderr: {result.stderr}")
-            raise subprocess.CalledProcessError(result.returncode, cmd, result.stderr)
-
-        # Log FFmpeg output for debugging
-        if result.stderr:
-            self.logger.debug("FFmpeg stderr output:")
-            for line in result.stderr.split('\n'):
-                if line.strip() and ('frame=' in line or 'error' in line.lower() or 'warning' in line.lower()):
-                    self.logger.debug(f"  {line}")
+    def black_video_input_args(self):
+        """FFmpeg input args for a generated black Layer 1 (no frames are streamed)."""
+        width, height = self.get_resolution()
+        frame_rate = self.get_frame_rate()
+        duration = self.manifest['timeline']['duration']
+        return ['-f', 'lavfi', '-i', f'color=c=black:s={width}x{height}:r={frame_rate}:d={duration}']
 
-        self.logger.info("✓ Layers composited with chroma key applied")
+    def build_encode_command(self, video_input_args, output_path, overlay_input_args=None):
+        """Build the single FFmpeg command that produces the final video.
 
-        return output_path
-    
-    def add_audio(self, video_path):
-        """Add audio track to final video."""
+        Input 0 is Layer 1, given by video_input_args. When overlay_input_args (Layer 0)
+        is given it is chroma keyed and overlaid on top (GREENSCREEN_FILTER). The audio
+        track is muxed in the same pass, so the video is only encoded once.
+        """
         audio_path = Path(self.manifest['audio']['path'])
+        encoding = self.get_encoding()
 
-        # Generate output filename
-        project_name = self.manifest.get('project_name', 'timeline_render')
-        output_dir = Path('Output_Video')
-        output_dir.mkdir(parents=True, exist_ok=True)
-        output_path = output_dir / f"{project_name}.mp4"
-
-        self.logger.info("\n🎬 ADDING AUDIO TRACK")
-        self.logger.info(f"Video input: {video_path}")
-        self.logger.info(f"Audio input: {audio_path}")
-        self.logger.info(f"Output: {output_path}")
-        self.logger.info("Video codec: copy (no re-encoding)")
-        self.logger.info("Audio codec: aac @ 192k")
-
-        cmd = [
-            'ffmpeg',
-            '-y',
-            '-i', str(video_path),
-            '-i', str(audio_path),
-            '-c:v', 'copy',
+        cmd = ['ffmpeg', '-y'] + list(video_input_args)
+        if overlay_input_args is not None:
+            cmd += list(overlay_input_args)
+            cmd += ['-i', str(audio_path)]
+            cmd += ['-filter_complex', GREENSCREEN_FILTER, '-map', '[vout]', '-map', '2:a:0']
+        else:
+            cmd += ['-i', str(audio_path)]
+            cmd += ['-map', '0:v:0', '-map', '1:a:0']
+        cmd += [
+            '-c:v', 'libx264',
+            '-crf', str(encoding['crf']),
+            '-preset', str(encoding['preset']),
+            '-pix_fmt', 'yuv420p',
             '-c:a', 'aac',
             '-b:a', '192k',
             '-shortest',
             str(output_path)
         ]
+        return cmd
+
+    def start_encoder(self, cmd, popen_kwargs=None):
+        """Start an FFmpeg encoder that reads raw frames from stdin.
+
+        FFmpeg's stderr goes to a log file in the temp directory rather than a pipe,
+        so a chatty encoder can never block the render loop. popen_kwargs (e.g. the
+        Layer 0 pipe to inherit) are passed on to subprocess.Popen.
+        """
+        width, height = self.get_resolution()
+        frame_rate = self.get_frame_rate()
+        encoding = self.get_encoding()
+
+        self.logger.info("\n🎬 ENCODING FINAL VIDEO")
+        self.logger.info(f"Resolution: {width}x{height} @ {frame_rate}fps")
+        self.logger.info(f"Video codec: libx264 (crf {encoding['crf']}, {encoding['preset']}, yuv420p)")
+        self.logger.info("Audio codec: aac @ 192k")
 
         # Log the full command for manual testing
         cmd_str = ' '.join(str(c) for c in cmd)
         self.logger.info("\n📋 FFmpeg Command (copy/paste to test manually):")
         self.logger.info(cmd_str)
 
-        self.logger.info("\n⏳ Running FFmpeg audio merge...")
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        self.encoder_log_path = self.temp_dir / "ffmpeg_encode.log"
+        with open(self.encoder_log_path, 'wb') as log_file:
+            encoder = subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=log_file,
+                **(popen_kwargs or {})
+            )
 
-        if result.returncode != 0:
-            self.logger.error(f"❌ FFmpeg audio merge failed!")
-            self.logger.error(f"Return code: {result.returncode}")
-            self.logger.error(f"stderr: {result.stderr}")
-            raise subprocess.CalledProcessError(result.returncode, cmd, result.stderr)
+        return encoder
+
+    def finish_encoder(self, encoder, cmd):
+        """Close the encoder's input, wait for it to exit and check the result."""
+        try:
+            encoder.stdin.close()
+        except BrokenPipeError:
+            pass
+
+        self.logger.info("\n⏳ Waiting for FFmpeg to finish encoding...")
+        with self.profiler.stage('encode'):
+            returncode = encoder.wait()
+
+        stderr = ''
+        if self.encoder_log_path.exists():
+            stderr = self.encoder_log_path.read_text(errors='replace')
+
+        if returncode != 0:
+            self.logger.error(f"❌ FFmpeg encode failed!")
+            self.logger.error(f"Return code: {returncode}")
+            self.logger.error(f"stderr: {stderr}")
+            raise subprocess.CalledProcessError(returncode, cmd, stderr)
 
         # Log FFmpeg output for debugging
-        if result.stderr:
+        if stderr:
             self.logger.debug("FFmpeg stderr output:")
-            for line in result.stderr.split('\n'):
+            for line in stderr.split('\n'):
                 if line.strip() and ('frame=' in line or 'error' in line.lower() or 'warning' in line.lower()):
                     self.logger.debug(f"  {line}")
 
-        self.logger.info(f"✓ Audio added")
+        self.logger.info("✓ Final video encoded")
 
-        return output_path
-    
     def cleanup(self):
         """Clean up temporary files."""
         if self.temp_dir.exists():
@@ -473,107 +850,18 @@ class TimelineRenderer:
             shutil.rmtree(self.temp_dir)
     
     def load_audio(self, audio_path):
-        """Analyze audio file for reactivity data with high-resolution 1024-point FFT (matching render_shader.py)."""
+        """Analyze audio file for reactivity data at the manifest frame rate (shared with render_shader.py)."""
         self.logger.info(f"Loading audio: {audio_path.name}")
 
         try:
-            # Load audio
             duration = self.manifest['timeline']['duration']
-            y, sr = librosa.load(str(audio_path), sr=None, duration=duration)
-
-            # Calculate frame parameters
-            frame_rate = 30  # Fixed frame rate for timeline rendering
-            total_frames = int(duration * frame_rate)
-            hop_length = len(y) // total_frames
-
-            self.logger.info(f"Audio: {duration:.2f}s, {sr}Hz, {total_frames} frames")
-            self.logger.info(f"FFT: 1024-point, {sr//2}Hz Nyquist, {sr/1024:.1f}Hz per bin")
-
-            # High-resolution 1024-point FFT (Shadertoy-compatible)
-            stft_data = librosa.stft(y, hop_length=hop_length, n_fft=1024)
-
-            # Get magnitude spectrum (512 usable bins from 1024-point FFT)
-            magnitude_spectrum = np.abs(stft_data[:512, :])  # Only first 512 bins (magnitude only)
-
-            # Apply smoothing similar to Shadertoy (0.8 smoothing factor)
-            smoothed_spectrum = np.zeros_like(magnitude_spectrum)
-            smoothing_factor = 0.8
-
-            for frame_idx in range(magnitude_spectrum.shape[1]):
-                if frame_idx == 0:
-                    smoothed_spectrum[:, frame_idx] = magnitude_spectrum[:, frame_idx]
-                else:
-                    smoothed_spectrum[:, frame_idx] = (
-                        smoothing_factor * smoothed_spectrum[:, frame_idx - 1] +
-                        (1.0 - smoothing_factor) * magnitude_spectrum[:, frame_idx]
-                    )
-
-            # Normalize to [0.0, 1.0] range
-            if smoothed_spectrum.max() > 0:
-                smoothed_spectrum = smoothed_spectrum / smoothed_spectrum.max()
-
-            # Extract legacy bass/treble for backward compatibility
-            bass_power = np.mean(smoothed_spectrum[:32, :], axis=0)  # 0-32 bins (low frequencies)
-            treble_power = np.mean(smoothed_spectrum[256:, :], axis=0)  # 256+ bins (high frequencies)
-
-            # Ensure we have the right number of frames
-            if smoothed_spectrum.shape[1] != total_frames:
-                # Interpolate full spectrum
-                new_spectrum = np.zeros((512, total_frames))
-                for bin_idx in range(512):
-                    new_spectrum[bin_idx, :] = np.interp(
-                        np.linspace(0, smoothed_spectrum.shape[1]-1, total_frames),
-                        np.arange(smoothed_spectrum.shape[1]),
-                        smoothed_spectrum[bin_idx, :]
-                    )
-                smoothed_spectrum = new_spectrum
-
-                # Interpolate legacy values
-                bass_power = np.interp(np.linspace(0, len(bass_power)-1, total_frames),
-                                     np.arange(len(bass_power)), bass_power)
-                treble_power = np.interp(np.linspace(0, len(treble_power)-1, total_frames),
-                                       np.arange(len(treble_power)), treble_power)
-
-            # Extract raw waveform samples for oscilloscope
-            waveform_samples = []
-            oscilloscope_duration = 1.0 / 30.0  # 1/30th second window
-            samples_per_window = max(int(sr * oscilloscope_duration), 256)
-
-            for frame_idx in range(total_frames):
-                frame_time = frame_idx / frame_rate
-                center_sample = int(frame_time * sr)
-                start_sample = max(0, center_sample - samples_per_window // 2)
-                end_sample = min(len(y), start_sample + samples_per_window)
-
-                if end_sample - start_sample < samples_per_window:
-                    start_sample = max(0, end_sample - samples_per_window)
-
-                frame_audio = y[start_sample:end_sample]
-
-                # Downsample to exactly 256 samples for texture width
-                if len(frame_audio) >= 256:
-                    indices = np.linspace(0, len(frame_audio) - 1, 256)
-                    frame_waveform = np.interp(indices, np.arange(len(frame_audio)), frame_audio)
-                else:
-                    frame_waveform = np.pad(frame_audio, (0, 256 - len(frame_audio)), 'constant')
-
-                # Normalize to [0, 1] range
-                frame_waveform = (frame_waveform + 1.0) * 0.5
-                waveform_samples.append(frame_waveform)
-
-            self.logger.info(f"✓ Audio loaded: {len(y)/sr:.1f}s, {sr}Hz")
-
-            return {
-                'bass': bass_power,  # Legacy compatibility
-                'treble': treble_power,  # Legacy compatibility
-                'fft_spectrum': smoothed_spectrum,  # New: Full 512-bin spectrum
-                'waveform': waveform_samples,
-                'total_frames': total_frames,
-                'frame_rate': frame_rate,
-                'sample_rate': sr,
-                'nyquist_freq': sr // 2,
-                'freq_per_bin': sr / 1024.0
-            }
+            audio_data = analyze_audio_cached(
+                audio_path, duration, self.get_frame_rate(),
+                normalization='global', cache_dir=AUDIO_ANALYSIS_CACHE_DIR,
+                logger=self.logger, profiler=self.profiler
+            )
+            self.logger.info(f"✓ Audio loaded: {audio_data['total_frames']} frames, {audio_data['sample_rate']}Hz")
+            return audio_data
 
         except Exception as e:
             self.logger.error(f"Failed to load audio: {e}")
@@ -600,12 +888,17 @@ class TimelineRenderer:
             self.logger.error(f"Failed to load metadata: {e}")
             return {}
 
+    @profiled('texture_load')
     def load_cubemap_from_files(self, basename, filter_mode='linear', mipmap=False):
-        """Load 6 images as a cubemap texture from the Cubemaps/ folder."""
-        try:
-            from PIL import Image
-            import numpy as np
+        """Load 6 images as a cubemap texture from the Cubemaps/ folder (shared between shaders)."""
+        return TextureCache.for_context(self.ctx).acquire(
+            'cubemap', Path("Cubemaps") / basename, (filter_mode, mipmap),
+            lambda: self.create_cubemap_from_files(basename, filter_mode, mipmap)
+        )
 
+    def create_cubemap_from_files(self, basename, filter_mode, mipmap):
+        """Decode the six faces of a cubemap and upload them."""
+        try:
             cubemaps_dir = Path("Cubemaps")
 
             # Define face suffixes in ModernGL order: +X, -X, +Y, -Y, +Z, -Z
@@ -614,44 +907,35 @@ class TimelineRenderer:
                          'positive Y (top)', 'negative Y (bottom)',
                          'positive Z (front)', 'negative Z (back)']
 
+            # Decode the faces on worker threads, upload here in order
+            face_paths = [cubemap_face_path(basename, suffix, cubemaps_dir) for suffix in face_suffixes]
+            cache = TextureCache.for_context(self.ctx)
+            cache.prefetch([path for path in face_paths if path is not None], self.logger)
+
             # Load all 6 faces
             faces = []
             face_size = None
 
-            for suffix, name in zip(face_suffixes, face_names):
-                # Try common image extensions
-                face_path = None
-                for ext in ['.png', '.jpg', '.jpeg', '.bmp', '.tga']:
-                    potential_path = cubemaps_dir / f"{basename}_{suffix}{ext}"
-                    if potential_path.exists():
-                        face_path = potential_path
-                        break
-
+            for face_path, suffix, name in zip(face_paths, face_suffixes, face_names):
                 if not face_path:
                     self.logger.error(f"Cubemap face not found: {basename}_{suffix}.* ({name})")
                     return None
 
-                # Load image
-                img = Image.open(face_path)
-                img = img.convert('RGB')
+                # RGB pixels, flipped vertically for OpenGL coordinate system
+                img_data = cache.pixels(face_path, self.logger)
+                height, width = img_data.shape[:2]
 
                 # Validate size
-                if img.size[0] != img.size[1]:
-                    self.logger.error(f"Cubemap face must be square: {face_path.name} is {img.size[0]}x{img.size[1]}")
+                if width != height:
+                    self.logger.error(f"Cubemap face must be square: {face_path.name} is {width}x{height}")
                     return None
 
                 if face_size is None:
-                    face_size = img.size[0]
-                elif img.size[0] != face_size:
-                    self.logger.error(f"All cubemap faces must be same size: {face_path.name} is {img.size[0]}x{img.size[0]}, expected {face_size}x{face_size}")
+                    face_size = width
+                elif width != face_size:
+                    self.logger.error(f"All cubemap faces must be same size: {face_path.name} is {width}x{width}, expected {face_size}x{face_size}")
                     return None
 
-                # Convert to numpy array
-                img_data = np.array(img, dtype=np.uint8)
-
-                # Flip vertically for OpenGL coordinate system
-                img_data = np.flipud(img_data)
-
                 faces.append(img_data)
                 self.logger.info(f"    Loaded cubemap face: {face_path.name} ({name})")
 
@@ -685,22 +969,23 @@ class TimelineRenderer:
             self.logger.error(traceback.format_exc())
             return None
 
+    @profiled('texture_load')
     def load_texture_from_file(self, texture_path, filter_mode='linear', wrap_mode='repeat', mipmap=False):
-        """Load an image file as a ModernGL texture."""
-        try:
-            from PIL import Image
-            import numpy as np
-
-            # Load image
-            img = Image.open(texture_path)
-            img = img.convert('RGB')  # Ensure RGB format
-            img_data = np.array(img, dtype=np.uint8)
+        """Load an image file as a ModernGL texture (shared between shaders, see texture_cache.py)."""
+        return TextureCache.for_context(self.ctx).acquire(
+            'texture', texture_path, (filter_mode, wrap_mode, mipmap),
+            lambda: self.create_texture_from_file(texture_path, filter_mode, wrap_mode, mipmap)
+        )
 
-            # Flip vertically (OpenGL expects bottom-left origin)
-            img_data = np.flipud(img_data)
+    def create_texture_from_file(self, texture_path, filter_mode, wrap_mode, mipmap):
+        """Decode (or load decoded pixels from Cache/textures/) and upload one texture."""
+        try:
+            # RGB pixels, already flipped (OpenGL expects bottom-left origin)
+            img_data = TextureCache.for_context(self.ctx).pixels(texture_path, self.logger)
+            height, width = img_data.shape[:2]
 
             # Create texture
-            texture = self.ctx.texture(img.size, 3, img_data.tobytes())
+            texture = self.ctx.texture((width, height), 3, img_data.tobytes())
 
             # Set filtering
             if filter_mode == 'linear':
@@ -720,7 +1005,7 @@ class TimelineRenderer:
             if mipmap:
                 texture.build_mipmaps()
 
-            self.logger.info(f"    ✓ Loaded texture: {texture_path.name} ({img.size[0]}x{img.size[1]})")
+            self.logger.info(f"    ✓ Loaded texture: {texture_path.name} ({width}x{height})")
             return texture
 
         except Exception as e:
@@ -734,6 +1019,9 @@ class TimelineRenderer:
         if not metadata or not metadata.get('texture'):
             return textures
 
+        # Start decoding every image this shader uses before uploading the first
+        TextureCache.for_context(self.ctx).prefetch(texture_files(metadata), self.logger)
+
         texture_config = metadata['texture']
         textures_dir = Path("Textures")
 
@@ -796,6 +1084,10 @@ class TimelineRenderer:
                         else:
                             self.logger.warning(f"    Texture file not found: {texture_file}")
 
+        # Textures may be evicted under a VRAM budget and reloaded when the shader is next used
+        GpuResources.for_context(self.ctx, self.logger).track_textures(
+            textures, lambda: self.detect_and_load_textures(shader_path, metadata), self.release_texture
+        )
         return textures
 
     def precompile_shaders(self, elements):
@@ -808,6 +1100,12 @@ class TimelineRenderer:
         compiled = {}
         shader_elements = [el for el in elements if el['type'] in ['shader', 'transition']]
 
+        # Decode every texture on worker threads while the shaders compile
+        texture_cache = TextureCache.for_context(self.ctx)
+        for element in shader_elements:
+            if element['type'] == 'shader':
+                texture_cache.prefetch(texture_files(metadata_dict.get(element['name'])), self.logger)
+
         for element in shader_elements:
             shader_path = Path(element['path'])
             shader_name = element['name']
@@ -865,6 +1163,7 @@ class TimelineRenderer:
             except Exception as e:
                 self.logger.error(f"  ✗ Error compiling {shader_name}: {e}")
 
+        texture_cache.discard_prefetched()
         self.logger.info(f"✓ Compiled {len(compiled)}/{len(shader_elements)} shaders")
         return compiled
 
@@ -978,6 +1277,7 @@ class TimelineRenderer:
             self.logger.error(f"Failed to load transition config: {e}")
             return {}
 
+    @profiled('shader_compile')
     def load_transition_shader(self, transition_file, config_data):
         """Load and compile a transition shader with its configuration (matching render_shader.py)."""
         try:
@@ -1173,6 +1473,7 @@ class TimelineRenderer:
 
         return found_buffers
 
+    @profiled('shader_compile')
     def load_shader_from_file(self, shader_path):
         """Load and compile a GLSL shader."""
         try:
@@ -1200,8 +1501,11 @@ class TimelineRenderer:
             self.logger.error(f"Failed to load shader {shader_path}: {e}")
             return None
 
-    def render_layer1_timeline(self, elements, compiled_shaders, audio_data, output_path):
-        """Render Layer 1 (shaders/transitions) with precise timeline timing and transitions."""
+    def render_layer1_timeline(self, elements, compiled_shaders, audio_data, raw_file):
+        """Render Layer 1 (shaders/transitions) with precise timeline timing and transitions.
+
+        Raw RGB frames are written to raw_file (normally the encoder's stdin pipe).
+        """
         self.logger.info("Rendering shader timeline with transitions...")
 
         width, height = self.get_resolution()
@@ -1224,12 +1528,7 @@ class TimelineRenderer:
             color_attachments=[self.ctx.texture((width, height), 4)]
         )
 
-        # Initialize buffer textures for all shaders with buffers
-        resolution = (width, height)
-        for shader_id, shader_data in compiled_shaders.items():
-            if shader_data.get('buffers'):
-                self.logger.info(f"Initializing buffers for {shader_data['element']['name']}")
-                self.initialize_buffer_textures(shader_data, resolution)
+        # Buffer targets are allocated when a shader first renders (render_shader_frame)
 
         # Create vertex buffer for full-screen quad
         vertices = np.array([
@@ -1245,174 +1544,132 @@ class TimelineRenderer:
         # Precompile only the transitions that are actually used in the timeline
         compiled_transitions = self.precompile_used_transitions(elements)
 
-        # Open raw video file for writing
-        raw_file = open(self.temp_dir / "layer1_raw.rgb", 'wb')
+        # Compile the timeline once into an interval index for per-frame lookups
+        timeline_index = TimelineIndex(elements, getattr(self, 'transition_mapping', {}))
+        self.logger.info(f"Timeline index: {len(timeline_index.elements)} elements, {len(timeline_index.overlaps)} transition windows")
 
+        # Render each frame
         try:
-            # Render each frame
             for frame_idx in range(total_frames):
-                time_seconds = frame_idx / frame_rate
+                with self.profiler.stage('frame_draw'):
+                    current_element = self.render_layer1_frame(
+                        timeline_index, compiled_shaders, compiled_transitions,
+                        vbo, fbo, audio_data, frame_idx, frame_rate, raw_file
+                    )
+
+                # Structured progress output for web UI (log line + event)
+                current_shader_name = current_element['name'] if current_element else "None"
+                self.report_frame_progress(frame_idx, total_frames, "Rendering shader", current_shader_name)
+        finally:
+            # Free per-render GPU memory (the context may outlive this render)
+            gpu_resources = GpuResources.for_context(self.ctx)
+            self.logger.info(f"GPU memory: {gpu_resources.stats()}")
+            self.release_buffer_textures(compiled_shaders)
+            gpu_resources.release_idle()
+            for attachment in fbo.color_attachments:
+                attachment.release()
+            fbo.release()
+            vbo.release()
+
+        self.logger.info("✓ Layer 1 (shaders) rendering complete")
+
+    def render_layer1_frame(self, timeline_index, compiled_shaders, compiled_transitions,
+                            vbo, fbo, audio_data, frame_idx, frame_rate, raw_file):
+        """Render one Layer 1 frame (shader, transition or black) into raw_file.
+
+        Returns the element active at this frame (None if nothing is).
+        """
+        time_seconds = frame_idx / frame_rate
 
-                # Find current and next elements for transition handling
-                result = self.find_transition_state(
-                    elements, time_seconds, transition_duration, overlap_duration
+        # Find current and next elements for transition handling
+        current_element, next_element, transition_progress, transition_name = \
+            timeline_index.transition_state(time_seconds)
+
+        if transition_progress is not None:
+            # We're in a transition - blend two shaders
+            if (current_element and current_element['id'] in compiled_shaders and
+                next_element and next_element['id'] in compiled_shaders):
+
+                # Select the SPECIFIC transition shader chosen by user
+                # Pass shader names for transition tracking
+                transition_shader = self.select_transition_shader(
+                    compiled_transitions,
+                    transition_name,
+                    from_shader=current_element['name'],
+                    to_shader=next_element['name']
                 )
 
-                if len(result) == 4:
-                    current_element, next_element, transition_progress, transition_name = result
+                # Check if transition is ending (progress >= 0.99)
+                if transition_progress >= 0.99 and self.current_transition_name:
+                    self.logger.info(f"✓ Completed transition: {self.current_transition_name} (progress: {transition_progress:.3f})")
+                    # Clear transition state
+                    self.current_transition_name = None
+                    self.current_transition_pair = None
+
+                # DEBUG: Log transition details periodically
+                if frame_idx % 15 == 0:  # Log every 15 frames (0.5s at 30fps)
+                    transition_used = transition_name if transition_name else (transition_shader['name'] if transition_shader else "None")
+                    self.logger.debug(f"TRANSITION FRAME: {time_seconds:.2f}s - {current_element['name']} -> {next_element['name']} (progress: {transition_progress:.3f}) using transition: {transition_used}")
+
+                self.logger.debug(f"Rendering transition frame at {time_seconds:.2f}s: {current_element['name']} -> {next_element['name']} (progress: {transition_progress:.3f})")
+
+                if transition_shader:
+                    self.logger.debug(f"Using complex transition shader at {time_seconds:.2f}s")
+                    self.render_transition_frame(
+                        compiled_shaders[current_element['id']],
+                        compiled_shaders[next_element['id']],
+                        transition_shader,
+                        vbo, fbo, audio_data, frame_idx, frame_rate,
+                        transition_progress, raw_file
+                    )
                 else:
-                    # Legacy format for backward compatibility
-                    current_element, next_element, transition_progress = result
-                    transition_name = None
-
-                if transition_progress is not None:
-                    # We're in a transition - blend two shaders
-                    if (current_element and current_element['id'] in compiled_shaders and
-                        next_element and next_element['id'] in compiled_shaders):
-
-                        # Select the SPECIFIC transition shader chosen by user
-                        # Pass shader names for transition tracking
-                        transition_shader = self.select_transition_shader(
-                            compiled_transitions,
-                            transition_name,
-                            from_shader=current_element['name'],
-                            to_shader=next_element['name']
-                        )
-
-                        # Check if transition is ending (progress >= 0.99)
-                        if transition_progress >= 0.99 and self.current_transition_name:
-                            self.logger.info(f"✓ Completed transition: {self.current_transition_name} (progress: {transition_progress:.3f})")
-                            # Clear transition state
-                            self.current_transition_name = None
-                            self.current_transition_pair = None
-
-                        # DEBUG: Log transition details periodically
-                        if frame_idx % 15 == 0:  # Log every 15 frames (0.5s at 30fps)
-                            transition_used = transition_name if transition_name else (transition_shader['name'] if transition_shader else "None")
-                            self.logger.debug(f"TRANSITION FRAME: {time_seconds:.2f}s - {current_element['name']} -> {next_element['name']} (progress: {transition_progress:.3f}) using transition: {transition_used}")
-
-                        self.logger.debug(f"Rendering transition frame at {time_seconds:.2f}s: {current_element['name']} -> {next_element['name']} (progress: {transition_progress:.3f})")
-
-                        if transition_shader:
-                            self.logger.debug(f"Using complex transition shader at {time_seconds:.2f}s")
-                            self.render_transition_frame(
-                                compiled_shaders[current_element['id']],
-                                compiled_shaders[next_element['id']],
-                                transition_shader,
-                                vbo, fbo, audio_data, frame_idx, frame_rate,
-                                transition_progress, raw_file
-                            )
-                        else:
-                            # Fallback to simple alpha blend if no transition shader
-                            self.logger.debug(f"Using simple alpha blend transition at {time_seconds:.2f}s")
-                            self.render_simple_transition_frame(
-                                compiled_shaders[current_element['id']],
-                                compiled_shaders[next_element['id']],
-                                vbo, fbo, audio_data, frame_idx, frame_rate,
-                                transition_progress, raw_file
-                            )
-                    else:
-                        # Fallback to single shader or black
-                        self.logger.warning(f"Transition fallback at {time_seconds:.2f}s - missing shaders: current={current_element['name'] if current_element else 'None'}, next={next_element['name'] if next_element else 'None'}")
-                        if current_element and current_element['id'] in compiled_shaders:
-                            self.render_shader_frame(
-                                compiled_shaders[current_element['id']], vbo, fbo,
-                                audio_data, frame_idx, frame_rate, raw_file
-                            )
-                        else:
-                            self.logger.warning(f"Rendering black frame at {time_seconds:.2f}s - no valid shader")
-                            self.render_black_frame(fbo, raw_file)
+                    # Fallback to simple alpha blend if no transition shader
+                    self.logger.debug(f"Using simple alpha blend transition at {time_seconds:.2f}s")
+                    self.render_simple_transition_frame(
+                        compiled_shaders[current_element['id']],
+                        compiled_shaders[next_element['id']],
+                        vbo, fbo, audio_data, frame_idx, frame_rate,
+                        transition_progress, raw_file
+                    )
+            else:
+                # Fallback to single shader or black
+                self.logger.warning(f"Transition fallback at {time_seconds:.2f}s - missing shaders: current={current_element['name'] if current_element else 'None'}, next={next_element['name'] if next_element else 'None'}")
+                if current_element and current_element['id'] in compiled_shaders:
+                    self.render_shader_frame(
+                        compiled_shaders[current_element['id']], vbo, fbo,
+                        audio_data, frame_idx, frame_rate, raw_file
+                    )
                 else:
-                    # Normal single shader rendering (not in transition)
-                    # Clear transition state if we were in one
-                    if self.current_transition_name:
-                        self.logger.info(f"✓ Transition ended: {self.current_transition_name}")
-                        self.current_transition_name = None
-                        self.current_transition_pair = None
-
-                    if current_element and current_element['id'] in compiled_shaders:
-                        self.logger.debug(f"Rendering normal shader frame at {time_seconds:.2f}s: {current_element['name']}")
-                        self.render_shader_frame(
-                            compiled_shaders[current_element['id']], vbo, fbo,
-                            audio_data, frame_idx, frame_rate, raw_file
-                        )
-                    else:
-                        self.logger.warning(f"No shader found at {time_seconds:.2f}s - rendering black")
-                        self.render_black_frame(fbo, raw_file)
-
-                # Progress indicator - more frequent and detailed
-                if frame_idx % (frame_rate * 2) == 0:  # Every 2 seconds
-                    # Layer 1 (shaders) represents 0-60% of total progress
-                    layer_progress = (frame_idx / total_frames) * 100
-                    progress = (layer_progress * 0.60)  # Scale to 60% of total
-                    # Structured progress output for web UI parsing
-                    current_shader_name = current_element['name'] if current_element else "None"
-                    self.logger.info(f"PROGRESS: {progress:.1f}% | STAGE: Rendering shader | ITEM: {current_shader_name} | TIME: {time_seconds:.1f}s/{duration:.1f}s")
-
-            raw_file.close()
-
-            # Convert raw video to MP4
-            self.logger.info("Converting raw video to MP4...")
-            self.convert_raw_to_mp4(
-                self.temp_dir / "layer1_raw.rgb",
-                output_path,
-                width, height, frame_rate
-            )
-
-            self.logger.info("✓ Layer 1 (shaders) rendering complete")
-
-        except Exception as e:
-            raw_file.close()
-            raise e
-
-    def find_element_at_time(self, elements, time_seconds):
-        """Find which element should be active at a given time."""
-        for element in elements:
-            if element['startTime'] <= time_seconds < element['endTime']:
-                return element
-        return None
-
-    def find_transition_state(self, elements, time_seconds, transition_duration, overlap_duration):
-        """Find if we're in a transition and return current/next elements with progress.
-
-        Transition logic: Detect overlapping periods between consecutive shaders.
-        When two shaders overlap in time, that's the transition period.
-        """
-        # Sort elements by start time
-        sorted_elements = sorted(elements, key=lambda x: x['startTime'])
-
-        for i, element in enumerate(sorted_elements):
-            if i + 1 < len(sorted_elements):
-                next_element = sorted_elements[i + 1]
-
-                # Check if there's an overlap between current and next element
-                overlap_start = max(element['startTime'], next_element['startTime'])
-                overlap_end = min(element['endTime'], next_element['endTime'])
-
-                # If there's an overlap and we're in that time range
-                if overlap_start < overlap_end and overlap_start <= time_seconds <= overlap_end:
-                    # Calculate progress through the transition
-                    transition_duration_actual = overlap_end - overlap_start
-                    progress = (time_seconds - overlap_start) / transition_duration_actual
-                    progress = max(0.0, min(1.0, progress))
-
-                    # Get the specific transition name from mapping
-                    overlap_key = f"{element['id']}->{next_element['id']}"
-                    transition_name = getattr(self, 'transition_mapping', {}).get(overlap_key, None)
-
-                    self.logger.debug(f"Transition: {time_seconds:.2f}s in overlap [{overlap_start:.2f}, {overlap_end:.2f}] ({transition_duration_actual:.1f}s) - {element['name']} -> {next_element['name']} (progress: {progress:.3f}) using {transition_name}")
-                    return element, next_element, progress, transition_name
+                    self.logger.warning(f"Rendering black frame at {time_seconds:.2f}s - no valid shader")
+                    self.render_black_frame(fbo, raw_file)
+        else:
+            # Normal single shader rendering (not in transition)
+            # Clear transition state if we were in one
+            if self.current_transition_name:
+                self.logger.info(f"✓ Transition ended: {self.current_transition_name}")
+                self.current_transition_name = None
+                self.current_transition_pair = None
+
+            if current_element and current_element['id'] in compiled_shaders:
+                self.logger.debug(f"Rendering normal shader frame at {time_seconds:.2f}s: {current_element['name']}")
+                self.render_shader_frame(
+                    compiled_shaders[current_element['id']], vbo, fbo,
+                    audio_data, frame_idx, frame_rate, raw_file
+                )
+            else:
+                self.logger.warning(f"No shader found at {time_seconds:.2f}s - rendering black")
+                self.render_black_frame(fbo, raw_file)
 
-        # Not in transition, find current element normally
-        current_element = self.find_element_at_time(elements, time_seconds)
-        return current_element, None, None, None
+        return current_element
 
     def initialize_buffer_textures(self, shader_data, resolution):
-        """Initialize ping-pong textures and framebuffers for all buffers."""
+        """Initialize ping-pong textures and framebuffers for all buffers (from the GpuResources pool)."""
+        gpu_resources = GpuResources.for_context(self.ctx, self.logger)
+
         for buffer_id, buffer_data in shader_data.get('buffers', {}).items():
-            # Create two textures for ping-pong rendering
-            buffer_data['texture_current'] = self.ctx.texture(resolution, 3)
-            buffer_data['texture_previous'] = self.ctx.texture(resolution, 3)
+            # Two targets for ping-pong rendering
+            buffer_data['texture_current'], buffer_data['fbo_current'] = gpu_resources.acquire_target(resolution, 3)
+            buffer_data['texture_previous'], buffer_data['fbo_previous'] = gpu_resources.acquire_target(resolution, 3)
 
             # Set texture parameters
             for tex in [buffer_data['texture_current'], buffer_data['texture_previous']]:
@@ -1420,16 +1677,12 @@ class TimelineRenderer:
                 tex.repeat_x = False
                 tex.repeat_y = False
 
-            # Create framebuffers
-            buffer_data['fbo_current'] = self.ctx.framebuffer(
-                color_attachments=[buffer_data['texture_current']]
-            )
-            buffer_data['fbo_previous'] = self.ctx.framebuffer(
-                color_attachments=[buffer_data['texture_previous']]
-            )
-
             self.logger.debug(f"Initialized buffer {buffer_id} textures: {resolution}")
 
+    def release_buffer_textures(self, compiled_shaders):
+        """Return the shaders' buffer ping-pong targets to the pool and release their textures."""
+        GpuResources.for_context(self.ctx).forget_shaders(compiled_shaders)
+
     def swap_buffer_textures(self, buffer_data):
         """Swap current and previous textures for ping-pong rendering."""
         buffer_data['texture_current'], buffer_data['texture_previous'] = \
@@ -1521,16 +1774,17 @@ class TimelineRenderer:
         textures = shader_data.get('textures', {})
         for buffer_id in ['A', 'B', 'C', 'D']:
             if buffer_id in all_buffers:
-                self.render_buffer_pass(
-                    buffer_id,
-                    all_buffers[buffer_id],
-                    all_buffers,
-                    textures,
-                    vbo,
-                    audio_texture,
-                    time_seconds,
-                    resolution
-                )
+                with self.profiler.gpu(Path(shader_data['path']).name, f'buffer {buffer_id}'):
+                    self.render_buffer_pass(
+                        buffer_id,
+                        all_buffers[buffer_id],
+                        all_buffers,
+                        textures,
+                        vbo,
+                        audio_texture,
+                        time_seconds,
+                        resolution
+                    )
 
         # Render main image using buffer outputs
         fbo.use()
@@ -1571,12 +1825,12 @@ class TimelineRenderer:
             program['iResolution'].value = resolution
 
         # Clear and render
-        self.ctx.clear(0.0, 0.0, 0.0, 1.0)
-        vao.render()
+        with self.profiler.gpu(Path(shader_data['path']).name, 'image'):
+            self.ctx.clear(0.0, 0.0, 0.0, 1.0)
+            vao.render()
 
         # Read pixels and write to raw file
-        pixels = fbo.read(components=3)
-        raw_file.write(pixels)
+        self.read_frame(fbo, raw_file)
 
         # Swap ping-pong buffers for next frame
         for buffer_id, buffer_data in shader_data.get('buffers', {}).items():
@@ -1588,6 +1842,11 @@ class TimelineRenderer:
 
     def render_shader_frame(self, shader_data, vbo, fbo, audio_data, frame_idx, frame_rate, raw_file):
         """Render a single frame using a shader."""
+        # Allocate buffer targets / reload evicted textures if this shader wasn't resident
+        GpuResources.for_context(self.ctx, self.logger).use_shader(
+            shader_data, (fbo.width, fbo.height), self.initialize_buffer_textures
+        )
+
         # Check if shader has buffers
         if shader_data.get('buffers'):
             self.render_shader_frame_with_buffers(shader_data, vbo, fbo, audio_data, frame_idx, frame_rate, raw_file)
@@ -1634,12 +1893,12 @@ class TimelineRenderer:
 
         # Render to framebuffer
         fbo.use()
-        self.ctx.clear(0.0, 0.0, 0.0, 1.0)
-        vao.render()
+        with self.profiler.gpu(Path(shader_data['path']).name, 'image'):
+            self.ctx.clear(0.0, 0.0, 0.0, 1.0)
+            vao.render()
 
         # Read pixels and write to raw file
-        pixels = fbo.read(components=3)
-        raw_file.write(pixels)
+        self.read_frame(fbo, raw_file)
 
         # Cleanup audio texture
         if audio_texture:
@@ -1656,11 +1915,10 @@ class TimelineRenderer:
             )
             return
 
-        # Create temporary textures and framebuffers for each shader
-        temp_texture_from = self.ctx.texture((fbo.width, fbo.height), 3)
-        temp_texture_to = self.ctx.texture((fbo.width, fbo.height), 3)
-        temp_fbo_from = self.ctx.framebuffer(color_attachments=[temp_texture_from])
-        temp_fbo_to = self.ctx.framebuffer(color_attachments=[temp_texture_to])
+        # Temporary targets for each shader, reused from frame to frame
+        gpu_resources = GpuResources.for_context(self.ctx, self.logger)
+        temp_texture_from, temp_fbo_from = gpu_resources.acquire_target((fbo.width, fbo.height), 3)
+        temp_texture_to, temp_fbo_to = gpu_resources.acquire_target((fbo.width, fbo.height), 3)
 
         time_seconds = frame_idx / frame_rate
 
@@ -1684,8 +1942,9 @@ class TimelineRenderer:
                 from_program['iResolution'].value = (fbo.width, fbo.height)
             if 'iChannel0' in from_program:
                 from_program['iChannel0'].value = 0
-            self.ctx.clear(0.0, 0.0, 0.0, 1.0)
-            from_vao.render()
+            with self.profiler.gpu(Path(from_shader_data['path']).name, 'image'):
+                self.ctx.clear(0.0, 0.0, 0.0, 1.0)
+                from_vao.render()
 
             # Render TO shader to temporary framebuffer
             temp_fbo_to.use()
@@ -1697,8 +1956,9 @@ class TimelineRenderer:
                 to_program['iResolution'].value = (fbo.width, fbo.height)
             if 'iChannel0' in to_program:
                 to_program['iChannel0'].value = 0
-            self.ctx.clear(0.0, 0.0, 0.0, 1.0)
-            to_vao.render()
+            with self.profiler.gpu(Path(to_shader_data['path']).name, 'image'):
+                self.ctx.clear(0.0, 0.0, 0.0, 1.0)
+                to_vao.render()
 
             # Apply transition shader
             fbo.use()
@@ -1742,29 +2002,26 @@ class TimelineRenderer:
                     pass
 
             # Render transition
-            self.ctx.clear(0.0, 0.0, 0.0, 1.0)
-            transition_vao.render()
+            with self.profiler.gpu(transition_data['name'], 'transition'):
+                self.ctx.clear(0.0, 0.0, 0.0, 1.0)
+                transition_vao.render()
 
             # Read frame data and write to raw file
-            data = fbo.read(components=3)
-            raw_file.write(data)
+            self.read_frame(fbo, raw_file)
 
         finally:
             # Cleanup temporary resources (matching render_shader.py)
             audio_texture.release()
-            temp_texture_from.release()
-            temp_texture_to.release()
-            temp_fbo_from.release()
-            temp_fbo_to.release()
+            gpu_resources.release_target(temp_texture_from, temp_fbo_from)
+            gpu_resources.release_target(temp_texture_to, temp_fbo_to)
 
     def render_simple_transition_frame(self, from_shader_data, to_shader_data, vbo, fbo,
                                      audio_data, frame_idx, frame_rate, progress, raw_file):
         """Render a simple alpha-blended transition frame when no transition shader is available."""
-        # Create temporary textures for blending
-        temp_texture_from = self.ctx.texture((fbo.width, fbo.height), 3)
-        temp_texture_to = self.ctx.texture((fbo.width, fbo.height), 3)
-        temp_fbo_from = self.ctx.framebuffer(color_attachments=[temp_texture_from])
-        temp_fbo_to = self.ctx.framebuffer(color_attachments=[temp_texture_to])
+        # Temporary targets for blending, reused from frame to frame
+        gpu_resources = GpuResources.for_context(self.ctx, self.logger)
+        temp_texture_from, temp_fbo_from = gpu_resources.acquire_target((fbo.width, fbo.height), 3)
+        temp_texture_to, temp_fbo_to = gpu_resources.acquire_target((fbo.width, fbo.height), 3)
 
         time_seconds = frame_idx / frame_rate
 
@@ -1791,8 +2048,9 @@ class TimelineRenderer:
                 from_program['iResolution'].value = (fbo.width, fbo.height)
             if 'iChannel0' in from_program and audio_texture:
                 from_program['iChannel0'].value = 0
-            self.ctx.clear(0.0, 0.0, 0.0, 1.0)
-            from_vao.render()
+            with self.profiler.gpu(Path(from_shader_data['path']).name, 'image'):
+                self.ctx.clear(0.0, 0.0, 0.0, 1.0)
+                from_vao.render()
 
             # Render TO shader
             temp_fbo_to.use()
@@ -1804,8 +2062,9 @@ class TimelineRenderer:
                 to_program['iResolution'].value = (fbo.width, fbo.height)
             if 'iChannel0' in to_program and audio_texture:
                 to_program['iChannel0'].value = 0
-            self.ctx.clear(0.0, 0.0, 0.0, 1.0)
-            to_vao.render()
+            with self.profiler.gpu(Path(to_shader_data['path']).name, 'image'):
+                self.ctx.clear(0.0, 0.0, 0.0, 1.0)
+                to_vao.render()
 
             # Proper alpha blend in main framebuffer
             fbo.use()
@@ -1855,46 +2114,20 @@ class TimelineRenderer:
             blend_program['progress'].value = progress
 
             # Render blended result
-            blend_vao.render()
+            with self.profiler.gpu('alpha blend', 'transition'):
+                blend_vao.render()
 
             self.ctx.disable(moderngl.BLEND)
 
             # Read frame data
-            data = fbo.read(components=3)
-            raw_file.write(data)
+            self.read_frame(fbo, raw_file)
 
         finally:
             # Cleanup
             if audio_texture:
                 audio_texture.release()
-            temp_texture_from.release()
-            temp_texture_to.release()
-            temp_fbo_from.release()
-            temp_fbo_to.release()
-
-    def render_greenscreen_frame(self, element, video_time, width, height, raw_file):
-        """Render a single frame from a green screen video with scaling and positioning."""
-        video_path = Path(element['path'])
-
-        # Extract frame from video at specific time
-        frame_data = self.extract_video_frame(video_path, video_time)
-
-        if frame_data is None:
-            # Fallback to green fill if frame extraction fails
-            self.render_green_fill_frame(width, height, raw_file)
-            return
-
-        # Scale and position the video frame
-        processed_frame = self.scale_and_position_video_frame(
-            frame_data, width, height
-        )
-
-        # Apply green screen removal if enabled
-        if element.get('greenscreen', {}).get('enabled', True):  # Default to enabled
-            processed_frame = self.apply_chromakey_to_frame(processed_frame, element)
-
-        # Write frame to raw file
-        raw_file.write(processed_frame.tobytes())
+            gpu_resources.release_target(temp_texture_from, temp_fbo_from)
+            gpu_resources.release_target(temp_texture_to, temp_fbo_to)
 
     def extract_video_frame(self, video_path, time_seconds):
         """Extract a single frame from video at specified time."""
@@ -1983,7 +2216,7 @@ class TimelineRenderer:
         return np.array(scaled_image)
 
     def apply_chromakey_to_frame(self, frame_data, element):
-        """Apply chroma key to normalize green colors to rgb(0, 214, 0) for consistent FFmpeg processing."""
+        """Apply chroma key to normalize green colors to rgb(0, 214, 0) for consistent keying by the compositor."""
         # Get chroma key parameters with defaults
         greenscreen_config = element.get('greenscreen', {})
         color = greenscreen_config.get('color', [0, 214, 0])  # Default: rgb(0, 214, 0)
@@ -2015,71 +2248,39 @@ class TimelineRenderer:
         distance = np.sqrt(np.sum(diff * diff, axis=2))
         mask |= distance < threshold
 
-        # Replace green areas with consistent rgb(0, 214, 0) for FFmpeg chroma key
+        # Replace green areas with consistent rgb(0, 214, 0) for the compositor's chroma key
         frame_float[mask] = [0.0, 214.0/255.0, 0.0]  # rgb(0, 214, 0)
 
         # Convert back to uint8
         return (frame_float * 255).astype(np.uint8)
 
+    def get_fill_frame(self, width, height, color):
+        """Get a solid RGB frame as bytes, built once per (size, color) and reused."""
+        key = (width, height, tuple(color))
+        frame = self.fill_frame_cache.get(key)
+        if frame is None:
+            frame = np.full((height, width, 3), color, dtype=np.uint8).tobytes()
+            self.fill_frame_cache[key] = frame
+        return frame
+
     def render_green_fill_frame(self, width, height, raw_file):
         """Render a solid green frame for gaps between videos - matches chroma key color."""
-        # Create solid green frame matching chroma key target: rgb(0, 214, 0)
-        green_frame = np.full((height, width, 3), [0, 214, 0], dtype=np.uint8)
-        raw_file.write(green_frame.tobytes())
-
-    def render_black_frame(self, fbo, raw_file):
-        """Render a black frame."""
-        fbo.use()
-        self.ctx.clear(0.0, 0.0, 0.0, 1.0)
-        pixels = fbo.read(components=3)
-        raw_file.write(pixels)
-
-    def convert_raw_to_mp4(self, raw_path, output_path, width, height, frame_rate):
-        """Convert raw RGB video to MP4 using FFmpeg."""
-        self.logger.info("\n🎬 CONVERTING RAW TO MP4")
-        self.logger.info(f"Input: {raw_path}")
-        self.logger.info(f"Output: {output_path}")
-        self.logger.info(f"Resolution: {width}x{height} @ {frame_rate}fps")
-        self.logger.info(f"Output pixel format: yuv420p (no alpha channel)")
-
-        cmd = [
-            'ffmpeg',
-            '-y',
-            '-f', 'rawvideo',
-            '-vcodec', 'rawvideo',
-            '-s', f'{width}x{height}',
-            '-pix_fmt', 'rgb24',
-            '-r', str(frame_rate),
-            '-i', str(raw_path),
-            '-c:v', 'libx264',
-            '-crf', '18',
-            '-preset', 'medium',
-            '-pix_fmt', 'yuv420p',
-            str(output_path)
-        ]
-
-        # Log the full command for manual testing
-        cmd_str = ' '.join(str(c) for c in cmd)
-        self.logger.info("\n📋 FFmpeg Command (copy/paste to test manually):")
-        self.logger.info(cmd_str)
+        # Solid green frame matching chroma key target: rgb(0, 214, 0)
+        raw_file.write(self.get_fill_frame(width, height, GREENSCREEN_FILL_COLOR))
 
-        self.logger.info("\n⏳ Running FFmpeg conversion...")
-        result = subprocess.run(cmd, capture_output=True, text=True)
+    def read_frame(self, fbo, raw_file):
+        """Read the rendered frame back from the GPU and write it to raw_file."""
+        with self.profiler.stage('frame_readback'):
+            pixels = fbo.read(components=3)
+        self.profiler.collect_gpu()  # Passes are finished once the frame is read back
+        with self.profiler.stage('frame_write'):
+            raw_file.write(pixels)
 
-        if result.returncode != 0:
-            self.logger.error(f"❌ FFmpeg conversion failed!")
-            self.logger.error(f"Return code: {result.returncode}")
-            self.logger.error(f"stderr: {result.stderr}")
-            raise subprocess.CalledProcessError(result.returncode, cmd, result.stderr)
-
-        # Log FFmpeg output for debugging
-        if result.stderr:
-            self.logger.debug("FFmpeg stderr output:")
-            for line in result.stderr.split('\n'):
-                if line.strip() and ('frame=' in line or 'error' in line.lower() or 'warning' in line.lower()):
-                    self.logger.debug(f"  {line}")
-
-        self.logger.info("✓ Conversion complete")
+    def render_black_frame(self, fbo, raw_file):
+        """Render a black frame (no GPU clear/readback needed)."""
+        width, height = fbo.size
+        with self.profiler.stage('frame_write'):
+            raw_file.write(self.get_fill_frame(width, height, (0, 0, 0)))
 
     def convert_raw_to_mp4_with_chromakey(self, raw_path, output_path, width, height, frame_rate):
         """Convert raw RGB video to MP4 with chroma key filtering for rgb(0, 216, 0) green."""
@@ -2137,10 +2338,14 @@ class TimelineRenderer:
 
         self.logger.info("✓ Chroma key conversion complete")
 
-    def render_video_layer(self, elements, output_path):
-        """Render video layer with green screen processing and proper video playback."""
-        self.logger.info("Processing green screen videos with frame-by-frame rendering...")
+    def iter_greenscreen_frames(self, elements):
+        """Stream Layer 0 as one frame per output frame.
 
+        Yields an RGB array (height, width, 3) while a clip is active and None for
+        gaps. Each clip is decoded by a single FFmpeg process, started at the right
+        offset when the clip becomes active, so gaps cost no work and no Layer 0
+        file is written. Past the end of a clip its last frame is held.
+        """
         width, height = self.get_resolution()
         frame_rate = self.get_frame_rate()
         duration = self.manifest['timeline']['duration']
@@ -2148,51 +2353,85 @@ class TimelineRenderer:
 
         self.logger.info(f"Layer 0 (green screen) total frames: {total_frames}")
 
-        # Create raw video file for layer 0
-        raw_file = open(self.temp_dir / "layer0_raw.rgb", 'wb')
+        # Compile the layer once into an interval index for per-frame lookups
+        timeline_index = TimelineIndex(elements)
+
+        decoder = None
+        decoder_element = None
+        last_frame = None
 
         try:
-            # Render each frame
             for frame_idx in range(total_frames):
                 time_seconds = frame_idx / frame_rate
 
                 # Find active video element at this time
-                active_element = self.find_element_at_time(elements, time_seconds)
+                active_element = timeline_index.element_at(time_seconds)
 
-                if active_element:
-                    # Calculate video time offset within the element
-                    element_start = active_element['startTime']
-                    video_time = time_seconds - element_start
+                if active_element is None:
+                    yield None
+                    continue
 
-                    # Render video frame with green screen processing
-                    self.render_greenscreen_frame(
-                        active_element, video_time, width, height, raw_file
-                    )
-                else:
-                    # No active video - render neon green fill for chroma key
-                    self.render_green_fill_frame(width, height, raw_file)
+                if active_element is not decoder_element:
+                    self.close_video_decoder(decoder)
+                    video_time = time_seconds - active_element['startTime']
+                    decoder = self.open_video_decoder(active_element, video_time, width, height, frame_rate)
+                    decoder_element = active_element
+                    last_frame = None
+                    self.logger.info(f"🎞️ Layer 0 clip: {active_element['name']} at {time_seconds:.2f}s (offset {video_time:.2f}s)")
 
-                # Progress indicator - more frequent and detailed
-                if frame_idx % (frame_rate * 2) == 0:  # Every 2 seconds
-                    # Layer 0 (green screen) represents 60-75% of total progress
-                    layer_progress = (frame_idx / total_frames) * 100
-                    progress = 60.0 + (layer_progress * 0.15)  # Scale to 15% of total, offset by 60%
-                    current_video_name = active_element['name'] if active_element else "None"
-                    self.logger.info(f"PROGRESS: {progress:.1f}% | STAGE: Rendering green screen | ITEM: {current_video_name} | TIME: {time_seconds:.1f}s/{duration:.1f}s")
+                frame = self.read_video_decoder_frame(decoder, width, height)
+                if frame is not None:
+                    # Apply green screen normalization if enabled
+                    if active_element.get('greenscreen', {}).get('enabled', True):  # Default to enabled
+                        frame = self.apply_chromakey_to_frame(frame, active_element)
+                    last_frame = frame
 
-            raw_file.close()
+                yield last_frame
 
-            # Don't convert to MP4 here - chroma key will be applied during compositing
-            # This avoids alpha channel loss that occurs with intermediate MP4 files
-            self.logger.info("\n✓ Layer 0 (green screen) raw rendering complete")
-            self.logger.info("ℹ️ Chroma key will be applied during compositing (single-pass)")
+        finally:
+            self.close_video_decoder(decoder)
 
-            # Return path to raw RGB file instead of MP4
-            return str(self.temp_dir / "layer0_raw.rgb")
+    def open_video_decoder(self, element, start_time, width, height, frame_rate):
+        """Start FFmpeg decoding a clip from start_time as raw RGB at the output size and rate."""
+        cmd = [
+            'ffmpeg',
+            '-v', 'error',
+            '-ss', f'{start_time:.3f}',
+            '-i', str(element['path']),
+            '-an',
+            '-vf', f'fps={frame_rate},scale={width}:{height}:flags=lanczos',
+            '-f', 'rawvideo',
+            '-pix_fmt', 'rgb24',
+            '-'
+        ]
+        self.logger.debug(f"Layer 0 decoder: {' '.join(cmd)}")
 
+        try:
+            return subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
         except Exception as e:
-            raw_file.close()
-            raise e
+            self.logger.warning(f"Failed to start decoder for {element['path']}: {e}")
+            return None
+
+    def read_video_decoder_frame(self, decoder, width, height):
+        """Read the next frame from a clip decoder, or None once it is exhausted."""
+        if decoder is None:
+            return None
+
+        frame_size = width * height * 3
+        data = decoder.stdout.read(frame_size)
+        if len(data) < frame_size:
+            return None
+
+        return np.frombuffer(data, dtype=np.uint8).reshape((height, width, 3))
+
+    def close_video_decoder(self, decoder):
+        """Stop a clip decoder (it may still be mid-stream)."""
+        if decoder is None:
+            return
+        decoder.stdout.close()
+        if decoder.poll() is None:
+            decoder.kill()
+        decoder.wait()
 
     def create_blank_video(self, output_path, width, height, frame_rate, duration):
         """Create a blank (transparent) video."""
@@ -2273,28 +2512,6 @@ class TimelineRenderer:
 
         subprocess.run(cmd, check=True, capture_output=True)
 
-    def create_black_video(self):
-        """Create a black video for empty layers."""
-        width, height = self.get_resolution()
-        frame_rate = self.get_frame_rate()
-        duration = self.manifest['timeline']['duration']
-
-        output_path = self.temp_dir / "black_video.mp4"
-
-        cmd = [
-            'ffmpeg',
-            '-y',
-            '-f', 'lavfi',
-            '-i', f'color=c=black:s={width}x{height}:r={frame_rate}:d={duration}',
-            '-c:v', 'libx264',
-            '-pix_fmt', 'yuv420p',
-            str(output_path)
-        ]
-
-        subprocess.run(cmd, check=True, capture_output=True)
-
-        return output_path
-
 
 def main():
     """Main entry point."""
@@ -2314,7 +2531,8 @@ def main():
             sys.exit(1)
             
     except Exception as e:
-        print(f"Fatal error: {e}")
+        print(f"Fatal error: {e}", file=sys.stderr)
+        print(RENDER_EVENT_PREFIX + json.dumps({'event': 'failed', 'error': str(e)}), flush=True)
         import traceback
         traceback.print_exc()
         sys.exit(1)
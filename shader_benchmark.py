@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+OneOffRender Shader Benchmark
+Measures what each shader costs to render and records it in Shaders/metadata.json.
+
+Every shader in metadata.json (with its buffers, common code and textures) is
+compiled and rendered for a fixed number of frames at a reference resolution
+on this machine's GL implementation, with synthetic audio. The result goes into
+the shader's "cost" entry:
+
+    "cost": {
+        "ms_per_frame": 4.12,        wall time per frame, draw + readback (as in a real render)
+        "gpu_ms_per_frame": 3.87,    GPU time of all passes (if GL timer queries work)
+        "compile_ms": 85.3,          main, buffer and common code
+        "frames": 60, "resolution": "1280x720",
+        "gl_renderer": "...", "source_hash": "...", "benchmarked": "2025-01-01T12:00:00"
+    }
+
+Runs are incremental: a shader is skipped when its sources (main, buffers,
+common) hash the same as last time and it was measured at the same resolution
+on the same GPU. Shaders that fail to compile get {"error": ...} and are
+skipped until they change as well.
+
+Usage:
+    python shader_benchmark.py                    benchmark new and changed shaders
+    python shader_benchmark.py "Audio Planet"     only these shaders (name with or without .glsl)
+    python shader_benchmark.py --force            re-measure everything
+Options: --frames N (default 60), --width/--height (default 1280x720).
+"""
+
+import sys
+import json
+import time
+import hashlib
+import logging
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from render_shader import ShaderRenderer
+from render_profiler import RenderProfiler
+from gl_context import timer_queries_supported
+from gpu_resources import GpuResources
+
+logger = logging.getLogger('shader_benchmark')
+
+METADATA_PATH = Path('Shaders') / 'metadata.json'
+WARMUP_FRAMES = 3   # First frames include driver-side shader compilation
+SAVE_EVERY = 10     # Shaders benchmarked between metadata.json writes
+
+
+class DiscardFrames:
+    """Frame sink that throws the rendered frames away."""
+
+    def write(self, data):
+        pass
+
+
+def synthetic_audio(frame_count, frame_rate):
+    """Audio analysis stand-in: moving bass/treble, FFT and waveform so audio-reactive branches run."""
+    t = np.arange(frame_count) / frame_rate
+    bins = np.linspace(0.0, 1.0, 512)
+    phase = np.linspace(0.0, 2 * np.pi, 256)
+    return {
+        'bass': (0.5 + 0.5 * np.sin(t * 2 * np.pi * 2.0)).astype(np.float32),
+        'treble': (0.5 + 0.5 * np.sin(t * 2 * np.pi * 5.0)).astype(np.float32),
+        'fft_spectrum': np.clip(
+            (1.0 - bins)[:, None] * (0.6 + 0.4 * np.sin(t[None, :] * 7.0 + bins[:, None] * 20.0)), 0.0, 1.0
+        ).astype(np.float32),
+        'waveform': (0.5 + 0.4 * np.sin(phase[None, :] * 4.0 + t[:, None] * 10.0)).astype(np.float32)
+    }
+
+
+def load_metadata():
+    """Shader entries from metadata.json."""
+    with open(METADATA_PATH, 'r') as f:
+        return json.load(f)
+
+
+def save_costs(costs):
+    """Write cost entries into metadata.json, re-read first so edits made meanwhile (e.g. stars) survive."""
+    if not costs:
+        return
+    shaders = load_metadata()
+    for shader in shaders:
+        if shader['name'] in costs:
+            shader['cost'] = costs[shader['name']]
+
+    temp_path = METADATA_PATH.with_name(METADATA_PATH.name + '.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(shaders, f, indent=2)
+    temp_path.replace(METADATA_PATH)
+
+
+class BenchmarkRenderer(ShaderRenderer):
+    """ShaderRenderer on one GL context that benchmarks shaders one at a time."""
+
+    def __init__(self, config_path='config.json'):
+        """Read config.json for logging only (no audio or output paths needed)."""
+        self.config_path = Path(config_path)
+        with open(self.config_path, 'r') as f:
+            self.config = json.load(f)
+        self.setup_logging()
+        self.logger.setLevel(logging.WARNING)  # Per-shader compile chatter
+        self.profiler = RenderProfiler()
+        self.ctx = self.create_gl_context()
+        self.gl_renderer = self.ctx.info.get('GL_RENDERER', 'unknown')
+        self.gpu_timers = timer_queries_supported(self.ctx)  # gpu_ms_per_frame is left out if not
+
+        vertices = np.array([
+            -1.0, -1.0,
+             1.0, -1.0,
+            -1.0,  1.0,
+            -1.0,  1.0,
+             1.0, -1.0,
+             1.0,  1.0,
+        ], dtype=np.float32)
+        self.vbo = self.ctx.buffer(vertices.tobytes())
+
+    def source_files(self, shader_path, metadata):
+        """Main shader, buffer and common files that make up a shader, in a stable order."""
+        files = [shader_path]
+        for buffer_id in self.detect_shader_buffers(shader_path, metadata):
+            files.append(shader_path.parent / f"{shader_path.stem}.buffer.{buffer_id}.glsl")
+        common_file = shader_path.parent / f"{shader_path.stem}.common.glsl"
+        if common_file.exists():
+            files.append(common_file)
+        return files
+
+    def source_hash(self, shader_path, metadata):
+        """Short hash of the shader's source files (see source_files)."""
+        digest = hashlib.sha1()
+        for path in self.source_files(shader_path, metadata):
+            digest.update(path.name.encode('utf-8'))
+            digest.update(path.read_bytes() if path.exists() else b'<missing>')
+        return digest.hexdigest()[:16]
+
+    def compile(self, shader_path, metadata):
+        """Compile a shader with its buffers and load its textures (shader_data as in precompile_shaders)."""
+        common_source = self.detect_common_shader(shader_path)
+        program = self.load_shader_from_file(shader_path, common_source)
+        if program is None:
+            raise RuntimeError('main shader failed to compile')
+
+        shader_data = {'program': program, 'path': shader_path, 'buffers': {}, 'textures': {}}
+        for buffer_id in self.detect_shader_buffers(shader_path, metadata):
+            buffer_file = shader_path.parent / f"{shader_path.stem}.buffer.{buffer_id}.glsl"
+            buffer_program = self.load_shader_from_file(buffer_file, common_source)
+            if buffer_program is None:
+                self.release(shader_data)
+                raise RuntimeError(f'buffer {buffer_id} failed to compile')
+            shader_data['buffers'][buffer_id] = {
+                'program': buffer_program,
+                'path': buffer_file,
+                'texture_current': None,
+                'texture_previous': None,
+                'fbo_current': None,
+                'fbo_previous': None
+            }
+
+        shader_data['textures'] = self.detect_and_load_textures(shader_path, metadata) or {}
+        return shader_data
+
+    def release(self, shader_data):
+        """Free everything compile() and initialize_buffer_textures() created."""
+        self.release_program(shader_data['program'])
+        GpuResources.for_context(self.ctx).forget_shaders({'shader': shader_data})  # Buffers and textures
+        for buffer_data in shader_data['buffers'].values():
+            self.release_program(buffer_data['program'])
+
+    def benchmark(self, shader_path, metadata, frames, resolution, frame_rate=30):
+        """Render a shader for WARMUP_FRAMES + frames; returns its cost entry (without hash and date)."""
+        self.profiler = RenderProfiler()
+        if self.gpu_timers:
+            self.profiler.enable_gpu_timers(self.ctx)
+
+        shader_data = self.compile(shader_path, metadata)
+        compile_seconds = self.profiler.stages.get('shader_compile', {}).get('inclusive', 0.0)
+
+        fbo = None
+        audio_data = synthetic_audio(WARMUP_FRAMES + frames, frame_rate)
+        sink = DiscardFrames()
+        try:
+            fbo = self.ctx.framebuffer(color_attachments=[self.ctx.texture(resolution, 4)])
+            if shader_data['buffers']:
+                self.initialize_buffer_textures(shader_data, resolution)
+
+            for frame_idx in range(WARMUP_FRAMES):
+                self.render_shader_frame(shader_data, self.vbo, fbo, audio_data, frame_idx, frame_rate, sink)
+            if self.gpu_timers:
+                self.profiler.gpu_timer.collect()
+                self.profiler.gpu_timer.samples = {}
+
+            started = time.perf_counter()
+            for frame_idx in range(WARMUP_FRAMES, WARMUP_FRAMES + frames):
+                self.render_shader_frame(shader_data, self.vbo, fbo, audio_data, frame_idx, frame_rate, sink)
+            elapsed = time.perf_counter() - started  # Each frame is read back, so the GPU is done too
+
+            gpu_passes = self.profiler.gpu_timer.report().get(shader_path.name, {}) if self.gpu_timers else {}
+        finally:
+            if self.gpu_timers:
+                self.profiler.gpu_timer.release()
+            if fbo is not None:
+                for attachment in fbo.color_attachments:
+                    attachment.release()
+                fbo.release()
+            self.release(shader_data)
+
+        cost = {
+            'ms_per_frame': round(elapsed / frames * 1000, 3),
+            'compile_ms': round(compile_seconds * 1000, 1)
+        }
+        if gpu_passes:
+            cost['gpu_ms_per_frame'] = round(sum(p['total_ms'] for p in gpu_passes.values()) / frames, 3)
+        return cost
+
+
+def main():
+    """Benchmark new and changed shaders and record their cost in metadata.json."""
+    parser = argparse.ArgumentParser(description='Record per-shader render cost in Shaders/metadata.json')
+    parser.add_argument('shaders', nargs='*', help='only benchmark these shaders')
+    parser.add_argument('--frames', type=int, default=60, help='frames to time per shader (default 60)')
+    parser.add_argument('--width', type=int, default=1280, help='reference width (default 1280)')
+    parser.add_argument('--height', type=int, default=720, help='reference height (default 720)')
+    parser.add_argument('--force', action='store_true', help='re-measure shaders that have not changed')
+    parser.add_argument('--config', default='config.json', help='config file (default config.json)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', datefmt='%H:%M:%S')
+
+    if not METADATA_PATH.exists():
+        logger.error(f"{METADATA_PATH} not found (run from the OneOffRender folder)")
+        sys.exit(1)
+
+    wanted = {name if name.lower().endswith('.glsl') else f"{name}.glsl" for name in args.shaders}
+    resolution = (args.width, args.height)
+    resolution_label = f"{args.width}x{args.height}"
+
+    renderer = BenchmarkRenderer(args.config)
+    logger.info(f"Benchmarking on {renderer.gl_renderer} at {resolution_label}, {args.frames} frames per shader")
+
+    shaders = [shader for shader in load_metadata() if not wanted or shader['name'] in wanted]
+    if wanted and len(shaders) < len(wanted):
+        missing = wanted - {shader['name'] for shader in shaders}
+        logger.warning(f"Not in metadata.json: {', '.join(sorted(missing))}")
+
+    costs = {}
+    skipped = 0
+    try:
+        for index, metadata in enumerate(shaders, 1):
+            shader_path = METADATA_PATH.parent / metadata['name']
+            if not shader_path.exists():
+                logger.warning(f"[{index}/{len(shaders)}] {metadata['name']}: file not found")
+                continue
+
+            source_hash = renderer.source_hash(shader_path, metadata)
+            previous = metadata.get('cost') or {}
+            if (not args.force and previous.get('source_hash') == source_hash
+                    and previous.get('resolution') == resolution_label
+                    and previous.get('gl_renderer') == renderer.gl_renderer):
+                skipped += 1
+                continue
+
+            try:
+                cost = renderer.benchmark(shader_path, metadata, args.frames, resolution)
+                logger.info(
+                    f"[{index}/{len(shaders)}] {metadata['name']}: {cost['ms_per_frame']:.2f} ms/frame, "
+                    f"compile {cost['compile_ms']:.0f} ms"
+                )
+            except Exception as e:
+                cost = {'error': str(e)}
+                logger.warning(f"[{index}/{len(shaders)}] {metadata['name']}: failed ({e})")
+
+            cost.update({
+                'frames': args.frames,
+                'resolution': resolution_label,
+                'gl_renderer': renderer.gl_renderer,
+                'source_hash': source_hash,
+                'benchmarked': datetime.now().isoformat(timespec='seconds')
+            })
+            costs[metadata['name']] = cost
+            if len(costs) % SAVE_EVERY == 0:
+                save_costs(costs)
+
+    except KeyboardInterrupt:
+        logger.info("Interrupted; saving the shaders measured so far")
+
+    save_costs(costs)
+    logger.info(f"Benchmarked {len(costs)} shader(s), {skipped} unchanged")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+OneOffRender Shader Costs
+Per-shader render cost from Shaders/metadata.json (written by shader_benchmark.py)
+and the render-time budget the batch renderer selects shaders with.
+
+Costs are measured at a reference resolution and scaled to the output size by
+pixel count. Shaders that were never benchmarked count as the median shader.
+
+Budget settings ("render_budget" under "shader_settings" in config.json):
+    enabled           off by default
+    realtime_factor   target render speed, 1.0 = one second of video per second of rendering
+    exclude_factor    shaders costing more than this many frame budgets are never picked
+    min_segment       shortest segment (seconds) an expensive shader is cut down to
+"""
+
+import json
+import statistics
+from pathlib import Path
+
+METADATA_PATH = Path('Shaders') / 'metadata.json'
+
+DEFAULT_BUDGET = {
+    'enabled': False,
+    'realtime_factor': 1.0,
+    'exclude_factor': 4.0,
+    'min_segment': 5.0
+}
+
+
+def load_shader_costs(metadata_path=METADATA_PATH):
+    """{shader name: cost entry} for shaders with a successful benchmark."""
+    try:
+        with open(metadata_path, 'r') as f:
+            shaders = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {
+        shader['name']: shader['cost'] for shader in shaders
+        if isinstance(shader.get('cost'), dict) and 'ms_per_frame' in shader['cost']
+    }
+
+
+def scaled_frame_ms(cost, width, height):
+    """A cost entry's ms/frame scaled from its benchmark resolution to width x height."""
+    try:
+        ref_width, ref_height = (int(v) for v in cost.get('resolution', '1280x720').split('x'))
+    except ValueError:
+        ref_width, ref_height = 1280, 720
+    return cost['ms_per_frame'] * (width * height) / (ref_width * ref_height)
+
+
+class ShaderCosts:
+    """Predicted ms per frame of each shader at one output resolution."""
+
+    def __init__(self, costs, width, height):
+        self.frame_ms_by_name = {name: scaled_frame_ms(cost, width, height) for name, cost in costs.items()}
+        self.default_ms = statistics.median(self.frame_ms_by_name.values()) if self.frame_ms_by_name else None
+
+    def known(self, name):
+        """Whether the shader has been benchmarked."""
+        return name in self.frame_ms_by_name
+
+    def measured_ms(self, name):
+        """Scaled ms/frame from the shader's own benchmark, or None."""
+        return self.frame_ms_by_name.get(name)
+
+    def frame_ms(self, name):
+        """Predicted ms/frame (the median shader's if this one has no cost data; None if none do)."""
+        return self.frame_ms_by_name.get(name, self.default_ms)
+
+
+class RenderBudget:
+    """Keeps the projected render time of a multi-shader render within a realtime target.
+
+    Shaders far over the per-frame budget are excluded, shaders over it are
+    picked less often (much less once the render is projected to run over) and
+    get shorter segments. The renderer reports each planned segment through
+    plan() and the real render time to summary().
+    """
+
+    def __init__(self, settings, costs, frame_rate):
+        self.settings = {**DEFAULT_BUDGET, **(settings or {})}
+        self.costs = costs
+        self.frame_budget_ms = 1000.0 / (frame_rate * self.settings['realtime_factor'])
+        self.planned_ms = 0.0
+        self.planned_frames = 0
+
+    @classmethod
+    def from_config(cls, config, width, height, frame_rate, metadata_path=METADATA_PATH):
+        """RenderBudget for a render, or None if the budget is disabled in config."""
+        settings = config.get('shader_settings', {}).get('render_budget', {})
+        if not settings.get('enabled', False):
+            return None
+        return cls(settings, ShaderCosts(load_shader_costs(metadata_path), width, height), frame_rate)
+
+    def over_budget(self, name):
+        """How many frame budgets a shader costs (0 when it has no cost data)."""
+        frame_ms = self.costs.measured_ms(name)
+        return frame_ms / self.frame_budget_ms if frame_ms else 0.0
+
+    def allowed(self, shader_names, logger=None):
+        """Shader names without the pathological ones (the cheapest one is kept if all are)."""
+        limit = self.settings['exclude_factor']
+        allowed = [name for name in shader_names if self.over_budget(name) <= limit]
+        if not allowed:
+            allowed = [min(shader_names, key=self.over_budget)]
+
+        if logger:
+            unknown = sum(1 for name in shader_names if not self.costs.known(name))
+            logger.info(
+                f"Render budget: {self.frame_budget_ms:.1f} ms/frame "
+                f"({self.settings['realtime_factor']:.2f}x realtime), "
+                f"{len(shader_names) - len(allowed)} shader(s) excluded"
+            )
+            for name in shader_names:
+                if name not in allowed:
+                    logger.info(f"  Excluded {name} ({self.over_budget(name):.1f}x the frame budget)")
+            if unknown:
+                logger.info(f"  {unknown} shader(s) have no cost data (run shader_benchmark.py)")
+        return allowed
+
+    def projected_frame_ms(self):
+        """Mean predicted ms per frame of everything planned so far."""
+        return self.planned_ms / self.planned_frames if self.planned_frames else 0.0
+
+    def weight(self, name):
+        """Selection weight multiplier: 1.0 within budget, lower the more a shader costs."""
+        over = self.over_budget(name)
+        if over <= 1.0:
+            return 1.0
+        # Squeeze harder once the frames planned so far are over budget
+        pressure = 2.0 if self.projected_frame_ms() > self.frame_budget_ms else 1.0
+        return (1.0 / over) ** pressure
+
+    def segment_seconds(self, name, seconds):
+        """Segment length for a shader: shortened in proportion to how far over budget it is."""
+        over = self.over_budget(name)
+        if over <= 1.0 or seconds <= self.settings['min_segment']:
+            return seconds
+        return max(self.settings['min_segment'], seconds / over)
+
+    def plan(self, frames, *names):
+        """Account for frames rendered with these shaders (both sides of a transition)."""
+        self.planned_ms += sum(self.costs.frame_ms(name) or 0.0 for name in names) * frames
+        self.planned_frames += frames
+
+    def summary(self, logger, total_frames, elapsed_seconds, frame_rate):
+        """Log predicted versus actual render time and speed."""
+        if not self.planned_ms or not total_frames:
+            return  # No cost data to predict with
+        predicted = self.projected_frame_ms() * total_frames / 1000.0
+        logger.info(
+            f"Render budget: predicted {predicted:.1f}s, actual {elapsed_seconds:.1f}s "
+            f"({total_frames / frame_rate / max(elapsed_seconds, 1e-6):.2f}x realtime, "
+            f"target {self.settings['realtime_factor']:.2f}x)"
+        )
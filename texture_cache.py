@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+OneOffRender Texture Cache
+Shares GL textures between the shaders of one render and keeps decoded image
+pixels on disk, so a texture used by many shaders is decoded and uploaded once,
+and repeated renders skip JPEG/PNG decoding. Images can be decoded ahead of
+time on worker threads while shaders compile; GL uploads stay on the context thread.
+"""
+
+import os
+import json
+import hashlib
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+TEXTURE_CACHE_DIR = Path('Cache') / 'textures'
+TEXTURES_DIR = Path('Textures')
+CUBEMAPS_DIR = Path('Cubemaps')
+CACHE_VERSION = 1
+
+# ModernGL cubemap face order: +X, -X, +Y, -Y, +Z, -Z
+CUBEMAP_FACE_SUFFIXES = ['px', 'nx', 'py', 'ny', 'pz', 'nz']
+CUBEMAP_EXTENSIONS = ['.png', '.jpg', '.jpeg', '.bmp', '.tga']
+
+# PIL releases the GIL while decoding, so threads decode in parallel
+DECODE_WORKERS = min(8, os.cpu_count() or 4)
+
+
+def decoded_cache_path(image_path, cache_dir):
+    """Cache file for an image's decoded pixels, keyed by the file's identity."""
+    stat = os.stat(image_path)
+    key = json.dumps([CACHE_VERSION, str(Path(image_path).resolve()), stat.st_size, stat.st_mtime_ns])
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+    return Path(cache_dir) / f"{Path(image_path).stem}_{digest}.npy"
+
+
+def decode_image(image_path, cache_dir=TEXTURE_CACHE_DIR, logger=None):
+    """RGB uint8 pixels of an image, flipped to OpenGL's bottom-left origin.
+
+    Decoded pixels are kept as .npy files in cache_dir (None disables this); an
+    edited image gets a new cache entry.
+    """
+    cache_path = decoded_cache_path(image_path, cache_dir) if cache_dir is not None else None
+
+    if cache_path is not None and cache_path.exists():
+        try:
+            return np.load(cache_path)
+        except Exception as e:
+            if logger:
+                logger.warning(f"Ignoring unreadable texture cache {cache_path}: {e}")
+
+    from PIL import Image
+    with Image.open(image_path) as img:
+        pixels = np.ascontiguousarray(np.flipud(np.array(img.convert('RGB'), dtype=np.uint8)))
+
+    if cache_path is not None:
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            # Write under a temp name first so a concurrent render never reads half a file
+            temp_path = cache_path.with_name(cache_path.stem + '.tmp.npy')
+            with open(temp_path, 'wb') as f:
+                np.save(f, pixels)
+            os.replace(temp_path, cache_path)
+        except Exception as e:
+            if logger:
+                logger.warning(f"Could not write texture cache {cache_path}: {e}")
+
+    return pixels
+
+
+def cubemap_face_path(basename, suffix, cubemaps_dir=CUBEMAPS_DIR):
+    """Image file for one cubemap face (e.g. skybox_px.png), or None if missing."""
+    for ext in CUBEMAP_EXTENSIONS:
+        path = Path(cubemaps_dir) / f"{basename}_{suffix}{ext}"
+        if path.exists():
+            return path
+    return None
+
+
+def texture_files(metadata):
+    """Existing image files a shader's metadata "texture" entry refers to (textures and cubemap faces)."""
+    texture_config = (metadata or {}).get('texture')
+    if isinstance(texture_config, str):
+        configs = [texture_config]
+    elif isinstance(texture_config, dict):
+        configs = list(texture_config.values())
+    else:
+        return []
+
+    paths = []
+    for config in configs:
+        if isinstance(config, str):
+            paths.append(TEXTURES_DIR / config)
+        elif isinstance(config, dict) and config.get('type') == 'cubemap':
+            if config.get('basename'):
+                paths.extend(cubemap_face_path(config['basename'], suffix) for suffix in CUBEMAP_FACE_SUFFIXES)
+        elif isinstance(config, dict) and 'file' in config:
+            paths.append(TEXTURES_DIR / config['file'])
+    return [path for path in paths if path is not None and path.exists()]
+
+
+class TextureCache:
+    """GL textures and cubemaps of one context, shared between shaders with reference counts.
+
+    Entries are keyed by kind, source path (with mtime), and sampling settings, so two
+    shaders asking for the same file with the same filter/wrap/mipmap get the same
+    texture. release() drops a reference; the texture is freed with the last one.
+    Use for_context() to get the cache belonging to a context.
+
+    prefetch() starts decoding image files on a thread pool; pixels() returns a
+    prefetched result (waiting for it if needed) or decodes on the calling thread.
+    """
+
+    def __init__(self, ctx):
+        self.ctx = ctx
+        self.entries = {}     # key -> {'texture': ..., 'refs': n}
+        self.keys = {}        # id(texture) -> key
+        self.pending = {}     # resolved path -> Future of decoded pixels
+        self.prefetched = set()  # (resolved path, mtime) submitted so far
+        self.executor = None
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def for_context(cls, ctx):
+        """The cache stored with ctx (created on first use)."""
+        if not isinstance(ctx.extra, dict):
+            ctx.extra = {}
+        cache = ctx.extra.get('texture_cache')
+        if cache is None:
+            cache = ctx.extra['texture_cache'] = cls(ctx)
+        return cache
+
+    @staticmethod
+    def make_key(kind, path, args):
+        path = Path(path)
+        try:
+            mtime = path.stat().st_mtime_ns
+        except OSError:
+            mtime = None
+        return (kind, str(path.resolve()), mtime, args)
+
+    def acquire(self, kind, path, args, factory):
+        """Return the shared texture for (kind, path, args), creating it with factory() on a miss.
+
+        Each call adds a reference. Failed loads (factory() returning None) are not cached.
+        """
+        key = self.make_key(kind, path, args)
+        entry = self.entries.get(key)
+        if entry is not None:
+            entry['refs'] += 1
+            self.hits += 1
+            return entry['texture']
+
+        texture = factory()
+        if texture is None:
+            return None
+        self.misses += 1
+        self.entries[key] = {'texture': texture, 'refs': 1}
+        self.keys[id(texture)] = key
+        return texture
+
+    def prefetch(self, paths, logger=None):
+        """Start decoding image files in the background (each file at most once per context)."""
+        for path in paths:
+            resolved = str(Path(path).resolve())
+            version = (resolved, Path(path).stat().st_mtime_ns)
+            if version in self.prefetched:
+                continue
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=DECODE_WORKERS, thread_name_prefix='texture-decode')
+            self.prefetched.add(version)
+            self.pending[resolved] = self.executor.submit(decode_image, path, TEXTURE_CACHE_DIR, logger)
+
+    def discard_prefetched(self):
+        """Drop decoded images nothing asked for (e.g. textures of shaders that failed to compile)."""
+        for future in self.pending.values():
+            future.cancel()
+        self.pending.clear()
+
+    def pixels(self, path, logger=None):
+        """Decoded pixels of an image file: the prefetched result if there is one, else decoded now."""
+        future = self.pending.pop(str(Path(path).resolve()), None)
+        if future is not None:
+            return future.result()  # Decode errors surface here, as they would decoding inline
+        return decode_image(path, logger=logger)
+
+    def owns(self, texture):
+        return id(texture) in self.keys
+
+    def release(self, texture):
+        """Drop one reference; free the texture when none are left. Textures not from the cache are freed."""
+        key = self.keys.get(id(texture))
+        if key is None:
+            texture.release()
+            return
+
+        entry = self.entries[key]
+        entry['refs'] -= 1
+        if entry['refs'] <= 0:
+            del self.entries[key]
+            del self.keys[id(texture)]
+            texture.release()
+
+    def clear(self):
+        """Free every cached texture regardless of references, and stop the decode threads."""
+        for entry in self.entries.values():
+            entry['texture'].release()
+        self.entries.clear()
+        self.keys.clear()
+        self.discard_prefetched()
+        self.prefetched.clear()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+
+    def stats(self):
+        """Entry count, hits and misses, for logs."""
+        return {'textures': len(self.entries), 'hits': self.hits, 'misses': self.misses}
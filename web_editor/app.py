@@ -5,15 +5,28 @@ Provides API endpoints for the web-based video editor interface.
 """
 
 import os
+import sys
 import json
+import atexit
 import logging
 from pathlib import Path
 from datetime import datetime
-from flask import Flask, render_template, jsonify, request, send_from_directory
+from flask import Flask, Response, render_template, jsonify, request
 from flask_cors import CORS
 import subprocess
 import librosa
 
+# render_planner.py and render_client.py (standard library only) live in the repository root
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from render_planner import estimate_timeline
+from render_client import load_daemon_settings
+
+from catalog import AudioCatalog, VideoCatalog, ShaderCatalog, ProjectCatalog
+from render_monitor import RenderMonitor
+from render_jobs import RenderJobQueue
+from still_frames import StillFrameWorker, StillFrameError
+from media import PreviewThumbnails, send_media, versioned_url
+
 app = Flask(__name__)
 CORS(app)
 
@@ -25,6 +38,10 @@ INPUT_AUDIO_DIR = BASE_DIR / "Input_Audio"
 INPUT_VIDEO_DIR = BASE_DIR / "Input_Video"
 THUMBNAILS_DIR = INPUT_VIDEO_DIR / "thumbnails"
 PROJECTS_DIR = BASE_DIR / "Projects"
+CACHE_DIR = Path(__file__).parent / "cache"
+
+AUDIO_EXTENSIONS = ['.mp3', '.wav', '.flac', '.m4a', '.aac', '.ogg']
+VIDEO_EXTENSIONS = ['.mp4', '.avi', '.mov', '.mkv', '.webm']
 
 # Ensure required directories exist
 THUMBNAILS_DIR.mkdir(exist_ok=True)
@@ -35,6 +52,73 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def get_audio_duration(file_path):
+    """Probe an audio file's duration in seconds."""
+    return librosa.get_duration(path=str(file_path))
+
+
+def get_video_duration(file_path):
+    """Probe a video file's duration in seconds using ffprobe."""
+    result = subprocess.run(
+        ['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
+         '-of', 'default=noprint_wrappers=1:nokey=1', str(file_path)],
+        capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip())
+
+
+def load_app_config(section='web_editor'):
+    """Load a section of config.json (empty if missing)."""
+    try:
+        with open(BASE_DIR / "config.json", 'r') as f:
+            return json.load(f).get(section, {})
+    except Exception as e:
+        logger.warning(f"Could not read {section} settings from config.json: {e}")
+        return {}
+
+
+APP_CONFIG = load_app_config()
+
+# Renders go to render_daemon.py when it is enabled and running (warm GL context and shader cache)
+RENDER_DAEMON = load_daemon_settings(BASE_DIR / "config.json")
+
+# Preview renders: fraction of the resolution and frame rate, fast encoder
+PREVIEW_DEFAULTS = {'scale': 0.25, 'frame_rate': 15, 'crf': 30, 'preset': 'ultrafast', 'priority': 10}
+PREVIEW_SETTINGS = {**PREVIEW_DEFAULTS, **APP_CONFIG.get('preview', {})}
+
+# Live progress of render jobs (fed by the renderer's stdout events)
+render_monitor = RenderMonitor()
+
+# Render jobs run one at a time by default so renders never fight for the GPU
+render_queue = RenderJobQueue(
+    CACHE_DIR / "render_jobs", render_monitor,
+    max_concurrent=APP_CONFIG.get('max_concurrent_renders', 1),
+    working_dir=BASE_DIR,
+    daemon_address=(RENDER_DAEMON['host'], int(RENDER_DAEMON['port'])) if RENDER_DAEMON['enabled'] else None,
+    gpu_timers=load_app_config('profiling').get('gpu_timers', False)
+)
+
+
+# Shader metadata held in memory; edits are written back in batches
+shader_catalog = ShaderCatalog(SHADERS_DIR / "metadata.json")
+atexit.register(shader_catalog.flush)
+
+# Warm GL worker for single-frame renders while scrubbing (started on first use)
+still_frame_worker = StillFrameWorker(BASE_DIR, CACHE_DIR / "still_frame_worker.log")
+atexit.register(still_frame_worker.stop)
+
+# Saved project listing, kept up to date on save/delete and by mtime scan
+project_catalog = ProjectCatalog(PROJECTS_DIR, CACHE_DIR / "project_catalog.json")
+
+# Downscaled shader previews for the asset panel (full-size JPGs are large)
+shader_previews = PreviewThumbnails(SHADERS_DIR, CACHE_DIR / "shader_previews")
+
+# Audio library listing, probed in the background and persisted across restarts
+audio_catalog = AudioCatalog(
+    INPUT_AUDIO_DIR, CACHE_DIR / "audio_catalog.json", get_audio_duration, AUDIO_EXTENSIONS
+)
+
+
 @app.route('/')
 def index():
     """Serve the main editor interface."""
@@ -43,26 +127,12 @@ def index():
 
 @app.route('/api/audio/list')
 def list_audio_files():
-    """List all available audio files."""
+    """List all available audio files (served from the audio catalogue)."""
     try:
-        audio_extensions = ['.mp3', '.wav', '.flac', '.m4a', '.aac', '.ogg']
-        audio_files = []
-
-        for ext in audio_extensions:
-            for file_path in INPUT_AUDIO_DIR.glob(f'*{ext}'):
-                # Get audio duration
-                try:
-                    duration = librosa.get_duration(path=str(file_path))
-                except Exception as e:
-                    logger.warning(f"Could not get duration for {file_path.name}: {e}")
-                    duration = 0
-
-                audio_files.append({
-                    'name': file_path.name,
-                    'path': f'/api/audio/file/{file_path.name}',  # URL path for serving
-                    'duration': duration,
-                    'size': file_path.stat().st_size
-                })
+        audio_files = audio_catalog.list()
+        for audio_file in audio_files:
+            # URL path for serving (versioned so the browser can cache it)
+            audio_file['path'] = versioned_url(f"/api/audio/file/{audio_file['name']}", INPUT_AUDIO_DIR / audio_file['name'])
 
         return jsonify({'success': True, 'files': audio_files})
     except Exception as e:
@@ -74,7 +144,7 @@ def list_audio_files():
 def serve_audio_file(filename):
     """Serve an audio file."""
     try:
-        return send_from_directory(INPUT_AUDIO_DIR, filename)
+        return send_media(INPUT_AUDIO_DIR, filename)
     except Exception as e:
         logger.error(f"Error serving audio file {filename}: {e}")
         return jsonify({'success': False, 'error': str(e)}), 404
@@ -82,19 +152,19 @@ def serve_audio_file(filename):
 
 @app.route('/api/shaders/list')
 def list_shaders():
-    """List all available shaders with metadata."""
+    """List all available shaders with metadata (served from the shader catalogue)."""
     try:
-        metadata_path = SHADERS_DIR / "metadata.json"
-        
-        if not metadata_path.exists():
+        try:
+            shaders = shader_catalog.list()
+        except FileNotFoundError:
             return jsonify({'success': False, 'error': 'metadata.json not found'}), 404
         
-        with open(metadata_path, 'r') as f:
-            shaders = json.load(f)
-        
-        # Add full paths for preview images
+        # Add full paths for preview images (and a downscaled variant for the asset panel)
         for shader in shaders:
-            shader['preview_path'] = f"/api/shaders/preview/{shader['preview_image']}"
+            preview_url = f"/api/shaders/preview/{shader['preview_image']}"
+            preview_file = SHADERS_DIR / shader['preview_image']
+            shader['preview_path'] = versioned_url(preview_url, preview_file)
+            shader['preview_thumbnail'] = versioned_url(preview_url, preview_file, w=320)
         
         return jsonify({'success': True, 'shaders': shaders})
     except Exception as e:
@@ -104,8 +174,17 @@ def list_shaders():
 
 @app.route('/api/shaders/preview/<path:filename>')
 def get_shader_preview(filename):
-    """Serve shader preview images."""
-    return send_from_directory(SHADERS_DIR, filename)
+    """Serve shader preview images; ?w=<width> serves a downscaled JPEG variant."""
+    width = request.args.get('w', type=int)
+    if width:
+        try:
+            variant = shader_previews.get(filename, width)
+        except Exception as e:
+            logger.warning(f"Could not downscale shader preview {filename}: {e}")
+            variant = None
+        if variant is not None:
+            return send_media(variant.parent, variant.name, version_path=SHADERS_DIR / filename)
+    return send_media(SHADERS_DIR, filename)
 
 
 @app.route('/api/shaders/update', methods=['POST'])
@@ -124,29 +203,16 @@ def update_shader_metadata():
         if description and len(description) > 256:
             return jsonify({'success': False, 'error': 'Description must be 256 characters or less'}), 400
         
-        # Load current metadata
-        metadata_path = SHADERS_DIR / "metadata.json"
-        with open(metadata_path, 'r') as f:
-            shaders = json.load(f)
-        
-        # Find and update the shader
-        shader_found = False
-        for shader in shaders:
-            if shader['name'] == shader_name:
-                if stars is not None:
-                    shader['stars'] = int(stars)
-                if description is not None:
-                    shader['description'] = description
-                shader_found = True
-                break
-        
-        if not shader_found:
+        # Update the catalogue (written back to metadata.json shortly after)
+        fields = {}
+        if stars is not None:
+            fields['stars'] = int(stars)
+        if description is not None:
+            fields['description'] = description
+
+        if not shader_catalog.update(shader_name, **fields):
             return jsonify({'success': False, 'error': 'Shader not found'}), 404
         
-        # Save updated metadata
-        with open(metadata_path, 'w') as f:
-            json.dump(shaders, f, indent=2)
-        
         return jsonify({'success': True, 'message': 'Shader metadata updated'})
     except Exception as e:
         logger.error(f"Error updating shader metadata: {e}")
@@ -155,40 +221,22 @@ def update_shader_metadata():
 
 @app.route('/api/videos/list')
 def list_videos():
-    """List all available video files with thumbnails."""
+    """List all available video files with thumbnails (served from the video catalogue).
+
+    Thumbnails and durations are produced by background workers; clips still being
+    processed come back with pending: true and no thumbnail.
+    """
     try:
-        video_extensions = ['.mp4', '.avi', '.mov', '.mkv', '.webm']
         videos = []
-        
-        for ext in video_extensions:
-            for file_path in INPUT_VIDEO_DIR.glob(f'*{ext}'):
-                # Generate thumbnail if it doesn't exist
-                thumbnail_name = f"{file_path.stem}_thumb.jpg"
-                thumbnail_path = THUMBNAILS_DIR / thumbnail_name
-                
-                if not thumbnail_path.exists():
-                    generate_thumbnail(file_path, thumbnail_path)
-                
-                # Get video duration using ffprobe
-                try:
-                    result = subprocess.run(
-                        ['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
-                         '-of', 'default=noprint_wrappers=1:nokey=1', str(file_path)],
-                        capture_output=True, text=True, check=True
-                    )
-                    duration = float(result.stdout.strip())
-                except Exception as e:
-                    logger.warning(f"Could not get duration for {file_path.name}: {e}")
-                    duration = 0
-                
-                videos.append({
-                    'name': file_path.name,
-                    'path': str(file_path.relative_to(BASE_DIR)),
-                    'duration': duration,
-                    'size': file_path.stat().st_size,
-                    'thumbnail': f"/api/videos/thumbnail/{thumbnail_name}"
-                })
-        
+        for video in video_catalog.list():
+            thumbnail_name = video.pop('thumbnail_name')
+            video['path'] = str((INPUT_VIDEO_DIR / video['name']).relative_to(BASE_DIR))
+            video['thumbnail'] = versioned_url(
+                f"/api/videos/thumbnail/{thumbnail_name}", THUMBNAILS_DIR / thumbnail_name
+            ) if thumbnail_name else None
+            video['url'] = versioned_url(f"/api/videos/file/{video['name']}", INPUT_VIDEO_DIR / video['name'])
+            videos.append(video)
+
         return jsonify({'success': True, 'videos': videos})
     except Exception as e:
         logger.error(f"Error listing videos: {e}")
@@ -198,14 +246,14 @@ def list_videos():
 @app.route('/api/videos/thumbnail/<path:filename>')
 def get_video_thumbnail(filename):
     """Serve video thumbnail images."""
-    return send_from_directory(THUMBNAILS_DIR, filename)
+    return send_media(THUMBNAILS_DIR, filename)
 
 
 @app.route('/api/videos/file/<path:filename>')
 def serve_video_file(filename):
     """Serve a video file for preview."""
     try:
-        return send_from_directory(INPUT_VIDEO_DIR, filename)
+        return send_media(INPUT_VIDEO_DIR, filename)
     except Exception as e:
         logger.error(f"Error serving video file {filename}: {e}")
         return jsonify({'success': False, 'error': str(e)}), 404
@@ -295,6 +343,7 @@ def save_project():
         project_path = PROJECTS_DIR / f"{safe_name}.json"
         with open(project_path, 'w', encoding='utf-8') as f:
             json.dump(project_data, f, indent=2, ensure_ascii=False)
+        project_catalog.record(project_path.name, project_data)
 
         logger.info(f"Project saved: {project_path}")
         return jsonify({
@@ -327,34 +376,9 @@ def load_project(filename):
 
 @app.route('/api/project/list')
 def list_projects():
-    """List all saved projects."""
+    """List all saved projects (served from the project index)."""
     try:
-        projects = []
-        for file_path in PROJECTS_DIR.glob('*.json'):
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                projects.append({
-                    'filename': file_path.name,
-                    'name': data.get('name', file_path.stem),
-                    'created': data.get('created', ''),
-                    'modified': data.get('modified', ''),
-                    'audio': data.get('audio', {}).get('name', 'Unknown'),
-                    'size': file_path.stat().st_size
-                })
-            except Exception as e:
-                logger.warning(f"Could not read project {file_path.name}: {e}")
-                projects.append({
-                    'filename': file_path.name,
-                    'name': file_path.stem,
-                    'created': '',
-                    'modified': '',
-                    'audio': 'Unknown',
-                    'size': file_path.stat().st_size
-                })
-
-        # Sort by modified date (most recent first)
-        projects.sort(key=lambda x: x.get('modified', ''), reverse=True)
+        projects = project_catalog.list()
         return jsonify({'success': True, 'projects': projects})
     except Exception as e:
         logger.error(f"Error listing projects: {e}")
@@ -370,6 +394,7 @@ def delete_project(filename):
             return jsonify({'success': False, 'error': 'Project not found'}), 404
 
         project_path.unlink()
+        project_catalog.remove(project_path.name)
         logger.info(f"Project deleted: {project_path}")
         return jsonify({'success': True, 'message': 'Project deleted'})
     except Exception as e:
@@ -381,31 +406,23 @@ def delete_project(filename):
 def test_render():
     """Test render endpoint - renders test_render_manifest.json"""
     try:
-        import subprocess
-        import sys
-
         manifest_path = Path('test_render_manifest.json')
         if not manifest_path.exists():
             return jsonify({'success': False, 'error': 'test_render_manifest.json not found'}), 404
 
-        python_exe = sys.executable
-        log_file = open('test_render_output.log', 'w')
+        with open(manifest_path, 'r') as f:
+            render_manifest = json.load(f)
 
-        process = subprocess.Popen(
-            [python_exe, 'render_timeline.py', str(manifest_path)],
-            stdout=log_file,
-            stderr=subprocess.STDOUT,
-            text=True,
-            cwd=str(Path.cwd())
-        )
+        job = render_queue.submit(render_manifest, name='Test render')
 
-        logger.info(f"Started TEST render process (PID: {process.pid})")
+        logger.info(f"Queued TEST render job {job['id']}")
 
         return jsonify({
             'success': True,
-            'message': 'Test render started',
-            'process_id': process.pid,
-            'log_file': 'test_render_output.log'
+            'message': 'Test render queued',
+            'job_id': job['id'],
+            'status': job['status'],
+            'log_file': job['log_path']
         })
 
     except Exception as e:
@@ -415,6 +432,29 @@ def test_render():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+def estimate_render(render_manifest):
+    """Render time, disk and memory estimate from render_planner.py (None if it fails)."""
+    try:
+        return estimate_timeline(render_manifest, SHADERS_DIR / "metadata.json")
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.warning(f"Render estimate failed: {e}")
+        return None
+
+
+@app.route('/api/project/estimate', methods=['POST'])
+def estimate_project():
+    """Estimate render time, GPU/encode split, scratch disk and memory before rendering."""
+    render_manifest = request.json
+
+    if not render_manifest or 'audio' not in render_manifest or 'timeline' not in render_manifest:
+        return jsonify({'success': False, 'error': 'Invalid manifest structure'}), 400
+
+    estimate = estimate_render(render_manifest)
+    if estimate is None:
+        return jsonify({'success': False, 'error': 'Could not estimate this render'}), 500
+    return jsonify({'success': True, 'estimate': estimate})
+
+
 @app.route('/api/project/render', methods=['POST'])
 def render_project():
     """Render the timeline to a video file."""
@@ -425,44 +465,23 @@ def render_project():
         if 'audio' not in render_manifest or 'timeline' not in render_manifest:
             return jsonify({'success': False, 'error': 'Invalid manifest structure'}), 400
 
-        # Save manifest to temporary file
-        manifest_path = Path("temp_render_manifest.json")
-        with open(manifest_path, 'w') as f:
-            json.dump(render_manifest, f, indent=2)
-
-        logger.info(f"Saved render manifest: {manifest_path}")
         logger.info(f"Timeline elements: {len(render_manifest['timeline'].get('elements', []))}")
 
-        # Launch render_timeline.py as subprocess (async rendering)
-        import subprocess
-        import sys
+        # Queue render_timeline.py (async rendering); each job gets its own manifest and log
+        priority = request.args.get('priority', 0, type=int)
+        job = render_queue.submit(render_manifest, priority=priority)
 
-        # Use the same Python interpreter that's running Flask
-        python_exe = sys.executable
-
-        # Create log file for render output
-        log_file = open('render_output.log', 'w')
-
-        process = subprocess.Popen(
-            [python_exe, 'render_timeline.py', str(manifest_path)],
-            stdout=log_file,
-            stderr=subprocess.STDOUT,
-            text=True,
-            cwd=str(Path.cwd())
-        )
-
-        logger.info(f"Started render process (PID: {process.pid})")
-        logger.info(f"Python executable: {python_exe}")
-        logger.info(f"Working directory: {Path.cwd()}")
-        logger.info(f"Render output will be logged to: render_output.log")
+        logger.info(f"Render job {job['id']}: {job['status']}")
+        logger.info(f"Render output will be logged to: {job['log_path']}")
 
         # Return immediately (async rendering)
         return jsonify({
             'success': True,
-            'message': 'Rendering started',
-            'manifest_path': str(manifest_path),
-            'process_id': process.pid,
-            'log_file': 'render_output.log'
+            'message': 'Rendering started' if job['status'] == 'running' else 'Render queued',
+            'job_id': job['id'],
+            'status': job['status'],
+            'manifest_path': job['manifest_path'],
+            'log_file': job['log_path']
         })
 
     except Exception as e:
@@ -491,114 +510,162 @@ def generate_thumbnail(video_path, thumbnail_path):
         img.save(thumbnail_path)
 
 
-@app.route('/api/render/status/<int:process_id>')
-def get_render_status(process_id):
-    """Read render_output.log and return detailed progress."""
+
+# Video library listing; thumbnails and probes run on a small worker pool
+video_catalog = VideoCatalog(
+    INPUT_VIDEO_DIR, THUMBNAILS_DIR, CACHE_DIR / "video_catalog.json",
+    get_video_duration, generate_thumbnail, VIDEO_EXTENSIONS
+)
+
+
+def make_preview_manifest(render_manifest):
+    """Copy of a render manifest scaled down for a quick proxy render.
+
+    Same timeline and audio; smaller frame (even dimensions for yuv420p), lower
+    frame rate and a fast x264 preset. Output goes to <project>_preview.mp4.
+    """
+    settings = PREVIEW_SETTINGS
+    resolution = render_manifest.get('resolution', {'width': 2560, 'height': 1440})
+    scale = float(settings['scale'])
+
+    preview_manifest = dict(render_manifest)
+    preview_manifest['project_name'] = f"{render_manifest.get('project_name', 'timeline_render')}_preview"
+    preview_manifest['resolution'] = {
+        'width': max(2, int(resolution['width'] * scale) // 2 * 2),
+        'height': max(2, int(resolution['height'] * scale) // 2 * 2)
+    }
+    preview_manifest['frame_rate'] = min(render_manifest.get('frame_rate', 30), settings['frame_rate'])
+    preview_manifest['encoding'] = {'crf': settings['crf'], 'preset': settings['preset']}
+    preview_manifest['preview'] = True
+    return preview_manifest
+
+
+@app.route('/api/project/preview', methods=['POST'])
+def preview_project():
+    """Render a low-resolution proxy of the timeline for checking timing and transitions."""
     try:
-        log_file = Path('render_output.log')
-        if not log_file.exists():
-            return jsonify({
-                'status': 'starting',
-                'progress': 0,
-                'stage': 'Initializing...',
-                'current_item': '',
-                'detail': 'Starting render process...'
-            })
-
-        # Read last 100 lines (increased for better context)
-        with open(log_file, 'r', encoding='utf-8', errors='ignore') as f:
-            lines = f.readlines()[-100:]
-
-        progress = 0
-        stage = 'Starting...'
-        current_item = ''
-        detail = ''
-        status = 'running'
-
-        import re
-
-        # Parse lines in reverse to get most recent status
-        for line in reversed(lines):
-            # Check for completion
-            if '=== Rendering Completed' in line:
-                return jsonify({
-                    'status': 'completed',
-                    'progress': 100,
-                    'stage': 'Complete!',
-                    'current_item': 'Finished',
-                    'detail': 'Rendering completed successfully'
-                })
+        render_manifest = request.json
 
-            # Check for errors
-            if 'Rendering failed:' in line or 'ERROR' in line:
-                return jsonify({
-                    'status': 'failed',
-                    'progress': progress,
-                    'stage': 'Error occurred',
-                    'current_item': '',
-                    'detail': line.strip(),
-                    'error': line.strip()
-                })
+        # Validate manifest structure
+        if not render_manifest or 'audio' not in render_manifest or 'timeline' not in render_manifest:
+            return jsonify({'success': False, 'error': 'Invalid manifest structure'}), 400
+
+        preview_manifest = make_preview_manifest(render_manifest)
+        resolution = preview_manifest['resolution']
 
-            # Parse structured progress lines (new format)
-            # Format: "PROGRESS: 45.2% | STAGE: Rendering shader | ITEM: Cosmic Nebula2.glsl | TIME: 30.0s/180.0s"
-            progress_match = re.search(r'PROGRESS:\s*([\d.]+)%\s*\|\s*STAGE:\s*([^|]+)\s*\|\s*ITEM:\s*([^|]+)\s*\|\s*TIME:\s*([^|]+)', line)
-            if progress_match:
-                progress = float(progress_match.group(1))
-                stage = progress_match.group(2).strip()
-                current_item = progress_match.group(3).strip()
-                time_info = progress_match.group(4).strip()
-                detail = f"{stage}: {current_item} ({time_info})"
-                break  # Found most recent structured progress
-
-            # Fallback: Parse old-style progress lines
-            if 'Progress:' in line and not progress_match:
-                match = re.search(r'Progress:\s*([\d.]+)%', line)
-                if match:
-                    progress = float(match.group(1))
-
-            # Parse stage markers (fallback for old format)
-            if '--- Rendering Layer 1' in line and not stage:
-                stage = 'Rendering shaders & transitions'
-            elif '--- Rendering Layer 0' in line and not stage:
-                stage = 'Rendering green screen videos'
-            elif '--- Compositing' in line and not stage:
-                stage = 'Compositing layers'
-                detail = 'Applying chroma key and merging layers'
-            elif '--- Adding Audio' in line and not stage:
-                stage = 'Adding audio track'
-                detail = 'Muxing audio with FFmpeg'
-
-            # Parse transition start messages
-            if '▶️ Starting transition:' in line and not current_item:
-                match = re.search(r'Starting transition:\s*([^\(]+)', line)
-                if match:
-                    current_item = f"Transition: {match.group(1).strip()}"
-
-            # Parse shader compilation
-            if 'Compiling' in line and 'shader' in line.lower() and not current_item:
-                match = re.search(r'Compiling\s+(.+?)\.\.\.', line)
-                if match:
-                    current_item = match.group(1).strip()
-
-        # Build detail message if not already set
-        if not detail:
-            if current_item:
-                detail = f"{stage}: {current_item}"
-            else:
-                detail = stage
+        # Previews jump ahead of queued full-quality renders
+        job = render_queue.submit(
+            preview_manifest, name=preview_manifest['project_name'],
+            priority=PREVIEW_SETTINGS['priority']
+        )
+
+        logger.info(
+            f"Preview job {job['id']}: {resolution['width']}x{resolution['height']} "
+            f"@ {preview_manifest['frame_rate']}fps ({job['status']})"
+        )
 
         return jsonify({
-            'status': status,
-            'progress': progress,
-            'stage': stage,
-            'current_item': current_item,
-            'detail': detail
+            'success': True,
+            'message': 'Preview started' if job['status'] == 'running' else 'Preview queued',
+            'job_id': job['id'],
+            'status': job['status'],
+            'output_file': f"{preview_manifest['project_name']}.mp4",
+            'log_file': job['log_path']
         })
 
     except Exception as e:
-        logger.error(f"Error getting render status: {e}")
-        return jsonify({'status': 'error', 'error': str(e)}), 500
+        logger.error(f"Error starting preview render: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@app.route('/api/render/frame', methods=['POST'])
+def render_still_frame():
+    """Render the timeline frame at one time as a JPEG or WebP image (for scrubbing)."""
+    try:
+        data = request.json or {}
+        render_manifest = data.get('manifest')
+
+        # Validate manifest structure
+        if not render_manifest or 'audio' not in render_manifest or 'timeline' not in render_manifest:
+            return jsonify({'success': False, 'error': 'Invalid manifest structure'}), 400
+
+        image_format = data.get('format', 'jpeg')
+        if image_format not in ('jpeg', 'webp'):
+            return jsonify({'success': False, 'error': 'Format must be jpeg or webp'}), 400
+
+        image, mime = still_frame_worker.render(
+            render_manifest,
+            float(data.get('time', 0.0)),
+            image_format=image_format,
+            quality=int(data.get('quality', 80)),
+            max_width=int(data.get('max_width', 960))
+        )
+        return Response(image, mimetype=mime, headers={'Cache-Control': 'no-store'})
+
+    except StillFrameError as e:
+        logger.error(f"Still frame failed: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+    except Exception as e:
+        logger.error(f"Error rendering still frame: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@app.route('/api/render/queue')
+def list_render_jobs():
+    """List render jobs: running, queued (in start order) and finished."""
+    jobs = render_queue.list()
+    for job in jobs:
+        job['progress'] = render_monitor.get_status(job['id']).get('progress', 0)
+    return jsonify({'success': True, 'jobs': jobs, 'max_concurrent': render_queue.max_concurrent})
+
+
+@app.route('/api/render/cancel/<job_id>', methods=['POST'])
+def cancel_render_job(job_id):
+    """Cancel a queued or running render job."""
+    try:
+        if not render_queue.cancel(job_id):
+            return jsonify({'success': False, 'error': 'Render job already finished'}), 409
+        return jsonify({'success': True, 'message': 'Render job cancelled'})
+    except KeyError:
+        return jsonify({'success': False, 'error': 'Render job not found'}), 404
+
+
+@app.route('/api/render/priority/<job_id>', methods=['POST'])
+def set_render_job_priority(job_id):
+    """Change the priority of a queued render job (higher runs first)."""
+    try:
+        priority = (request.json or {}).get('priority')
+        if priority is None:
+            return jsonify({'success': False, 'error': 'Priority required'}), 400
+        if not render_queue.set_priority(job_id, int(priority)):
+            return jsonify({'success': False, 'error': 'Only queued jobs can be re-prioritised'}), 409
+        return jsonify({'success': True, 'job': render_queue.get(job_id)})
+    except KeyError:
+        return jsonify({'success': False, 'error': 'Render job not found'}), 404
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'error': 'Priority must be an integer'}), 400
+
+
+@app.route('/api/render/events/<job_id>')
+def stream_render_events(job_id):
+    """Server-sent events stream of a render job's progress."""
+    if not render_monitor.is_watching(job_id):
+        return jsonify({'success': False, 'error': 'Render job not found'}), 404
+
+    return Response(
+        render_monitor.stream(job_id),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@app.route('/api/render/status/<job_id>')
+def get_render_status(job_id):
+    """Return detailed progress of a render job."""
+    if not render_monitor.is_watching(job_id):
+        return jsonify({'status': 'error', 'error': 'Render job not found'}), 404
+
+    return jsonify(render_monitor.get_status(job_id))
 
 
 @app.route('/api/render/output/<path:filename>')
@@ -606,7 +673,7 @@ def serve_output_video(filename):
     """Serve completed video from Output_Video folder."""
     try:
         output_dir = BASE_DIR / 'Output_Video'
-        return send_from_directory(output_dir, filename)
+        return send_media(output_dir, filename)
     except Exception as e:
         logger.error(f"Error serving output video {filename}: {e}")
         return jsonify({'success': False, 'error': str(e)}), 404
@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+OneOffRender Web Editor - Media Catalogues
+In-memory indexes of the media libraries and saved projects so API listings don't touch every file per request.
+"""
+
+import os
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+def write_json_atomic(path, data, **dump_kwargs):
+    """Write JSON to a temp file next to path, then swap it in (never leaves a half-written file)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(path.name + '.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, **dump_kwargs)
+    os.replace(temp_path, path)
+
+
+def scan_files(directory, extensions):
+    """Stat the files in directory with the given extensions: {name: (size, mtime)}."""
+    files = {}
+    if not Path(directory).exists():
+        return files
+    with os.scandir(directory) as it:
+        for entry in it:
+            if not entry.is_file() or Path(entry.name).suffix.lower() not in extensions:
+                continue
+            stat = entry.stat()
+            files[entry.name] = (stat.st_size, stat.st_mtime)
+    return files
+
+
+class FileCatalog:
+    """Base for catalogues of per-file probe results keyed by name, size and mtime.
+
+    Entries are persisted to a JSON cache so a server restart only probes new or
+    changed files.
+    """
+
+    label = 'file'
+
+    def __init__(self, cache_path):
+        self.cache_path = Path(cache_path)
+        self.lock = threading.Lock()
+        self.entries = {}  # name -> {'size', 'mtime', ...probe results}
+        self.load_cache()
+
+    def load_cache(self):
+        """Load previously probed entries from the cache file."""
+        if not self.cache_path.exists():
+            return
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f).get('entries', {})
+            logger.info(f"{self.label.capitalize()} catalogue: loaded {len(self.entries)} cached entries")
+        except Exception as e:
+            logger.warning(f"Could not read {self.label} catalogue cache {self.cache_path}: {e}")
+            self.entries = {}
+
+    def save_cache(self):
+        """Persist the probed entries."""
+        with self.lock:
+            data = {'version': 1, 'entries': dict(self.entries)}
+        try:
+            write_json_atomic(self.cache_path, data, indent=2)
+        except Exception as e:
+            logger.warning(f"Could not write {self.label} catalogue cache {self.cache_path}: {e}")
+
+    def is_current(self, name, size, mtime):
+        """True if the cached entry for name matches the file's size and mtime (call under lock)."""
+        entry = self.entries.get(name)
+        return entry is not None and entry['size'] == size and entry['mtime'] == mtime
+
+
+class AudioCatalog(FileCatalog):
+    """Audio library listing with durations cached by file name, size and mtime.
+
+    Durations are probed by a background scanner. Listing answers from memory;
+    files the scanner hasn't reached yet are listed as pending.
+    """
+
+    label = 'audio'
+
+    def __init__(self, audio_dir, cache_path, probe_duration, extensions, scan_interval=30.0):
+        self.audio_dir = Path(audio_dir)
+        self.probe_duration = probe_duration
+        self.extensions = {ext.lower() for ext in extensions}
+        self.scan_interval = scan_interval
+
+        self.wake_event = threading.Event()
+        self.scanner = None
+
+        super().__init__(cache_path)
+
+    def start(self):
+        """Start the background scanner (once)."""
+        with self.lock:
+            if self.scanner is not None:
+                return
+            self.scanner = threading.Thread(target=self.scan_loop, name='audio-catalog', daemon=True)
+        self.scanner.start()
+
+    def scan_loop(self):
+        """Rescan periodically, or as soon as a listing finds unknown files."""
+        while True:
+            try:
+                self.scan()
+            except Exception as e:
+                logger.error(f"Audio catalogue scan failed: {e}")
+            self.wake_event.wait(self.scan_interval)
+            self.wake_event.clear()
+
+    def scan(self):
+        """Probe new or changed files and drop deleted ones."""
+        files = scan_files(self.audio_dir, self.extensions)
+        changed = False
+
+        with self.lock:
+            for name in set(self.entries) - set(files):
+                del self.entries[name]
+                changed = True
+            stale = [
+                name for name, (size, mtime) in files.items()
+                if not self.is_current(name, size, mtime)
+            ]
+
+        for name in stale:
+            size, mtime = files[name]
+            try:
+                duration = self.probe_duration(self.audio_dir / name)
+            except Exception as e:
+                logger.warning(f"Could not get duration for {name}: {e}")
+                duration = 0
+            with self.lock:
+                self.entries[name] = {'size': size, 'mtime': mtime, 'duration': duration}
+            changed = True
+
+        if stale:
+            logger.info(f"Audio catalogue: probed {len(stale)} file(s)")
+        if changed:
+            self.save_cache()
+
+    def list(self):
+        """List audio files from memory: [{'name', 'duration', 'size', 'pending'}]."""
+        self.start()
+        files = scan_files(self.audio_dir, self.extensions)
+
+        audio_files = []
+        needs_scan = False
+        with self.lock:
+            for name in sorted(files, key=str.lower):
+                size, mtime = files[name]
+                entry = self.entries.get(name)
+                pending = not self.is_current(name, size, mtime)
+                needs_scan = needs_scan or pending
+                audio_files.append({
+                    'name': name,
+                    'duration': entry['duration'] if entry else 0,
+                    'size': size,
+                    'pending': pending
+                })
+
+        if needs_scan:
+            self.wake_event.set()
+
+        return audio_files
+
+
+class VideoCatalog(FileCatalog):
+    """Video library listing with thumbnails and probe data made by a background worker pool.
+
+    Listing never runs FFmpeg: clips without a current thumbnail or probe result
+    are queued on a bounded pool and returned as pending until their job finishes.
+    """
+
+    label = 'video'
+
+    def __init__(self, video_dir, thumbnails_dir, cache_path, probe_duration, make_thumbnail,
+                 extensions, max_workers=2):
+        self.video_dir = Path(video_dir)
+        self.thumbnails_dir = Path(thumbnails_dir)
+        self.probe_duration = probe_duration
+        self.make_thumbnail = make_thumbnail
+        self.extensions = {ext.lower() for ext in extensions}
+
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='video-catalog')
+        self.queued = set()  # names with a job in flight
+
+        super().__init__(cache_path)
+
+    def thumbnail_name(self, name):
+        """Thumbnail file name for a clip."""
+        return f"{Path(name).stem}_thumb.jpg"
+
+    def process(self, name, size, mtime):
+        """Worker job: make the thumbnail (if missing) and probe the clip."""
+        file_path = self.video_dir / name
+        try:
+            thumbnail_path = self.thumbnails_dir / self.thumbnail_name(name)
+            if not thumbnail_path.exists():
+                self.make_thumbnail(file_path, thumbnail_path)
+
+            try:
+                duration = self.probe_duration(file_path)
+            except Exception as e:
+                logger.warning(f"Could not get duration for {name}: {e}")
+                duration = 0
+
+            with self.lock:
+                self.entries[name] = {'size': size, 'mtime': mtime, 'duration': duration}
+            self.save_cache()
+        except Exception as e:
+            logger.error(f"Video catalogue job failed for {name}: {e}")
+        finally:
+            with self.lock:
+                self.queued.discard(name)
+
+    def list(self):
+        """List videos from memory, queueing work for new or changed clips.
+
+        Returns [{'name', 'duration', 'size', 'thumbnail_name', 'pending'}];
+        thumbnail_name is None while the clip is pending.
+        """
+        files = scan_files(self.video_dir, self.extensions)
+
+        videos = []
+        jobs = []
+        with self.lock:
+            for name in set(self.entries) - set(files):
+                del self.entries[name]
+
+            for name in sorted(files, key=str.lower):
+                size, mtime = files[name]
+                thumbnail_name = self.thumbnail_name(name)
+                pending = (not self.is_current(name, size, mtime)
+                           or not (self.thumbnails_dir / thumbnail_name).exists())
+                if pending and name not in self.queued:
+                    self.queued.add(name)
+                    jobs.append((name, size, mtime))
+
+                entry = self.entries.get(name)
+                videos.append({
+                    'name': name,
+                    'duration': entry['duration'] if entry else 0,
+                    'size': size,
+                    'thumbnail_name': None if pending else thumbnail_name,
+                    'pending': pending
+                })
+
+        for job in jobs:
+            self.executor.submit(self.process, *job)
+
+        return videos
+
+
+class ProjectCatalog(FileCatalog):
+    """Saved project listing (Projects/*.json) indexed by name, size and mtime.
+
+    Only the fields the project list shows are kept. Saves and deletes through
+    the editor update the index directly; files added or edited outside it are
+    re-read on the next listing because their size or mtime no longer matches.
+    """
+
+    label = 'project'
+
+    def __init__(self, projects_dir, cache_path):
+        self.projects_dir = Path(projects_dir)
+        super().__init__(cache_path)
+
+    def summarize(self, filename, data, size, mtime):
+        """Index entry for a project's data."""
+        return {
+            'size': size,
+            'mtime': mtime,
+            'name': data.get('name', Path(filename).stem),
+            'created': data.get('created', ''),
+            'modified': data.get('modified', ''),
+            'audio': data.get('audio', {}).get('name', 'Unknown')
+        }
+
+    def read(self, filename, size, mtime):
+        """Parse a project file into an index entry (placeholder fields if unreadable)."""
+        try:
+            with open(self.projects_dir / filename, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.warning(f"Could not read project {filename}: {e}")
+            data = {}
+        return self.summarize(filename, data, size, mtime)
+
+    def record(self, filename, data):
+        """Index a project the editor just saved (no need to parse it back)."""
+        stat = (self.projects_dir / filename).stat()
+        with self.lock:
+            self.entries[filename] = self.summarize(filename, data, stat.st_size, stat.st_mtime)
+        self.save_cache()
+
+    def remove(self, filename):
+        """Drop a deleted project from the index."""
+        with self.lock:
+            removed = self.entries.pop(filename, None)
+        if removed is not None:
+            self.save_cache()
+
+    def list(self):
+        """List projects, most recently modified first: [{'filename', 'name', 'created', 'modified', 'audio', 'size'}]."""
+        files = scan_files(self.projects_dir, {'.json'})
+
+        with self.lock:
+            stale = [name for name in self.entries if name not in files]
+            changed = [
+                name for name, (size, mtime) in files.items()
+                if not self.is_current(name, size, mtime)
+            ]
+
+        # Parse new or edited files outside the lock
+        updates = {name: self.read(name, *files[name]) for name in changed}
+
+        with self.lock:
+            for name in stale:
+                self.entries.pop(name, None)
+            self.entries.update(updates)
+            projects = [
+                {'filename': name, **{key: value for key, value in entry.items() if key != 'mtime'}}
+                for name, entry in self.entries.items() if name in files
+            ]
+
+        if stale or updates:
+            logger.info(f"Project catalogue: {len(updates)} re-read, {len(stale)} removed")
+            self.save_cache()
+
+        projects.sort(key=lambda x: x.get('modified', ''), reverse=True)
+        return projects
+
+
+class ShaderCatalog:
+    """Shader metadata (Shaders/metadata.json) held in memory and indexed by name.
+
+    Edits made on disk are picked up by mtime on the next access. Updates from
+    the editor are applied in memory at once and written back atomically in a
+    batch shortly after, so a burst of star changes costs one file write.
+    """
+
+    def __init__(self, metadata_path, flush_delay=1.0):
+        self.metadata_path = Path(metadata_path)
+        self.flush_delay = flush_delay
+
+        self.lock = threading.RLock()
+        self.shaders = []
+        self.by_name = {}
+        self.mtime = None
+        self.pending_updates = {}  # name -> {field: value} not yet written
+        self.flush_timer = None
+
+    def refresh(self):
+        """Reload metadata.json if it changed on disk (call under lock)."""
+        mtime = self.metadata_path.stat().st_mtime
+
+        if mtime == self.mtime:
+            return
+
+        with open(self.metadata_path, 'r') as f:
+            shaders = json.load(f)
+
+        self.shaders = shaders
+        self.by_name = {shader['name']: shader for shader in shaders}
+        self.mtime = mtime
+
+        # Edits not yet written still win over the reloaded file
+        for name, fields in self.pending_updates.items():
+            if name in self.by_name:
+                self.by_name[name].update(fields)
+
+        logger.info(f"Shader catalogue: loaded {len(shaders)} shaders")
+
+    def list(self):
+        """All shader entries (copies, in metadata.json order)."""
+        with self.lock:
+            self.refresh()
+            return [dict(shader) for shader in self.shaders]
+
+    def get(self, name):
+        """A copy of one shader entry, or None."""
+        with self.lock:
+            self.refresh()
+            shader = self.by_name.get(name)
+            return dict(shader) if shader else None
+
+    def update(self, name, **fields):
+        """Update fields of one shader; returns False if it doesn't exist."""
+        with self.lock:
+            self.refresh()
+            shader = self.by_name.get(name)
+            if shader is None:
+                return False
+
+            shader.update(fields)
+            self.pending_updates.setdefault(name, {}).update(fields)
+
+            if self.flush_timer is None:
+                self.flush_timer = threading.Timer(self.flush_delay, self.flush)
+                self.flush_timer.daemon = True
+                self.flush_timer.start()
+            return True
+
+    def flush(self):
+        """Write pending updates to metadata.json (atomically)."""
+        with self.lock:
+            self.flush_timer = None
+            if not self.pending_updates:
+                return
+            try:
+                # Merge with any edit made on disk since the last load
+                self.refresh()
+                write_json_atomic(self.metadata_path, self.shaders, indent=2)
+                self.mtime = self.metadata_path.stat().st_mtime
+                logger.info(f"Shader catalogue: wrote {len(self.pending_updates)} updated shader(s)")
+                self.pending_updates = {}
+            except Exception as e:
+                logger.error(f"Could not write shader metadata: {e}")
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+OneOffRender Web Editor - Media Serving
+Cache policy for the media endpoints and downscaled shader preview images.
+
+Listing endpoints hand out URLs with a ?v=<version> taken from the file's size and
+mtime. A request whose version matches the file on disk is content-addressed and
+can be cached by the browser for a year; anything else is revalidated with
+ETag / Last-Modified (a 304 when unchanged). Byte ranges are always honoured so
+audio and video elements can seek without downloading the whole file.
+"""
+
+import hashlib
+import logging
+import threading
+from pathlib import Path
+
+from flask import request, send_from_directory
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+def file_version(path):
+    """Short version tag for a file from its size and mtime (None if missing)."""
+    try:
+        stat = Path(path).stat()
+    except OSError:
+        return None
+    return hashlib.sha1(f"{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()[:12]
+
+
+def versioned_url(url, path, **params):
+    """URL with the file's version (and any extra query parameters) appended."""
+    version = file_version(path)
+    if version:
+        params['v'] = version
+    if not params:
+        return url
+    return url + '?' + '&'.join(f"{key}={value}" for key, value in params.items())
+
+
+def send_media(directory, filename, version_path=None):
+    """send_from_directory with conditional GETs, byte ranges and a cache policy.
+
+    version_path is the file the ?v= parameter is checked against (defaults to
+    the served file).
+    """
+    response = send_from_directory(directory, filename, conditional=True, etag=True)
+    version = request.args.get('v')
+
+    if version and version == file_version(version_path or Path(directory) / filename):
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        # Mutable URL (e.g. a re-rendered output): cache, but check the ETag every time
+        response.cache_control.no_cache = True
+        response.cache_control.max_age = None
+    response.headers['Accept-Ranges'] = 'bytes'
+    return response
+
+
+class PreviewThumbnails:
+    """Downscaled JPEG variants of preview images, generated on first request.
+
+    Requested widths snap up to one of a few sizes so the cache stays small.
+    Variants are named after the source version, so an edited image gets a new
+    variant and the old one is removed.
+    """
+
+    def __init__(self, source_dir, cache_dir, widths=(160, 320, 640), quality=82):
+        self.source_dir = Path(source_dir)
+        self.cache_dir = Path(cache_dir)
+        self.widths = sorted(widths)
+        self.quality = quality
+        self.lock = threading.Lock()
+
+    def snap_width(self, width):
+        """Smallest variant width at least as wide as requested (None for full size)."""
+        for candidate in self.widths:
+            if candidate >= width:
+                return candidate
+        return None
+
+    def get(self, filename, width):
+        """Path of the variant for filename at about width pixels, or None to serve the original."""
+        source = (self.source_dir / filename).resolve()
+        if self.source_dir.resolve() not in source.parents or not source.is_file():
+            return None
+
+        width = self.snap_width(width)
+        version = file_version(source)
+        if width is None or version is None:
+            return None
+
+        stem = filename.replace('/', '_').rsplit('.', 1)[0]
+        variant = self.cache_dir / f"{stem}_{width}_{version}.jpg"
+        if variant.exists():
+            return variant
+
+        with self.lock:
+            if variant.exists():
+                return variant
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+            with Image.open(source) as image:
+                if image.width <= width:
+                    return None
+                image = image.convert('RGB')
+                image.thumbnail((width, image.height), Image.LANCZOS)
+                temp_path = variant.with_suffix('.tmp')
+                image.save(temp_path, 'JPEG', quality=self.quality, optimize=True)
+                temp_path.replace(variant)
+
+            for old in self.cache_dir.glob(f"{stem}_{width}_{'?' * len(version)}.jpg"):
+                if old != variant:
+                    old.unlink(missing_ok=True)
+
+        logger.info(f"Created {width}px preview for {filename}")
+        return variant
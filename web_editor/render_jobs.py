@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+OneOffRender Web Editor - Render Job Queue
+Queues render requests and runs at most max_concurrent render_timeline.py
+processes at a time, each with its own job directory, manifest and log.
+"""
+
+import os
+import sys
+import json
+import heapq
+import itertools
+import logging
+import socket
+import subprocess
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from render_monitor import FINAL_STATUSES, RENDER_EVENT_PREFIX
+from render_client import read_token
+
+logger = logging.getLogger(__name__)
+
+
+class DaemonRenderProcess:
+    """Popen-like handle for a render running in render_daemon.py.
+
+    stdout yields the same lines render_timeline.py prints (prefixed events, plain
+    log lines), so RenderMonitor reads it like a subprocess. terminate() closes the
+    connection, which cancels the job in the daemon.
+    """
+
+    pid = None
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.events = connection.makefile('rb')
+        self.returncode = None
+
+    @classmethod
+    def connect(cls, address, request, timeout=1.0):
+        """Submit a job to the daemon; returns None if no daemon is listening."""
+        token = read_token()
+        if token is None:
+            return None
+        try:
+            connection = socket.create_connection(address, timeout=timeout)
+        except OSError:
+            return None
+        connection.settimeout(None)
+        connection.sendall((json.dumps(dict(request, token=token)) + '\n').encode('utf-8'))
+        return cls(connection)
+
+    @property
+    def stdout(self):
+        return self.read_lines()
+
+    def read_lines(self):
+        """Translate daemon events into renderer stdout lines until the job exits."""
+        try:
+            for raw in self.events:
+                event = json.loads(raw)
+                kind = event['event']
+                if kind == 'exit':
+                    self.returncode = event.get('code', 1)
+                    return
+                if kind == 'log':
+                    yield event['message'] + '\n'
+                elif kind == 'accepted':
+                    yield f"Render daemon job {event['job']} (position {event['position']})\n"
+                else:
+                    yield RENDER_EVENT_PREFIX + json.dumps(event) + '\n'
+        except (OSError, ValueError):
+            pass
+        finally:
+            if self.returncode is None:
+                self.returncode = 1
+            self.events.close()
+            self.connection.close()
+
+    def poll(self):
+        return self.returncode
+
+    def wait(self):
+        return self.returncode if self.returncode is not None else 1
+
+    def terminate(self):
+        try:
+            self.connection.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    kill = terminate
+
+
+class RenderJobQueue:
+    """Priority queue of render jobs with a concurrency limit.
+
+    Higher priority runs first; equal priorities run in submission order. Each
+    job gets jobs_dir/<job_id>/ with manifest.json and render.log. Progress is
+    published through the RenderMonitor under the job id.
+
+    With daemon_address set, jobs go to a running render_daemon.py (warm GL
+    context and shader cache); if none is listening they fall back to a
+    render_timeline.py subprocess.
+    """
+
+    def __init__(self, jobs_dir, monitor, max_concurrent=1, working_dir=None, daemon_address=None,
+                 gpu_timers=False):
+        self.jobs_dir = Path(jobs_dir)
+        self.monitor = monitor
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.working_dir = Path(working_dir) if working_dir else Path.cwd()
+        self.daemon_address = daemon_address
+        self.gpu_timers = gpu_timers
+
+        self.lock = threading.RLock()
+        self.jobs = {}      # job_id -> job dict
+        self.waiting = []   # heap of (-priority, seq, job_id)
+        self.running = {}   # job_id -> Popen
+        self.sequence = itertools.count()
+
+        self.jobs_dir.mkdir(parents=True, exist_ok=True)
+
+    def submit(self, manifest, name=None, priority=0):
+        """Queue a render manifest; returns the job dict (a copy)."""
+        job_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        job_dir = self.jobs_dir / job_id
+        job_dir.mkdir(parents=True, exist_ok=True)
+
+        # The renderer writes its stage timings next to the job's log
+        profile_path = job_dir / "profile.json"
+        manifest = dict(manifest, profile_report=str(profile_path.resolve()))
+        if self.gpu_timers:
+            manifest['gpu_timers'] = True
+
+        manifest_path = job_dir / "manifest.json"
+        with open(manifest_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+        job = {
+            'id': job_id,
+            'name': name or manifest.get('project_name', job_id),
+            'priority': int(priority),
+            'status': 'queued',
+            'submitted': datetime.now().isoformat(),
+            'started': None,
+            'finished': None,
+            'manifest_path': str(manifest_path),
+            'log_path': str(job_dir / "render.log"),
+            'profile_path': str(profile_path),
+            'output': None,
+            'pid': None
+        }
+
+        with self.lock:
+            self.jobs[job_id] = job
+            heapq.heappush(self.waiting, (-job['priority'], next(self.sequence), job_id))
+            logger.info(f"Render job queued: {job_id} ({job['name']}, priority {job['priority']})")
+            self.dispatch()
+            self.publish_queue_positions()
+            return dict(job)
+
+    def dispatch(self):
+        """Start queued jobs while there is spare capacity (call under lock)."""
+        while self.waiting and len(self.running) < self.max_concurrent:
+            _, _, job_id = heapq.heappop(self.waiting)
+            job = self.jobs[job_id]
+            if job['status'] != 'queued':
+                continue  # Cancelled while waiting
+            try:
+                self.start(job)
+            except Exception as e:
+                logger.error(f"Could not start render job {job_id}: {e}")
+                job['status'] = 'failed'
+                job['finished'] = datetime.now().isoformat()
+                self.monitor.update(job_id, {
+                    'status': 'failed', 'progress': 0, 'stage': 'Error occurred',
+                    'current_item': '', 'detail': str(e), 'error': str(e)
+                })
+
+    def start(self, job):
+        """Launch a job on the render daemon, or as a render_timeline.py process (call under lock)."""
+        log_file = open(job['log_path'], 'w', encoding='utf-8')
+
+        process = None
+        if self.daemon_address:
+            process = DaemonRenderProcess.connect(self.daemon_address, {
+                'type': 'timeline',
+                'manifest': str(Path(job['manifest_path']).resolve()),
+                'cwd': str(self.working_dir)
+            })
+
+        if process is None:
+            # Use the same Python interpreter that's running Flask
+            env = dict(os.environ, PYTHONIOENCODING='utf-8')
+            process = subprocess.Popen(
+                [sys.executable, 'render_timeline.py', job['manifest_path']],
+                stdout=subprocess.PIPE,
+                stderr=log_file,
+                text=True,
+                encoding='utf-8',
+                errors='replace',
+                cwd=str(self.working_dir),
+                env=env
+            )
+
+        job['status'] = 'running'
+        job['started'] = datetime.now().isoformat()
+        job['pid'] = process.pid
+        self.running[job['id']] = process
+        self.monitor.watch(job['id'], process, log_file, on_exit=self.on_exit)
+
+        if process.pid is None:
+            logger.info(f"Started render job {job['id']} on the render daemon")
+        else:
+            logger.info(f"Started render job {job['id']} (PID: {process.pid})")
+
+    def on_exit(self, job_id, returncode):
+        """Reader-thread callback: record the result and start the next job."""
+        status = self.monitor.get_status(job_id)
+        with self.lock:
+            job = self.jobs[job_id]
+            self.running.pop(job_id, None)
+            if job['status'] != 'cancelled':
+                job['status'] = status.get('status', 'failed')
+                job['output'] = status.get('output')
+            job['finished'] = datetime.now().isoformat()
+            logger.info(f"Render job {job_id} finished: {job['status']} (exit code {returncode})")
+
+            self.dispatch()
+            self.publish_queue_positions()
+
+    def cancel(self, job_id):
+        """Cancel a queued or running job; returns False if it already finished."""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                raise KeyError(job_id)
+            if job['status'] in FINAL_STATUSES:
+                return False
+
+            was_running = job['status'] == 'running'
+            job['status'] = 'cancelled'
+            if not was_running:
+                job['finished'] = datetime.now().isoformat()
+
+            # Publish before terminating so the exit isn't reported as a failure
+            self.monitor.update(job_id, {
+                'status': 'cancelled',
+                'progress': self.monitor.get_status(job_id).get('progress', 0),
+                'stage': 'Cancelled',
+                'current_item': '',
+                'detail': 'Render cancelled'
+            })
+
+            if was_running:
+                self.running[job_id].terminate()
+            else:
+                self.publish_queue_positions()
+
+            logger.info(f"Render job cancelled: {job_id}")
+            return True
+
+    def set_priority(self, job_id, priority):
+        """Change the priority of a queued job; returns False if it isn't queued."""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                raise KeyError(job_id)
+            if job['status'] != 'queued':
+                return False
+
+            job['priority'] = int(priority)
+            self.waiting = [
+                (-self.jobs[queued_id]['priority'], seq, queued_id)
+                for _, seq, queued_id in self.waiting
+            ]
+            heapq.heapify(self.waiting)
+            self.publish_queue_positions()
+            return True
+
+    def queued_order(self):
+        """Ids of queued jobs in the order they will start (call under lock)."""
+        return [job_id for _, _, job_id in sorted(self.waiting) if self.jobs[job_id]['status'] == 'queued']
+
+    def publish_queue_positions(self):
+        """Publish each queued job's position as its status (call under lock)."""
+        for position, job_id in enumerate(self.queued_order(), start=1):
+            self.monitor.update(job_id, {
+                'status': 'queued',
+                'progress': 0,
+                'stage': 'Queued',
+                'current_item': '',
+                'detail': f"Waiting for a free render slot (position {position})",
+                'position': position
+            })
+
+    def get(self, job_id):
+        """A copy of one job, or None."""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def list(self):
+        """All jobs: running first, then queued in start order, then finished (newest first)."""
+        with self.lock:
+            order = {job_id: i for i, job_id in enumerate(self.queued_order())}
+            jobs = [dict(job) for job in self.jobs.values()]
+
+        running = sorted((j for j in jobs if j['status'] == 'running'), key=lambda j: j['started'] or '')
+        queued = sorted((j for j in jobs if j['status'] == 'queued'), key=lambda j: order.get(j['id'], 0))
+        finished = sorted((j for j in jobs if j['status'] in FINAL_STATUSES),
+                          key=lambda j: j['finished'] or '', reverse=True)
+        return running + queued + finished
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+OneOffRender Web Editor - Render Progress Monitor
+Reads structured progress events from render_timeline.py processes and keeps
+the latest status of each render job in memory for the status and SSE endpoints.
+"""
+
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Must match RENDER_EVENT_PREFIX in render_timeline.py
+RENDER_EVENT_PREFIX = '@@render-event '
+
+# Statuses after which a render never changes again
+FINAL_STATUSES = ('completed', 'failed', 'cancelled')
+
+
+class RenderMonitor:
+    """Latest progress of each render job, fed by one reader thread per running process.
+
+    The renderer prints JSON events on stdout (logs go to stderr / the log file).
+    Each event replaces the render's status dict and bumps its version, so status
+    lookups are O(1) and SSE clients wake up as soon as something changes.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.renders = {}  # job_id -> {'status': {...}, 'version': int}
+
+    def watch(self, job_id, process, log_file=None, on_exit=None):
+        """Start relaying events from a render process launched with stdout=PIPE.
+
+        on_exit(job_id, returncode) is called from the reader thread once the
+        process has exited and its final status is recorded.
+        """
+        self.update(job_id, {
+            'status': 'starting',
+            'progress': 0,
+            'stage': 'Initializing...',
+            'current_item': '',
+            'detail': 'Starting render process...'
+        })
+
+        reader = threading.Thread(
+            target=self.read_events, args=(job_id, process, log_file, on_exit),
+            name=f'render-monitor-{job_id}', daemon=True
+        )
+        reader.start()
+
+    def read_events(self, job_id, process, log_file, on_exit):
+        """Reader thread: parse event lines, tee anything else to the log file."""
+        try:
+            for line in process.stdout:
+                if line.startswith(RENDER_EVENT_PREFIX):
+                    try:
+                        event = json.loads(line[len(RENDER_EVENT_PREFIX):])
+                    except ValueError:
+                        logger.warning(f"Bad render event from job {job_id}: {line.strip()}")
+                        continue
+                    self.apply_event(job_id, event)
+                elif log_file is not None:
+                    log_file.write(line)
+                    log_file.flush()
+        finally:
+            returncode = process.wait()
+            if log_file is not None:
+                log_file.close()
+            self.finish(job_id, returncode)
+            if on_exit is not None:
+                on_exit(job_id, returncode)
+
+    def apply_event(self, job_id, event):
+        """Turn a renderer event into the status dict served to the browser."""
+        kind = event.get('event')
+
+        if kind == 'progress':
+            stage = event.get('stage', '')
+            current_item = event.get('item', '')
+            time_info = f"{event.get('time', 0):.1f}s/{event.get('duration', 0):.1f}s"
+            status = {
+                'status': 'running',
+                'progress': event.get('progress', 0),
+                'stage': stage,
+                'current_item': current_item,
+                'detail': f"{stage}: {current_item} ({time_info})"
+            }
+            for key in ('frame', 'total_frames', 'fps', 'eta'):
+                if key in event:
+                    status[key] = event[key]
+        elif kind == 'completed':
+            status = {
+                'status': 'completed',
+                'progress': 100,
+                'stage': 'Complete!',
+                'current_item': 'Finished',
+                'detail': 'Rendering completed successfully',
+                'output': event.get('output', '')
+            }
+        elif kind == 'failed':
+            error = event.get('error', 'Render failed')
+            status = {
+                'status': 'failed',
+                'progress': self.get_status(job_id).get('progress', 0),
+                'stage': 'Error occurred',
+                'current_item': '',
+                'detail': error,
+                'error': error
+            }
+        else:
+            return
+
+        self.update(job_id, status)
+
+    def finish(self, job_id, returncode):
+        """Mark a render that exited without reporting completion as failed."""
+        current = self.get_status(job_id)
+        if current.get('status') in FINAL_STATUSES:
+            return
+        error = f"Render process exited with code {returncode}"
+        self.update(job_id, {
+            'status': 'failed',
+            'progress': current.get('progress', 0),
+            'stage': 'Error occurred',
+            'current_item': '',
+            'detail': error,
+            'error': error
+        })
+
+    def update(self, job_id, status):
+        """Replace a render's status and wake any waiting SSE clients.
+
+        A final status is never replaced: events the renderer printed before it was
+        cancelled can still arrive after the 'cancelled' status was published.
+        """
+        with self.condition:
+            render = self.renders.setdefault(job_id, {'status': {}, 'version': 0})
+            if render['status'].get('status') in FINAL_STATUSES:
+                return
+            render['status'] = status
+            render['version'] += 1
+            self.condition.notify_all()
+
+    def is_watching(self, job_id):
+        """True if this monitor knows the render."""
+        with self.condition:
+            return job_id in self.renders
+
+    def get_status(self, job_id):
+        """Latest status dict of a render (empty if unknown)."""
+        with self.condition:
+            render = self.renders.get(job_id)
+            return dict(render['status']) if render else {}
+
+    def stream(self, job_id, keepalive=15.0):
+        """Yield SSE messages for a render job until it reaches a final status."""
+        last_version = -1
+        while True:
+            with self.condition:
+                render = self.renders.get(job_id)
+                if render is not None and render['version'] == last_version:
+                    self.condition.wait(keepalive)
+                    render = self.renders.get(job_id)
+
+                version = render['version'] if render else None
+                status = dict(render['status']) if render else None
+
+            if status is None:
+                yield f"data: {json.dumps({'status': 'error', 'error': 'Unknown render job'})}\n\n"
+                return
+
+            if version == last_version:
+                # Comment line keeps proxies and the browser from timing out
+                yield f": keepalive {time.time():.0f}\n\n"
+                continue
+
+            last_version = version
+            yield f"data: {json.dumps(status)}\n\n"
+
+            if status.get('status') in FINAL_STATUSES:
+                return
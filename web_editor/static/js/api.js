@@ -172,6 +172,26 @@ const API = {
         }
     },
 
+    /**
+     * Estimate render time, disk and memory for a render manifest (resolves to null on failure)
+     */
+    async estimateRender(timelineData) {
+        try {
+            const response = await fetch(`${this.baseUrl}/api/project/estimate`, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify(timelineData)
+            });
+            const data = await response.json();
+            return data.success ? data.estimate : null;
+        } catch (error) {
+            console.error('Error estimating render:', error);
+            return null;
+        }
+    },
+
     /**
      * Render the timeline to video
      */
@@ -195,6 +215,66 @@ const API = {
         }
     },
 
+    /**
+     * Render a low-resolution preview of the timeline
+     */
+    async previewProject(timelineData) {
+        try {
+            const response = await fetch(`${this.baseUrl}/api/project/preview`, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify(timelineData)
+            });
+            const data = await response.json();
+            if (!data.success) {
+                throw new Error(data.error || 'Failed to start preview');
+            }
+            return data;
+        } catch (error) {
+            console.error('Error starting preview:', error);
+            throw error;
+        }
+    },
+
+    /**
+     * Render the timeline frame at one time; resolves to an image Blob
+     */
+    async renderStillFrame(manifest, time, maxWidth = 960) {
+        const response = await fetch(`${this.baseUrl}/api/render/frame`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({ manifest, time, max_width: maxWidth, format: 'jpeg' })
+        });
+        if (!response.ok) {
+            const data = await response.json().catch(() => ({}));
+            throw new Error(data.error || 'Failed to render frame');
+        }
+        return response.blob();
+    },
+
+    /**
+     * Cancel a queued or running render job
+     */
+    async cancelRender(jobId) {
+        try {
+            const response = await fetch(`${this.baseUrl}/api/render/cancel/${encodeURIComponent(jobId)}`, {
+                method: 'POST'
+            });
+            const data = await response.json();
+            if (!data.success) {
+                throw new Error(data.error || 'Failed to cancel render');
+            }
+            return data;
+        } catch (error) {
+            console.error('Error cancelling render:', error);
+            throw error;
+        }
+    },
+
     /**
      * Format duration in seconds to MM:SS format
      */
@@ -37,6 +37,10 @@ class VideoEditor {
         this.centerPanel = document.querySelector('.center-panel');
         this.videoPreview = document.getElementById('videoPreview');
         this.greenScreenPreview = document.getElementById('greenScreenPreview');
+        this.stillFramePreview = document.getElementById('stillFramePreview');
+        this.stillFrameUrl = null;
+        this.stillFrameInFlight = false;
+        this.pendingStillFrameTime = null;
         this.viewerOverlay = document.querySelector('.viewer-overlay');
         this.playPauseBtn = document.getElementById('playPauseBtn');
         this.currentTimeDisplay = document.getElementById('currentTime');
@@ -58,6 +62,7 @@ class VideoEditor {
         this.loadProjectBtn = document.getElementById('loadProjectBtn');
         this.saveProjectBtn = document.getElementById('saveProjectBtn');
         this.renderBtn = document.getElementById('renderBtn');
+        this.previewBtn = document.getElementById('previewBtn');
 
         // Timeline controls
         this.zoomInBtn = document.getElementById('zoomInBtn');
@@ -75,8 +80,11 @@ class VideoEditor {
         this.renderProgressBar = document.getElementById('renderProgressBar');
         this.renderProgressText = document.getElementById('renderProgressText');
         this.renderStageText = document.getElementById('renderStageText');
-        this.currentRenderPID = null;
+        this.cancelRenderBtn = document.getElementById('cancelRenderBtn');
+        this.currentRenderJobId = null;
+        this.currentRenderOutput = null;
         this.renderPollInterval = null;
+        this.renderEventSource = null;
 
         // Green screen preview state
         this.currentGreenScreen = null; // Currently active green screen element
@@ -141,6 +149,8 @@ class VideoEditor {
         this.loadProjectBtn.addEventListener('click', () => this.showLoadProjectModal());
         this.saveProjectBtn.addEventListener('click', () => this.showSaveProjectModal());
         this.renderBtn.addEventListener('click', () => this.renderProject());
+        this.previewBtn.addEventListener('click', () => this.previewProject());
+        this.cancelRenderBtn.addEventListener('click', () => this.cancelRender());
 
         // Save project modal buttons
         document.getElementById('closeSaveModal').addEventListener('click', () => this.hideSaveProjectModal());
@@ -247,17 +257,46 @@ class VideoEditor {
             item.className = 'audio-file-item';
             item.dataset.path = audio.path;
             item.dataset.duration = audio.duration;
+            if (audio.pending) {
+                item.classList.add('pending');
+            }
+            if (this.selectedAudio && this.selectedAudio.name === audio.name) {
+                item.classList.add('selected');
+            }
             
+            const durationText = audio.pending ? 'Scanning...' : API.formatDuration(audio.duration);
             item.innerHTML = `
                 <div class="audio-file-name">${audio.name}</div>
                 <div class="audio-file-info">
-                    ${API.formatDuration(audio.duration)} • ${API.formatFileSize(audio.size)}
+                    ${durationText} • ${API.formatFileSize(audio.size)}
                 </div>
             `;
             
-            item.addEventListener('click', () => this.selectAudio(audio, item));
+            item.addEventListener('click', () => {
+                // Duration isn't known until the background scan reaches this file
+                if (audio.pending) return;
+                this.selectAudio(audio, item);
+            });
             this.audioFileList.appendChild(item);
         });
+
+        // Pick up durations as the server's audio scanner fills them in
+        if (audioFiles.some(audio => audio.pending)) {
+            clearTimeout(this.audioRefreshTimer);
+            this.audioRefreshTimer = setTimeout(() => this.refreshAudioList(), 2000);
+        }
+    }
+
+    /**
+     * Re-fetch the audio list (used while durations are still pending)
+     */
+    async refreshAudioList() {
+        try {
+            this.audioFiles = await API.getAudioFiles();
+            this.renderAudioList(this.audioFiles);
+        } catch (error) {
+            console.error('Error refreshing audio files:', error);
+        }
     }
 
     /**
@@ -302,6 +341,7 @@ class VideoEditor {
         // Enable buttons
         this.saveProjectBtn.disabled = false;
         this.renderBtn.disabled = false;
+        this.previewBtn.disabled = false;
         this.playPauseBtn.disabled = false;
         this.zoomInBtn.disabled = false;
         this.zoomOutBtn.disabled = false;
@@ -376,7 +416,7 @@ class VideoEditor {
 
         // Show preview
         this.shaderPreview.style.display = 'flex';
-        this.shaderPreviewImage.src = shader.preview_path;
+        this.shaderPreviewImage.src = shader.preview_thumbnail || shader.preview_path;
         this.shaderDescription.value = shader.description || '';
         this.descCharCount.textContent = (shader.description || '').length;
 
@@ -458,13 +498,21 @@ class VideoEditor {
         this.videos.forEach(video => {
             const item = document.createElement('div');
             item.className = 'video-item';
-            item.draggable = true;
+            item.draggable = !video.pending;
+            if (video.pending) {
+                item.classList.add('pending');
+            }
             
+            // Thumbnails and durations arrive from the server's background workers
+            const thumbnail = video.thumbnail
+                ? `<img src="${video.thumbnail}" alt="${video.name}" class="video-thumbnail">`
+                : `<div class="video-thumbnail video-thumbnail-pending">Processing...</div>`;
+            const durationText = video.pending ? 'Processing...' : API.formatDuration(video.duration);
             item.innerHTML = `
-                <img src="${video.thumbnail}" alt="${video.name}" class="video-thumbnail">
+                ${thumbnail}
                 <div class="video-info">
                     <div class="video-name" title="${video.name}">${video.name}</div>
-                    <div class="video-duration">${API.formatDuration(video.duration)}</div>
+                    <div class="video-duration">${durationText}</div>
                 </div>
             `;
             
@@ -478,6 +526,24 @@ class VideoEditor {
             
             this.videoGrid.appendChild(item);
         });
+
+        // Poll until every clip's thumbnail and probe job has finished
+        if (this.videos.some(video => video.pending)) {
+            clearTimeout(this.videoRefreshTimer);
+            this.videoRefreshTimer = setTimeout(() => this.refreshVideoGrid(), 2000);
+        }
+    }
+
+    /**
+     * Re-fetch the video list (used while thumbnails are still pending)
+     */
+    async refreshVideoGrid() {
+        try {
+            this.videos = await API.getVideos();
+            this.renderVideoGrid();
+        } catch (error) {
+            console.error('Error refreshing videos:', error);
+        }
     }
 
     /**
@@ -794,6 +860,8 @@ class VideoEditor {
             return; // Already playing
         }
 
+        this.hideStillFrame();
+
         // Use the video element for both audio-only and video playback
         // Check if there's a green screen video at current playhead position
         const greenScreenAtStart = this.timeline.getGreenScreenAtTime(this.timeline.playheadPosition);
@@ -917,10 +985,52 @@ class VideoEditor {
         // Update green screen preview at new position
         this.updateGreenScreenPreview(time);
 
+        // Show a real rendered frame while scrubbing a paused, not-yet-rendered timeline
+        if (!this.isPlaying && !this.hasRenderedVideo && this.timeline.layers.length > 0) {
+            this.requestStillFrame(time);
+        }
+
         // If playing, the playback interval will continue updating from new position
         // If paused, just update the position
     }
 
+    /**
+     * Fetch the rendered frame at a time; while one is in flight only the latest request is kept
+     */
+    async requestStillFrame(time) {
+        this.pendingStillFrameTime = time;
+        if (this.stillFrameInFlight) return;
+
+        this.stillFrameInFlight = true;
+        try {
+            while (this.pendingStillFrameTime !== null) {
+                const frameTime = this.pendingStillFrameTime;
+                this.pendingStillFrameTime = null;
+
+                const blob = await API.renderStillFrame(this.buildRenderManifest(), frameTime);
+                if (this.isPlaying) break;
+
+                if (this.stillFrameUrl) URL.revokeObjectURL(this.stillFrameUrl);
+                this.stillFrameUrl = URL.createObjectURL(blob);
+                this.stillFramePreview.src = this.stillFrameUrl;
+                this.stillFramePreview.style.display = 'block';
+            }
+        } catch (error) {
+            console.warn('Still frame unavailable:', error.message);
+        } finally {
+            this.stillFrameInFlight = false;
+            this.pendingStillFrameTime = null;
+        }
+    }
+
+    /**
+     * Hide the scrubbing still frame
+     */
+    hideStillFrame() {
+        this.pendingStillFrameTime = null;
+        this.stillFramePreview.style.display = 'none';
+    }
+
     /**
      * Update green screen video preview based on playhead position
      * Handles visual display and audio playback of green screen videos
@@ -982,7 +1092,8 @@ class VideoEditor {
         const offset = currentTime - greenScreen.startTime;
 
         // Load green screen video source into overlay video element
-        const videoPath = `/api/videos/file/${greenScreen.data.name}`;
+        // Versioned URL from the video list (cacheable); saved projects may predate it
+        const videoPath = greenScreen.data.url || `/api/videos/file/${greenScreen.data.name}`;
 
         // Only change source if different video (avoid reloading same video)
         const needsSourceChange = this.greenScreenVideoPath !== videoPath;
@@ -1285,76 +1396,154 @@ class VideoEditor {
             return;
         }
 
-        if (!confirm('Start rendering the video? This may take several minutes.')) {
-            return;
-        }
-
         // Enable all green screen previews before rendering
         // This ensures green screen videos are included in the render
         this.timeline.enableAllGreenScreenPreviews();
 
-        try {
-            // Get resolution from settings
-            const resolutionValue = this.resolutionSelect.value;
-            const [width, height] = resolutionValue.split('x').map(Number);
-
-            // Get frame rate from settings
-            const frameRate = parseInt(this.frameRateInput.value);
-
-            // Generate render manifest
-            const renderManifest = {
-                version: "1.0",
-                project_name: this.selectedAudio.name.replace(/\.[^/.]+$/, ""),
-                audio: {
-                    path: `Input_Audio/${this.selectedAudio.name}`,
-                    duration: this.selectedAudio.duration
-                },
-                resolution: {
-                    width: width,
-                    height: height
-                },
-                frame_rate: frameRate,
-                timeline: {
-                    duration: this.timeline.duration,
-                    elements: this.timeline.layers.map(el => ({
-                        id: el.id,
-                        type: el.type,
-                        name: el.name,
-                        startTime: el.startTime,
-                        endTime: el.startTime + el.duration,
-                        duration: el.duration,
-                        layer: el.layer,
-                        path: this.getElementPath(el),
-                        // Add greenscreen config for videos on layer 1
-                        ...(el.type === 'video' && el.layer === 1 ? {
-                            greenscreen: {
-                                enabled: true,
-                                color: [0, 255, 0],
-                                threshold: 0.4,
-                                smoothness: 0.1
-                            }
-                        } : {})
-                    }))
-                }
-            };
+        const renderManifest = this.buildRenderManifest();
+        const estimate = await API.estimateRender(renderManifest);
+        if (!confirm(this.formatRenderEstimate(estimate) + '\n\nStart rendering the video?')) {
+            return;
+        }
 
+        try {
             console.log('Render manifest:', renderManifest);
 
             const response = await API.renderProject(renderManifest);
-
-            // Show progress overlay
-            this.renderProgressOverlay.style.display = 'flex';
-            this.currentRenderPID = response.process_id;
-
-            // Poll every 2 seconds for responsive progress updates
-            this.renderPollInterval = setInterval(() => this.pollRenderStatus(), 2000);
-            this.pollRenderStatus(); // Call immediately
+            this.showRenderProgress(response, `${renderManifest.project_name}.mp4`);
         } catch (error) {
             console.error('Render error:', error);
             alert('Failed to start rendering: ' + error.message);
         }
     }
 
+    /**
+     * Describe a render estimate for the render confirmation
+     */
+    formatRenderEstimate(estimate) {
+        if (!estimate) {
+            return 'This may take several minutes.';
+        }
+
+        const formatTime = (seconds) => seconds >= 60
+            ? `${Math.floor(seconds / 60)}m ${Math.round(seconds % 60)}s`
+            : `${Math.round(seconds)}s`;
+        const formatSize = (bytes) => bytes >= 1024 ** 3
+            ? `${(bytes / 1024 ** 3).toFixed(1)} GB`
+            : `${Math.round(bytes / 1024 ** 2)} MB`;
+
+        let text = `Estimated render time: ~${formatTime(estimate.total_seconds)} ` +
+            `(${estimate.resolution} @ ${estimate.frame_rate}fps)\n` +
+            `GPU ${formatTime(estimate.gpu_seconds)}, encode ${formatTime(estimate.encode_seconds)}, ` +
+            `peak memory ${formatSize(estimate.peak_memory_bytes)}`;
+        if (estimate.unknown_shaders.length > 0) {
+            text += `\n(${estimate.unknown_shaders.length} shader(s) not benchmarked yet; estimate is rough)`;
+        }
+        return text;
+    }
+
+    /**
+     * Render a low-resolution proxy of the timeline (quick check of timing and transitions)
+     */
+    async previewProject() {
+        if (!this.selectedAudio) {
+            alert('Please select an audio file first.');
+            return;
+        }
+
+        if (this.timeline.layers.length === 0) {
+            alert('Timeline is empty. Please add some elements first.');
+            return;
+        }
+
+        this.timeline.enableAllGreenScreenPreviews();
+
+        try {
+            const response = await API.previewProject(this.buildRenderManifest());
+            this.showRenderProgress(response, response.output_file);
+        } catch (error) {
+            console.error('Preview error:', error);
+            alert('Failed to start preview: ' + error.message);
+        }
+    }
+
+    /**
+     * Build the render manifest from the timeline and render settings
+     */
+    buildRenderManifest() {
+        // Get resolution from settings
+        const resolutionValue = this.resolutionSelect.value;
+        const [width, height] = resolutionValue.split('x').map(Number);
+
+        // Get frame rate from settings
+        const frameRate = parseInt(this.frameRateInput.value);
+
+        // Generate render manifest
+        return {
+            version: "1.0",
+            project_name: this.selectedAudio.name.replace(/\.[^/.]+$/, ""),
+            audio: {
+                path: `Input_Audio/${this.selectedAudio.name}`,
+                duration: this.selectedAudio.duration
+            },
+            resolution: {
+                width: width,
+                height: height
+            },
+            frame_rate: frameRate,
+            timeline: {
+                duration: this.timeline.duration,
+                elements: this.timeline.layers.map(el => ({
+                    id: el.id,
+                    type: el.type,
+                    name: el.name,
+                    startTime: el.startTime,
+                    endTime: el.startTime + el.duration,
+                    duration: el.duration,
+                    layer: el.layer,
+                    path: this.getElementPath(el),
+                    // Add greenscreen config for videos on layer 1
+                    ...(el.type === 'video' && el.layer === 1 ? {
+                        greenscreen: {
+                            enabled: true,
+                            color: [0, 255, 0],
+                            threshold: 0.4,
+                            smoothness: 0.1
+                        }
+                    } : {})
+                }))
+            }
+        };
+    }
+
+    /**
+     * Show the progress overlay and follow a queued or started render job
+     */
+    showRenderProgress(response, outputFile) {
+        this.renderProgressOverlay.style.display = 'flex';
+        this.renderProgressBar.style.width = '0%';
+        this.renderProgressText.textContent = '0%';
+        this.renderStageText.textContent = response.status === 'queued' ? 'Queued' : 'Initializing...';
+        this.currentRenderJobId = response.job_id;
+        this.currentRenderOutput = outputFile;
+
+        // Follow progress over server-sent events (falls back to polling)
+        this.watchRenderProgress();
+    }
+
+    /**
+     * Cancel the render being watched (queued or running)
+     */
+    async cancelRender() {
+        if (!this.currentRenderJobId) return;
+
+        try {
+            await API.cancelRender(this.currentRenderJobId);
+        } catch (error) {
+            alert('Failed to cancel render: ' + error.message);
+        }
+    }
+
     /**
      * Get full file path for a timeline element
      */
@@ -1406,62 +1595,128 @@ class VideoEditor {
         }
     }
 
+    /**
+     * Follow render progress via the server-sent events stream
+     */
+    watchRenderProgress() {
+        if (!window.EventSource) {
+            this.startRenderPolling();
+            return;
+        }
+
+        const source = new EventSource(`/api/render/events/${this.currentRenderJobId}`);
+        this.renderEventSource = source;
+
+        source.onmessage = (event) => {
+            this.updateRenderProgress(JSON.parse(event.data));
+        };
+
+        source.onerror = () => {
+            // Stream dropped before the render finished - fall back to polling
+            source.close();
+            this.renderEventSource = null;
+            if (this.currentRenderJobId) {
+                console.warn('Render event stream lost, falling back to polling');
+                this.startRenderPolling();
+            }
+        };
+    }
+
+    /**
+     * Poll render status every 2 seconds (fallback when SSE isn't available)
+     */
+    startRenderPolling() {
+        clearInterval(this.renderPollInterval);
+        this.renderPollInterval = setInterval(() => this.pollRenderStatus(), 2000);
+        this.pollRenderStatus(); // Call immediately
+    }
+
+    /**
+     * Stop listening for render progress
+     */
+    stopRenderProgress() {
+        clearInterval(this.renderPollInterval);
+        if (this.renderEventSource) {
+            this.renderEventSource.close();
+            this.renderEventSource = null;
+        }
+        this.currentRenderJobId = null;
+    }
+
     /**
      * Poll render status and update progress UI
      */
     async pollRenderStatus() {
-        if (!this.currentRenderPID) return;
+        if (!this.currentRenderJobId) return;
 
         try {
-            const response = await fetch(`/api/render/status/${this.currentRenderPID}`);
+            const response = await fetch(`/api/render/status/${this.currentRenderJobId}`);
             const data = await response.json();
+            this.updateRenderProgress(data);
+        } catch (error) {
+            console.error('Error polling render status:', error);
+            // Don't stop polling on network errors - might be temporary
+        }
+    }
 
-            // Update progress bar
-            this.renderProgressBar.style.width = `${data.progress}%`;
+    /**
+     * Update progress UI from a render status update
+     */
+    updateRenderProgress(data) {
+        if (!this.currentRenderJobId) return;
+
+        // Update progress bar
+        this.renderProgressBar.style.width = `${data.progress}%`;
+
+        // Update percentage text (with ETA when the renderer reports it)
+        let progressText = `${Math.round(data.progress)}%`;
+        if (data.eta !== undefined && data.status === 'running') {
+            progressText += ` • ${API.formatDuration(data.eta)} left`;
+        } else if (data.status === 'queued' && data.position) {
+            progressText = `Queued #${data.position}`;
+        }
+        this.renderProgressText.textContent = progressText;
 
-            // Update percentage text
-            this.renderProgressText.textContent = `${Math.round(data.progress)}%`;
+        // Update stage text with detailed information
+        if (data.current_item && data.current_item !== 'None' && data.current_item !== '') {
+            // Show detailed status with current item
+            this.renderStageText.textContent = `${data.stage}: ${data.current_item}`;
+        } else {
+            // Show just the stage
+            this.renderStageText.textContent = data.stage;
+        }
 
-            // Update stage text with detailed information
-            if (data.current_item && data.current_item !== 'None' && data.current_item !== '') {
-                // Show detailed status with current item
-                this.renderStageText.textContent = `${data.stage}: ${data.current_item}`;
-            } else {
-                // Show just the stage
-                this.renderStageText.textContent = data.stage;
-            }
+        // Handle completion
+        if (data.status === 'completed') {
+            this.stopRenderProgress();
+            this.renderProgressOverlay.style.display = 'none';
 
-            // Handle completion
-            if (data.status === 'completed') {
-                clearInterval(this.renderPollInterval);
-                this.renderProgressOverlay.style.display = 'none';
+            // Load rendered video into player
+            this.videoPreview.src = `/api/render/output/${encodeURIComponent(this.currentRenderOutput)}`;
+            this.hasRenderedVideo = true; // Mark that we now have a rendered video
+            this.hideStillFrame();
 
-                // Load rendered video into player
-                const projectName = this.timeline.audioFileName.replace(/\.[^/.]+$/, ''); // Remove extension
-                this.videoPreview.src = `/api/render/output/${projectName}.mp4`;
-                this.hasRenderedVideo = true; // Mark that we now have a rendered video
+            // Hide the overlay since we now have video content
+            this.viewerOverlay.style.display = 'none';
 
-                // Hide the overlay since we now have video content
-                this.viewerOverlay.style.display = 'none';
+            // Disable all green screen previews after render completes
+            // This allows user to preview the rendered composite without green screen overlays
+            this.timeline.disableAllGreenScreenPreviews();
 
-                // Disable all green screen previews after render completes
-                // This allows user to preview the rendered composite without green screen overlays
-                this.timeline.disableAllGreenScreenPreviews();
+            alert('Rendering complete! Video loaded in preview.');
+        }
 
-                alert('Rendering complete! Video loaded in preview.');
-                this.currentRenderPID = null;
-            }
+        // Handle failure
+        if (data.status === 'failed') {
+            this.stopRenderProgress();
+            this.renderProgressOverlay.style.display = 'none';
+            alert(`Rendering failed: ${data.error || 'Check the render log for details'}`);
+        }
 
-            // Handle failure
-            if (data.status === 'failed') {
-                clearInterval(this.renderPollInterval);
-                this.renderProgressOverlay.style.display = 'none';
-                alert(`Rendering failed: ${data.error || 'Check render_output.log for details'}`);
-                this.currentRenderPID = null;
-            }
-        } catch (error) {
-            console.error('Error polling render status:', error);
-            // Don't stop polling on network errors - might be temporary
+        // Handle cancellation
+        if (data.status === 'cancelled') {
+            this.stopRenderProgress();
+            this.renderProgressOverlay.style.display = 'none';
         }
     }
 }
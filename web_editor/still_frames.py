@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+OneOffRender Web Editor - Still Frame Worker Client
+Starts frame_worker.py once and sends it single-frame render requests for timeline scrubbing.
+"""
+
+import os
+import sys
+import json
+import logging
+import subprocess
+import threading
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class StillFrameError(Exception):
+    """A still frame could not be rendered."""
+
+
+class StillFrameWorker:
+    """Client for one long-lived frame_worker.py process.
+
+    The worker keeps its GL context and compiled shaders between requests, so only
+    the first frame pays for startup. Requests are serialized (one GL context);
+    a worker that dies or exceeds the timeout is killed and restarted on the next
+    request.
+    """
+
+    def __init__(self, working_dir, log_path, timeout=10.0):
+        self.working_dir = Path(working_dir)
+        self.log_path = Path(log_path)
+        self.timeout = timeout
+
+        self.lock = threading.Lock()
+        self.process = None
+        self.log_file = None
+
+    def start(self):
+        """Start the worker process if it isn't running (call under lock)."""
+        if self.process is not None and self.process.poll() is None:
+            return
+
+        self.stop()
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        self.log_file = open(self.log_path, 'a', encoding='utf-8')
+
+        # Use the same Python interpreter that's running Flask
+        env = dict(os.environ, PYTHONIOENCODING='utf-8')
+        self.process = subprocess.Popen(
+            [sys.executable, 'frame_worker.py'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=self.log_file,
+            cwd=str(self.working_dir),
+            env=env
+        )
+        logger.info(f"Started still frame worker (PID: {self.process.pid})")
+
+    def stop(self):
+        """Stop the worker process (call under lock)."""
+        if self.process is not None:
+            if self.process.poll() is None:
+                self.process.kill()
+            self.process.wait()
+            self.process = None
+        if self.log_file is not None:
+            self.log_file.close()
+            self.log_file = None
+
+    def render(self, manifest, time_seconds, image_format='jpeg', quality=85, max_width=None):
+        """Render one frame; returns (image bytes, mime type)."""
+        request = {
+            'manifest': manifest,
+            'time': time_seconds,
+            'format': image_format,
+            'quality': quality,
+            'max_width': max_width
+        }
+
+        with self.lock:
+            self.start()
+            process = self.process
+
+            # Kill a stuck worker (e.g. a runaway shader) rather than block the request forever
+            watchdog = threading.Timer(self.timeout, process.kill)
+            watchdog.start()
+            try:
+                process.stdin.write((json.dumps(request) + '\n').encode('utf-8'))
+                process.stdin.flush()
+
+                header_line = process.stdout.readline()
+                header = json.loads(header_line) if header_line else None
+                image = process.stdout.read(header.get('size', 0)) if header else b''
+            except (OSError, ValueError) as e:
+                self.stop()
+                raise StillFrameError(f"Still frame worker failed: {e}")
+            finally:
+                timed_out = not watchdog.is_alive()
+                watchdog.cancel()
+
+            if header is None or len(image) != header.get('size', 0):
+                # Output ended early: the worker crashed or the watchdog killed it
+                self.stop()
+                if timed_out:
+                    raise StillFrameError(f"Still frame took longer than {self.timeout:.0f}s")
+                raise StillFrameError(f"Still frame worker exited (see {self.log_path.name})")
+
+            if not header.get('ok'):
+                raise StillFrameError(header.get('error', 'Still frame failed'))
+
+        logger.debug(f"Still frame at {time_seconds:.2f}s: {header['width']}x{header['height']} in {header['elapsed']}ms")
+        return image, header['mime']